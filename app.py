@@ -1,34 +1,77 @@
 import os
 import sys
-import pandas as pd
-import certifi
-import pymongo
+import time
+from contextlib import asynccontextmanager
+import numpy as np
 from dotenv import load_dotenv
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
-from src.pipelines.training_pipeline import TrainingPipeline
-from src.utils.utils import load_preprocessor
-from src.utils.model_estimator import ModelEstimator
+from src.utils.serving_model import get_serving_model
+from src.utils.shadow import ShadowEvaluator
+from src.utils.prediction_log import PredictionLog
+from src.utils.url_features import URLFeatureExtractor, url_hosts
+from src.utils.prescreen import KNOWN_BAD, KNOWN_GOOD, get_prescreen
+from src.utils.schema_csv import read_schema_csv
+from src.utils.payload_formats import (
+    MalformedPayload,
+    UnsupportedPayloadFormat,
+    decode_payload,
+    encode_predictions,
+    media_type,
+    negotiate_response_type,
+)
+from src.utils.serving_metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    PREDICT_BATCH_ROWS,
+    PREDICT_REQUESTS,
+    PREDICT_ROWS,
+    PREDICT_STAGE_SECONDS,
+    PRESCREEN_ROWS,
+    render_metrics,
+)
 from src.constants.training_pipeline import (
     DATA_INGESTION_DATABASE_NAME,
-    DATA_INGESTION_COLLECTION_NAME,
+    LATENCY_TIER_FAST,
+    LATENCY_TIER_STANDARD,
+    PREDICTION_LOG_COLLECTION_NAME,
+    PREDICTION_LOG_MAX_POOL_SIZE,
 )
-from fastapi import FastAPI, File, UploadFile, Request
+from fastapi import Body, FastAPI, File, UploadFile, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
 from fastapi.templating import Jinja2Templates
-from uvicorn import run as app_run
+from starlette.background import BackgroundTask
 from starlette.responses import RedirectResponse
 
-ca = certifi.where()
-
 load_dotenv()
-mongo_db_url = os.getenv("MONGODB_URI")
-client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
-database = client[DATA_INGESTION_DATABASE_NAME]
-collection = client[DATA_INGESTION_COLLECTION_NAME]
+MONGODB_URI = os.getenv("MONGODB_URI")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens the pooled async Mongo client of the prediction log when a Mongo
+    URI is configured, and flushes the log before closing it
+    """
+    app.state.prediction_log = None
+    if not MONGODB_URI:
+        yield
+        return
+    from pymongo import AsyncMongoClient
+
+    mongo_client = AsyncMongoClient(MONGODB_URI, maxPoolSize=PREDICTION_LOG_MAX_POOL_SIZE)
+    app.state.prediction_log = PredictionLog(
+        mongo_client[DATA_INGESTION_DATABASE_NAME][PREDICTION_LOG_COLLECTION_NAME]
+    )
+    app.state.prediction_log.start()
+    try:
+        yield
+    finally:
+        await app.state.prediction_log.close()
+        await mongo_client.close()
+
+
+app = FastAPI(lifespan=lifespan)
 origins = ["*"]
 
 app.add_middleware(
@@ -41,6 +84,10 @@ app.add_middleware(
 
 
 templates = Jinja2Templates(directory="./templates")
+# Lexical features only: network features are left for the imputer until
+# resolvers are configured for the deployment
+url_feature_extractor = URLFeatureExtractor()
+shadow_evaluator = ShadowEvaluator()
 
 
 @app.get("/", tags=["authentication"])
@@ -51,6 +98,10 @@ async def index():
 @app.get("/train")
 async def train_roue():
     try:
+        # The training stack (mlflow, scikit-learn ensembles) is only imported
+        # when a training is requested, to keep worker start-up fast
+        from src.pipelines.training_pipeline import TrainingPipeline
+
         train_pipeline = TrainingPipeline()
         train_pipeline.run_pipeline()
         return Response("Model training was successful")
@@ -59,28 +110,156 @@ async def train_roue():
 
 
 @app.get("/predict")
-async def predict_route(request: Request, file: UploadFile = File(...)):
+@app.post("/predict")
+async def predict_route(
+    request: Request,
+    file: UploadFile = File(None),
+    latency_tier: str = LATENCY_TIER_STANDARD,
+):
+    """
+    Scores a CSV file upload and renders an HTML table, or scores a request
+    body in a payload format of its Content-Type (CSV, Arrow IPC, npy or
+    msgpack) and answers the predictions in the format of the Accept header,
+    the request format by default
+    """
+    # Any other tier is served as standard; this also bounds the label values
+    if latency_tier != LATENCY_TIER_FAST:
+        latency_tier = LATENCY_TIER_STANDARD
+    request_type = media_type(request.headers.get("content-type"))
+    if file is None and request_type is None:
+        return Response("Unsupported payload format", status_code=415)
     try:
-        df = pd.read_csv(file.file)
-        preprocessor = load_preprocessor("models/preprocessor.pkl")
-        model = load_preprocessor("models/model.pkl")
-        model_estimator = ModelEstimator(preprocessor=preprocessor, model=model)
-        print(df.iloc[0])
-
-        y_pred = model_estimator.predict(df)
-        print(y_pred)
-
-        df["predicted_column"] = y_pred
-        print(df["predicted_column"])
-
-        df.to_csv("predictions/prediction.csv")
-        table_html = df.to_html(classes="table table-striped")
-        return templates.TemplateResponse(
-            "table.html", {"request": request, "table": table_html}
+        with PREDICT_STAGE_SECONDS.labels("parse").time():
+            if file is not None:
+                df = read_schema_csv(file.file)
+            else:
+                df = decode_payload(
+                    await request.body(),
+                    request_type,
+                    url_feature_extractor.feature_names,
+                )
+        model_estimator = get_serving_model()
+
+        start = time.perf_counter()
+        if latency_tier == LATENCY_TIER_FAST and model_estimator.has_student:
+            # The student scores raw features, only the rows missing one of
+            # them are preprocessed for the model
+            with PREDICT_STAGE_SECONDS.labels("inference").time():
+                y_pred = model_estimator.predict(df, latency_tier=latency_tier)
+        else:
+            with PREDICT_STAGE_SECONDS.labels("preprocess").time():
+                X_transformed = model_estimator.transform(df)
+            with PREDICT_STAGE_SECONDS.labels("inference").time():
+                y_pred = model_estimator.predict_transformed(X_transformed)
+        # The candidate is compared with the model, not with the student
+        shadow_batch = (
+            (df.copy(deep=False), y_pred, time.perf_counter() - start)
+            if latency_tier == LATENCY_TIER_STANDARD and shadow_evaluator.should_sample()
+            else None
         )
+        PREDICT_BATCH_ROWS.labels().observe(len(df))
+        PREDICT_ROWS.labels(latency_tier).inc(len(df))
+        logging.info(f"Scored {len(df)} rows, latency tier {latency_tier}")
+        prediction_log = getattr(request.app.state, "prediction_log", None)
+        if prediction_log is not None:
+            prediction_log.append(df, y_pred, latency_tier=latency_tier)
+
+        with PREDICT_STAGE_SECONDS.labels("render").time():
+            if file is not None:
+                df["predicted_column"] = y_pred
+                df.to_csv("predictions/prediction.csv")
+                table_html = df.to_html(classes="table table-striped")
+                response = templates.TemplateResponse(
+                    request, "table.html", {"table": table_html}
+                )
+            else:
+                response_type = negotiate_response_type(
+                    request.headers.get("accept"), request_type
+                )
+                response = Response(
+                    encode_predictions(y_pred, response_type), media_type=response_type
+                )
+        if shadow_batch is not None:
+            # Runs once the response is sent
+            response.background = BackgroundTask(shadow_evaluator.submit, *shadow_batch)
+        PREDICT_REQUESTS.labels(latency_tier, "success").inc()
+        return response
+    except UnsupportedPayloadFormat as e:
+        PREDICT_REQUESTS.labels(latency_tier, "error").inc()
+        return Response(str(e), status_code=415)
+    except MalformedPayload as e:
+        PREDICT_REQUESTS.labels(latency_tier, "error").inc()
+        return Response(str(e), status_code=400)
     except Exception as e:
+        PREDICT_REQUESTS.labels(latency_tier, "error").inc()
         raise NetworkSecurityException(error_message=e)
 
 
+@app.post("/predict/urls")
+async def predict_urls_route(
+    request: Request,
+    urls: list[str] = Body(..., embed=True),
+    latency_tier: str = LATENCY_TIER_STANDARD,
+):
+    """
+    Scores raw URLs, featurized on the server: {"urls": ["http://...", ...]}.
+    URLs of hosts with a known verdict are answered by the pre-screen, only
+    the others are featurized and scored by the model.
+    """
+    if latency_tier != LATENCY_TIER_FAST:
+        latency_tier = LATENCY_TIER_STANDARD
+    try:
+        y_pred = np.full(len(urls), np.nan)
+        prescreen = get_prescreen()
+        if prescreen is not None:
+            with PREDICT_STAGE_SECONDS.labels("prescreen").time():
+                y_pred = prescreen.lookup(url_hosts(urls).to_numpy(dtype=object))
+        unknown = np.flatnonzero(np.isnan(y_pred))
+        PRESCREEN_ROWS.labels("known_bad").inc(int(np.sum(y_pred == KNOWN_BAD)))
+        PRESCREEN_ROWS.labels("known_good").inc(int(np.sum(y_pred == KNOWN_GOOD)))
+        PRESCREEN_ROWS.labels("unknown").inc(len(unknown))
+
+        if len(unknown):
+            with PREDICT_STAGE_SECONDS.labels("featurize").time():
+                df = url_feature_extractor.transform([urls[index] for index in unknown])
+            with PREDICT_STAGE_SECONDS.labels("inference").time():
+                y_pred[unknown] = get_serving_model().predict(
+                    df, latency_tier=latency_tier
+                )
+            prediction_log = getattr(request.app.state, "prediction_log", None)
+            if prediction_log is not None:
+                prediction_log.append(
+                    df,
+                    y_pred[unknown],
+                    latency_tier=latency_tier,
+                    url=[urls[index] for index in unknown],
+                )
+        PREDICT_BATCH_ROWS.labels().observe(len(urls))
+        PREDICT_ROWS.labels(latency_tier).inc(len(unknown))
+        PREDICT_REQUESTS.labels(latency_tier, "success").inc()
+        return {"urls": urls, "predicted_column": y_pred.tolist()}
+    except Exception as e:
+        PREDICT_REQUESTS.labels(latency_tier, "error").inc()
+        raise NetworkSecurityException(error_message=e)
+
+
+@app.get("/shadow")
+async def shadow_route():
+    """
+    Registry roles and the agreement and latency of the shadow candidate
+    """
+    return shadow_evaluator.stats()
+
+
+@app.get("/metrics")
+async def metrics_route():
+    """
+    Serving metrics of this worker in the Prometheus text format
+    """
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
+    from uvicorn import run as app_run
+
     app_run(app=app, host="localhost", port=8000)
@@ -0,0 +1,60 @@
+"""
+Offline batch scoring with the serving model.
+
+Usage:
+    python batch_score.py --input data/backlog.csv --output predictions/batch
+    python batch_score.py --input data/backlog.parquet --workers 8
+    python batch_score.py --mongo-collection phishing_data
+"""
+import os
+import argparse
+from dotenv import load_dotenv
+from src.constants.training_pipeline import (
+    BATCH_SCORING_OUTPUT_DIRECTORY,
+    BATCH_SCORING_SHARD_SIZE,
+    DATA_INGESTION_DATABASE_NAME,
+    LATENCY_TIER_FAST,
+    LATENCY_TIER_STANDARD,
+)
+from src.pipelines.batch_scoring import BatchScoringPipeline
+
+load_dotenv()
+MONGODB_URI = os.getenv("MONGODB_URI")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="CSV or Parquet file to score")
+    source.add_argument("--mongo-collection", help="Mongo collection to score")
+    parser.add_argument("--mongo-database", default=DATA_INGESTION_DATABASE_NAME)
+    parser.add_argument("--output", default=BATCH_SCORING_OUTPUT_DIRECTORY)
+    parser.add_argument("--output-format", choices=["csv", "parquet"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=BATCH_SCORING_SHARD_SIZE)
+    parser.add_argument(
+        "--latency-tier",
+        choices=[LATENCY_TIER_STANDARD, LATENCY_TIER_FAST],
+        default=LATENCY_TIER_STANDARD,
+    )
+    args = parser.parse_args()
+
+    batch_scoring = BatchScoringPipeline(
+        max_workers=args.workers,
+        shard_size=args.shard_size,
+        latency_tier=args.latency_tier,
+    )
+    if args.input:
+        rows = batch_scoring.score_file(
+            input_file_path=args.input,
+            output_directory=args.output,
+            output_format=args.output_format,
+        )
+    else:
+        import pymongo
+
+        mongo_client = pymongo.MongoClient(MONGODB_URI)
+        rows = batch_scoring.score_collection(
+            mongo_client[args.mongo_database][args.mongo_collection]
+        )
+    print(f"Scored {rows} rows")
@@ -0,0 +1,156 @@
+"""
+Disk use and write amplification of the artifacts of repeated training runs
+on the same synthetic data, served from the in-memory Mongo stand-in, with
+the artifact store disabled (every run a full copy) and enabled, and on a
+baseline checkout of the repository when given. Every run is a fresh
+interpreter in a temporary directory shared by the runs of a mode; the model
+is trained incrementally, so runs have no data transformation artifacts. Write
+amplification is the bytes written to the artifact directory by a run over
+the bytes of the feature store.
+
+Usage:
+    python -m benchmarks.benchmark_artifact_store --rows 100000 --runs 3
+    python -m benchmarks.benchmark_artifact_store --baseline ../network-security-main
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "artifact_store.json")
+ARTIFACT_DIRECTORY: str = "artifacts"
+
+
+def disk_usage(directory: str) -> int:
+    """
+    Bytes of the files under a directory, hardlinked files counted once. The
+    baseline checkout may not have src.utils.artifact_store.
+    """
+    inodes = {}
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            stat = os.lstat(os.path.join(root, file_name))
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_blocks * 512
+    return sum(inodes.values())
+
+
+def run_worker(args):
+    """
+    Runs the pipeline once and prints the bytes it wrote and the disk use of
+    the artifact directory
+    """
+    from benchmarks.mongo_stand_in import InMemoryMongoClient
+    from src.constants.training_pipeline import (
+        DATA_INGESTION_COLLECTION_NAME,
+        DATA_INGESTION_DATABASE_NAME,
+    )
+    from src.entity.config_entity import DataIngestionConfig
+    from src.pipelines.training_pipeline import TrainingPipeline
+    from src.utils.synthetic_data import iter_synthetic_dataset
+
+    mongo_client = InMemoryMongoClient()
+    collection = mongo_client[DATA_INGESTION_DATABASE_NAME][
+        DATA_INGESTION_COLLECTION_NAME
+    ]
+    for chunk in iter_synthetic_dataset(n_rows=args.rows, random_state=42):
+        collection.insert_many(chunk.to_dict(orient="records"))
+
+    store_directory = os.path.join(ARTIFACT_DIRECTORY, ".store")
+    store_bytes_before = disk_usage(store_directory)
+    training_pipeline = TrainingPipeline(mongo_client=mongo_client)
+    training_pipeline.run_pipeline()
+
+    run_directory = training_pipeline.training_pipeline_config.artifact_path
+    with open(training_pipeline.instrumentation_config.run_report_file_path) as file:
+        stages = {
+            stage["stage"]: stage["wall_seconds"] for stage in json.load(file)["stages"]
+        }
+    print(
+        json.dumps(
+            {
+                # The newest run keeps its files: all of them were written,
+                # the store grows by the blobs of the runs packed
+                "written_bytes": disk_usage(run_directory)
+                + disk_usage(store_directory)
+                - store_bytes_before,
+                "feature_store_bytes": os.path.getsize(
+                    DataIngestionConfig(
+                        training_pipeline.training_pipeline_config
+                    ).feature_store_file_path
+                ),
+                "artifact_directory_bytes": disk_usage(ARTIFACT_DIRECTORY),
+                "data_validation_seconds": stages.get("data_validation"),
+                "artifact_store_seconds": stages.get("artifact_store"),
+            }
+        )
+    )
+
+
+def benchmark_mode(repository_directory: str, enabled: bool, args) -> list:
+    environment = {
+        **os.environ,
+        "PYTHONPATH": repository_directory,
+        "MLFLOW_TRACKING_URI": "sqlite:///mlflow.db",
+        "MODEL_TRAINER_TRAINING_MODE": "incremental",
+        "ARTIFACT_STORE_ENABLED": "1" if enabled else "0",
+    }
+    runs = []
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(
+            os.path.join(repository_directory, "data_schema"),
+            os.path.join(directory, "data_schema"),
+        )
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--worker",
+                    "--rows",
+                    str(args.rows),
+                ],
+                cwd=directory,
+                env=environment,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            run = json.loads(output.strip().splitlines()[-1])
+            run["write_amplification"] = (
+                run["written_bytes"] / run["feature_store_bytes"]
+            )
+            runs.append(run)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", help="Checkout of the repository to compare")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = {"rows": args.rows}
+    if args.baseline:
+        results["baseline"] = benchmark_mode(
+            os.path.abspath(args.baseline), enabled=False, args=args
+        )
+    results["disabled"] = benchmark_mode(os.getcwd(), enabled=False, args=args)
+    results["enabled"] = benchmark_mode(os.getcwd(), enabled=True, args=args)
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
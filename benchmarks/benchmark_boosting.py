@@ -0,0 +1,92 @@
+"""
+Benchmark of the boosting candidates of ModelTrainer on synthetic ternary data.
+
+Usage:
+    python -m benchmarks.benchmark_boosting --rows 100000 1000000 10000000
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+from sklearn.metrics import f1_score
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier
+from src.constants.training_pipeline import TARGET_COLUMN
+from src.utils.estimators import TernaryHistGradientBoostingClassifier
+from src.utils.synthetic_data import LEGITIMATE_LABEL, generate_synthetic_dataset
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "boosting.json")
+NUMBER_OF_FEATURES: int = 30
+
+
+def make_ternary_dataset(n_rows: int, random_state: int = 42):
+    """
+    Schema conformant synthetic phishing data, with the target encoded as in
+    DataTransformation
+    """
+    df = generate_synthetic_dataset(n_rows=n_rows, random_state=random_state)
+    X = df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.float64)
+    y = (df[TARGET_COLUMN] == LEGITIMATE_LABEL).astype(int).to_numpy()
+    return X, y
+
+
+def benchmark_model(model, X_train, y_train, X_test, y_test) -> dict:
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    return {
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+        "f1_score": float(f1_score(y_true=y_test, y_pred=y_pred)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000]
+    )
+    parser.add_argument(
+        "--classic-max-rows",
+        type=int,
+        default=1_000_000,
+        help="Largest dataset AdaBoost and GradientBoosting are trained on",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        X, y = make_ternary_dataset(n_rows=n_rows + 10_000)
+        X_train, y_train = X[:n_rows], y[:n_rows]
+        X_test, y_test = X[n_rows:], y[n_rows:]
+
+        models = {
+            "Hist Gradient Boosting": TernaryHistGradientBoostingClassifier(
+                categorical_features=np.ones(NUMBER_OF_FEATURES, dtype=bool),
+                early_stopping=True,
+                random_state=42,
+            ),
+        }
+        if n_rows <= args.classic_max_rows:
+            models["AdaBoost"] = AdaBoostClassifier(n_estimators=100, random_state=42)
+            models["Gradient Boosting"] = GradientBoostingClassifier(
+                n_estimators=100, random_state=42
+            )
+
+        for model_name, model in models.items():
+            result = benchmark_model(model, X_train, y_train, X_test, y_test)
+            result.update({"model": model_name, "rows": n_rows})
+            print(json.dumps(result))
+            results.append(result)
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
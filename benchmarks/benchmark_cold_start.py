@@ -0,0 +1,83 @@
+"""
+Measures serving cold start: import time of the app against the training
+stack, the slowest imports of the app, and the time to the first prediction
+in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.benchmark_cold_start --repeat 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "cold_start.json")
+
+SCENARIOS: dict = {
+    "import app": "import app",
+    "import training stack": "import src.pipelines.training_pipeline",
+    "first prediction": (
+        "import numpy as np\n"
+        "import app\n"
+        "from src.utils.serving_model import get_serving_model\n"
+        "get_serving_model().predict(np.ones((1, 30)))"
+    ),
+}
+
+
+def time_scenario(code: str, repeat: int) -> dict:
+    timer = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - start)"
+    )
+    seconds = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", timer], capture_output=True, text=True, check=True
+        ).stdout
+        seconds.append(float(output.strip().splitlines()[-1]))
+    return {"median_seconds": float(np.median(seconds)), "runs": seconds}
+
+
+def slowest_imports(code: str, top: int) -> list:
+    """
+    Modules with the largest cumulative import time, from python -X importtime
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        imports.append({"module": name.strip(), "cumulative_us": int(cumulative)})
+    return sorted(imports, key=lambda item: -item["cumulative_us"])[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {
+        scenario: time_scenario(code, repeat=args.repeat)
+        for scenario, code in SCENARIOS.items()
+    }
+    results["slowest app imports"] = slowest_imports("import app", top=10)
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Reading a synthetic CSV dataset (1M rows by default, 1% of the values "na")
+with the bare pd.read_csv calls the components used to make and with the
+schema reader of src.utils.schema_csv, whole and in chunks. Reports the
+best wall time of each reader and the memory of the DataFrame it returns,
+of one chunk for the chunked readers.
+
+Usage:
+    python -m benchmarks.benchmark_csv_reader --rows 1000000 --chunk-size 100000
+"""
+import os
+import json
+import time
+import argparse
+import pandas as pd
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "csv_reader.json")
+DATASET_FILE_PATH: str = os.path.join("benchmarks", "results", "csv_reader.csv")
+
+
+def write_dataset(n_rows: int, file_path: str):
+    from src.utils.synthetic_data import iter_synthetic_dataset
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    for chunk_number, chunk in enumerate(
+        iter_synthetic_dataset(n_rows, missing_rate=0.01)
+    ):
+        chunk.to_csv(
+            file_path,
+            mode="w" if chunk_number == 0 else "a",
+            header=chunk_number == 0,
+            index=False,
+            na_rep="na",
+        )
+
+
+def measure(read, repeats: int) -> dict:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        rows, df = read()
+        best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": best,
+        "rows_per_second": rows / best,
+        "memory_mb": df.memory_usage(deep=True).sum() / 2**20,
+    }
+
+
+def read_whole(df: pd.DataFrame) -> tuple:
+    return len(df), df
+
+
+def read_chunks(chunks) -> tuple:
+    rows, first_chunk = 0, None
+    for chunk in chunks:
+        rows += len(chunk)
+        first_chunk = chunk if first_chunk is None else first_chunk
+    return rows, first_chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    from src.utils.schema_csv import iter_schema_csv, read_schema_csv
+
+    write_dataset(args.rows, DATASET_FILE_PATH)
+    readers = {
+        "pd.read_csv": lambda: read_whole(pd.read_csv(DATASET_FILE_PATH)),
+        "pd.read_csv na_values": lambda: read_whole(
+            pd.read_csv(DATASET_FILE_PATH, na_values=["na"])
+        ),
+        "read_schema_csv": lambda: read_whole(read_schema_csv(DATASET_FILE_PATH)),
+        "pd.read_csv chunks": lambda: read_chunks(
+            pd.read_csv(DATASET_FILE_PATH, chunksize=args.chunk_size, na_values=["na"])
+        ),
+        "iter_schema_csv chunks": lambda: read_chunks(
+            iter_schema_csv(DATASET_FILE_PATH, args.chunk_size)
+        ),
+    }
+    results = {}
+    for name, read in readers.items():
+        results[name] = measure(read, args.repeats)
+        print(name, json.dumps(results[name]))
+    os.remove(DATASET_FILE_PATH)
+
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
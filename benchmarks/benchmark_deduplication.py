@@ -0,0 +1,144 @@
+"""
+Row reduction and training speedup of deduplicating the train and test sets,
+on a synthetic dataset drawn with replacement from a pool of unique rows
+(Zipf distributed, as in the phishing collection). The same hash split is
+imputed, grid searched over the model zoo of the trainer and scored twice:
+on every row, and on the unique rows weighted by their counts. Reports the
+seconds of both runs and the test metrics of every model. A model fit with
+fixed hyperparameters matches, but the grid search folds (duplicates of a
+row fall into several folds of the full run), the KNN imputer fit on the
+unique rows and the early stopping of gradient boosting (on above 10k rows)
+can pick slightly different models.
+
+Usage:
+    python -m benchmarks.benchmark_deduplication --rows 200000 --unique-rows 5000
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "deduplication.json")
+
+
+def make_dataset(
+    n_rows: int, n_unique_rows: int, missing_rate: float, random_state: int = 42
+):
+    from src.utils.synthetic_data import generate_synthetic_dataset
+
+    pool = generate_synthetic_dataset(n_unique_rows, missing_rate=missing_rate)
+    random = np.random.default_rng(random_state)
+    return pool.iloc[random.zipf(1.3, n_rows) % n_unique_rows].reset_index(drop=True)
+
+
+def train(df_train, df_test, weighted: bool) -> dict:
+    """
+    Imputes, grid searches and scores every model, as the training pipeline
+    """
+    from sklearn.impute import KNNImputer
+    from src.components.model_trainer import ModelTrainer
+    from src.constants.training_pipeline import (
+        DATA_TRANSFORMATION_IMPUTER_PARAMS,
+        SAMPLE_WEIGHT_COLUMN,
+        TARGET_COLUMN,
+    )
+    from src.utils.classification_metrics import classification_scores
+    from src.utils.utils import evaluate_model
+
+    def split(df):
+        weights = df.pop(SAMPLE_WEIGHT_COLUMN).to_numpy() if weighted else None
+        return df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN].replace(-1, 0), weights
+
+    X_train, y_train, train_weights = split(df_train.copy())
+    X_test, y_test, test_weights = split(df_test.copy())
+
+    start = time.perf_counter()
+    imputer = KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS).fit(X_train)
+    X_train, X_test = imputer.transform(X_train), imputer.transform(X_test)
+    imputer_seconds = time.perf_counter() - start
+
+    models, params = ModelTrainer.model_zoo(n_features=X_train.shape[1])
+    start = time.perf_counter()
+    evaluate_model(
+        X_train=X_train,
+        y_train=y_train.to_numpy(),
+        X_test=X_test,
+        y_test=y_test.to_numpy(),
+        models=models,
+        param_grid=params,
+        train_weights=train_weights,
+        test_weights=test_weights,
+    )
+    search_seconds = time.perf_counter() - start
+    return {
+        "train_rows": len(X_train),
+        "imputer_seconds": imputer_seconds,
+        "grid_search_seconds": search_seconds,
+        "test_metrics": {
+            name: vars(
+                classification_scores(
+                    y_test, model.predict(X_test), sample_weight=test_weights
+                )
+            )
+            for name, model in models.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--unique-rows", type=int, default=5_000)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    from src.components.data_ingestion import DataIngestion
+    from src.constants.training_pipeline import (
+        DATA_INGESTION_SPLIT_HASH_KEY,
+        DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO,
+    )
+    from src.utils.deduplication import deduplicate
+
+    df = make_dataset(args.rows, args.unique_rows, args.missing_rate)
+    test_mask, _ = DataIngestion.hash_test_mask(
+        df, DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO, DATA_INGESTION_SPLIT_HASH_KEY
+    )
+    df_train, df_test = df[~test_mask], df[test_mask]
+
+    start = time.perf_counter()
+    df_train_unique, df_test_unique = deduplicate(df_train), deduplicate(df_test)
+    deduplication_seconds = time.perf_counter() - start
+
+    full = train(df_train, df_test, weighted=False)
+    deduplicated = train(df_train_unique, df_test_unique, weighted=True)
+    full_seconds = full["imputer_seconds"] + full["grid_search_seconds"]
+    deduplicated_seconds = (
+        deduplication_seconds
+        + deduplicated["imputer_seconds"]
+        + deduplicated["grid_search_seconds"]
+    )
+    results = {
+        "rows": len(df),
+        "train_rows": len(df_train),
+        "unique_train_rows": len(df_train_unique),
+        "row_reduction": 1 - len(df_train_unique) / len(df_train),
+        "deduplication_seconds": deduplication_seconds,
+        "speedup": full_seconds / deduplicated_seconds,
+        "full": full,
+        "deduplicated": deduplicated,
+        "max_test_metric_difference": max(
+            abs(full["test_metrics"][name][metric] - scores[metric])
+            for name, scores in deduplicated["test_metrics"].items()
+            for metric in scores
+        ),
+    }
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Measures the cost of a log call on the calling thread, as made once per
+/predict request, with the previous synchronous FileHandler setup against the
+queue based setup of src.logging.logger. Each setup runs in a fresh
+interpreter inside a temporary directory, so no log files are left behind.
+
+Usage:
+    python -m benchmarks.benchmark_logging --calls 20000
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "logging.json")
+
+SETUPS: dict = {
+    "synchronous file handler": (
+        "import logging\n"
+        "logging.basicConfig(\n"
+        "    filename='benchmark.log',\n"
+        "    format='[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s',\n"
+        "    level=logging.INFO,\n"
+        ")\n"
+    ),
+    "queue handler": "from src.logging.logger import logging\n",
+}
+
+TIMER: str = (
+    "import time\n"
+    "import numpy as np\n"
+    "seconds = np.empty({calls})\n"
+    "for call in range({calls}):\n"
+    "    start = time.perf_counter()\n"
+    "    logging.info(f'Scored {{call}} rows, latency tier standard')\n"
+    "    seconds[call] = time.perf_counter() - start\n"
+    "print(np.percentile(seconds, 50) * 1e6, np.percentile(seconds, 99) * 1e6, "
+    "seconds.sum())\n"
+)
+
+
+def time_setup(setup: str, calls: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run(
+            [sys.executable, "-c", setup + TIMER.format(calls=calls)],
+            cwd=directory,
+            env={**os.environ, "PYTHONPATH": os.getcwd()},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    p50, p99, total = map(float, output.split())
+    return {
+        "p50_us_per_call": p50,
+        "p99_us_per_call": p99,
+        "calls_per_second": calls / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {setup: time_setup(code, args.calls) for setup, code in SETUPS.items()}
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Grid search of the parallel candidates of ModelTrainer (logistic regression,
+KNN, random forest and histogram gradient boosting) on synthetic data, with
+every level of parallelism left at all the CPUs (GridSearchCV and estimators
+at n_jobs=-1, BLAS and OpenMP pools unlimited) and with the CPUs split by
+src.utils.parallelism, as evaluate_model does. Every CPU count is run on the
+first CPUs of the affinity mask of the process; counts above the CPUs of the
+machine are skipped. Reports the seconds of both runs and their test f1
+scores, which match.
+
+Usage:
+    python -m benchmarks.benchmark_parallelism --rows 50000 --cpus 8 32
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "parallelism.json")
+
+
+def models_and_params(n_features: int) -> tuple:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neighbors import KNeighborsClassifier
+    from src.utils.estimators import TernaryHistGradientBoostingClassifier
+
+    models = {
+        "Logistic Regression": LogisticRegression(random_state=42, n_jobs=-1),
+        "KNN": KNeighborsClassifier(n_jobs=-1),
+        "Random Forest": RandomForestClassifier(random_state=42, n_jobs=-1),
+        "Hist Gradient Boosting": TernaryHistGradientBoostingClassifier(
+            categorical_features=np.ones(n_features, dtype=bool),
+            early_stopping=True,
+            random_state=42,
+        ),
+    }
+    params = {
+        "Logistic Regression": {"C": [0.1], "max_iter": [1000]},
+        "KNN": {"n_neighbors": [3, 5]},
+        "Random Forest": {
+            "n_estimators": [100, 200],
+            "max_depth": [10],
+            "min_samples_split": [2],
+        },
+        "Hist Gradient Boosting": {
+            "learning_rate": [0.1, 0.05],
+            "max_iter": [300],
+            "max_leaf_nodes": [15, 31],
+            "l2_regularization": [0.0, 1.0],
+        },
+    }
+    return models, params
+
+
+def nested_search(X_train, y_train, X_test, y_test, models, param_grid) -> dict:
+    """
+    Grid search as evaluate_model used to run it, every level at all the CPUs
+    """
+    from sklearn.metrics import f1_score
+    from sklearn.model_selection import GridSearchCV
+
+    report = {}
+    for name, model in models.items():
+        gs = GridSearchCV(model, param_grid[name], cv=3, n_jobs=-1, refit=True)
+        gs.fit(X_train, y_train)
+        model.set_params(**gs.best_params_)
+        model.fit(X_train, y_train)
+        report[name] = f1_score(y_test, model.predict(X_test))
+    return report
+
+
+def measure(search, X_train, y_train, X_test, y_test) -> dict:
+    models, params = models_and_params(X_train.shape[1])
+    start = time.perf_counter()
+    report = search(
+        X_train=X_train,
+        y_train=y_train,
+        X_test=X_test,
+        y_test=y_test,
+        models=models,
+        param_grid=params,
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "test_f1_scores": {name: float(score) for name, score in report.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--cpus", type=int, nargs="+", default=[8, 32])
+    args = parser.parse_args()
+
+    from sklearn.model_selection import ParameterGrid
+    from src.utils.parallelism import plan_parallelism
+    from src.utils.utils import evaluate_model
+    from benchmarks.benchmark_boosting import make_ternary_dataset
+
+    X, y = make_ternary_dataset(n_rows=args.rows + 10_000)
+    X_train, y_train = X[: args.rows], y[: args.rows]
+    X_test, y_test = X[args.rows :], y[args.rows :]
+
+    affinity = sorted(os.sched_getaffinity(0))
+    results = {"rows": args.rows, "runs": {}}
+    for cpus in args.cpus:
+        if cpus > len(affinity):
+            print(f"Skipping {cpus} CPUs, {len(affinity)} available")
+            continue
+        os.sched_setaffinity(0, affinity[:cpus])
+        # evaluate_model counts the CPUs of the affinity mask itself
+        nested = measure(nested_search, X_train, y_train, X_test, y_test)
+        planned = measure(evaluate_model, X_train, y_train, X_test, y_test)
+        _, params = models_and_params(X_train.shape[1])
+        results["runs"][cpus] = {
+            "nested": nested,
+            "planned": planned,
+            "plans": {
+                name: vars(plan_parallelism(n_tasks=3 * len(ParameterGrid(grid))))
+                for name, grid in params.items()
+            },
+            "speedup": nested["seconds"] / planned["seconds"],
+        }
+        print(cpus, json.dumps(results["runs"][cpus], indent=2))
+    os.sched_setaffinity(0, affinity)
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
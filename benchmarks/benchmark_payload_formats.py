@@ -0,0 +1,101 @@
+"""
+Per-row cost of the /predict payload formats. For every format and batch
+size it reports the cost of the format alone (client encoding, server
+decoding and encoding of the predictions) and the end-to-end request cost
+through the in-process app. Formats whose optional dependency is missing
+are skipped.
+
+Usage:
+    python -m benchmarks.benchmark_payload_formats --batch-sizes 1 100 10000
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import httpx
+from benchmarks.load_test import PAYLOAD_ENCODERS, make_payloads, run_scenario
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "payload_formats.json")
+# The CSV upload with its HTML table is the baseline the others compare to
+FORMATS: tuple = ("csv", "csv-body", "arrow", "npy", "msgpack")
+
+
+def codec_seconds(payload_format: str, batch_size: int, repeats: int) -> float:
+    """
+    Best time of encoding a batch on the client and decoding it and encoding
+    its predictions on the server, without the model
+    """
+    from src.constants.training_pipeline import TARGET_COLUMN
+    from src.utils.payload_formats import decode_payload, encode_predictions, media_type
+    from src.utils.synthetic_data import generate_synthetic_dataset
+
+    df = generate_synthetic_dataset(batch_size).drop(columns=[TARGET_COLUMN])
+    feature_names = list(df.columns)
+    y_pred = np.ones(batch_size)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        request = PAYLOAD_ENCODERS[payload_format](df)
+        if "files" in request:
+            _, body, content_type = request["files"]["file"]
+        else:
+            body, content_type = request["content"], request["headers"]["Content-Type"]
+        content_type = media_type(content_type)
+        decode_payload(body, content_type, feature_names)
+        encode_predictions(y_pred, content_type)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def request_seconds(payload_format: str, batch_size: int, requests: int) -> float:
+    from app import app
+
+    payloads = make_payloads(batch_size, payload_format)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=60
+    ) as client:
+        await run_scenario(client, payloads, 1, 3, "standard")
+        result = await run_scenario(client, payloads, 1, requests, "standard")
+    if result["error_rate"]:
+        raise Exception(f"{payload_format} requests failed")
+    return result["p50_ms"] / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    from src.utils.payload_formats import UnsupportedPayloadFormat
+
+    results = {}
+    for payload_format in args.formats:
+        for batch_size in args.batch_sizes:
+            scenario = f"{payload_format} batch={batch_size}"
+            try:
+                codec = codec_seconds(payload_format, batch_size, args.repeats)
+            except (ImportError, UnsupportedPayloadFormat) as e:
+                print(f"Skipping {payload_format}: {e}")
+                break
+            request = asyncio.run(
+                request_seconds(payload_format, batch_size, args.requests)
+            )
+            results[scenario] = {
+                "codec_us_per_row": 1e6 * codec / batch_size,
+                "request_us_per_row": 1e6 * request / batch_size,
+            }
+            print(scenario, json.dumps(results[scenario]))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
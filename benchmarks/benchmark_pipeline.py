@@ -0,0 +1,190 @@
+"""
+End-to-end benchmark of the training pipeline on synthetic phishing data
+served from an in-memory Mongo stand-in. Every dataset size runs in a fresh
+interpreter inside a temporary directory; time and peak memory of each
+pipeline stage come from its run report. Above --batch-max-rows the model is
+trained incrementally, the batch model search does not scale past it.
+
+Usage:
+    python -m benchmarks.benchmark_pipeline --rows 10000 100000
+    python -m benchmarks.benchmark_pipeline --compare previous_pipeline.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "pipeline.json")
+REGRESSION_TOLERANCE: float = 0.2
+
+
+def run_worker(args):
+    """
+    Loads the synthetic dataset into the stand-in and runs the pipeline, in
+    the temporary directory of the parent process
+    """
+    from benchmarks.mongo_stand_in import InMemoryMongoClient
+    from src.constants.training_pipeline import (
+        DATA_INGESTION_COLLECTION_NAME,
+        DATA_INGESTION_DATABASE_NAME,
+    )
+    from src.pipelines.training_pipeline import TrainingPipeline
+    from src.utils.synthetic_data import iter_synthetic_dataset
+
+    start = time.perf_counter()
+    mongo_client = InMemoryMongoClient()
+    collection = mongo_client[DATA_INGESTION_DATABASE_NAME][
+        DATA_INGESTION_COLLECTION_NAME
+    ]
+    for chunk in iter_synthetic_dataset(
+        n_rows=args.rows[0],
+        phishing_ratio=args.phishing_ratio,
+        missing_rate=args.missing_rate,
+        drift=args.drift,
+    ):
+        collection.insert_many(chunk.to_dict(orient="records"))
+    load_seconds = time.perf_counter() - start
+
+    training_pipeline = TrainingPipeline(mongo_client=mongo_client)
+    training_pipeline.run_pipeline()
+    with open(training_pipeline.instrumentation_config.run_report_file_path) as file:
+        report = json.load(file)
+    report["load_seconds"] = load_seconds
+    print(json.dumps(report))
+
+
+def benchmark_rows(rows: int, args) -> dict:
+    repository_directory = os.getcwd()
+    environment = {
+        **os.environ,
+        "PYTHONPATH": repository_directory,
+        "MLFLOW_TRACKING_URI": "sqlite:///mlflow.db",
+        "MODEL_TRAINER_TRAINING_MODE": (
+            "batch" if rows <= args.batch_max_rows else "incremental"
+        ),
+        # Streamed and reproducible, unlike the in-memory random split
+        "DATA_INGESTION_SPLIT_MODE": "hash",
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(
+            os.path.join(repository_directory, "data_schema"),
+            os.path.join(directory, "data_schema"),
+        )
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.benchmark_pipeline",
+                "--worker",
+                "--rows",
+                str(rows),
+                "--phishing-ratio",
+                str(args.phishing_ratio),
+                "--missing-rate",
+                str(args.missing_rate),
+                "--drift",
+                str(args.drift),
+            ],
+            cwd=directory,
+            env=environment,
+            capture_output=True,
+            text=True,
+        )
+    if output.returncode != 0:
+        raise RuntimeError(f"Pipeline run of {rows} rows failed:\n{output.stderr}")
+    report = json.loads(output.stdout.strip().splitlines()[-1])
+
+    # Stages run more than once (e.g. transform of train and test) are summed
+    stages = {}
+    for stage in report["stages"]:
+        metrics = stages.setdefault(
+            stage["stage"],
+            {
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "peak_rss_bytes": 0,
+                "rows": None,
+            },
+        )
+        metrics["wall_seconds"] += stage["wall_seconds"]
+        metrics["cpu_seconds"] += stage["cpu_seconds"]
+        metrics["peak_rss_bytes"] = max(
+            metrics["peak_rss_bytes"], stage["peak_rss_bytes"]
+        )
+        if stage["rows"] is not None:
+            metrics["rows"] = (metrics["rows"] or 0) + stage["rows"]
+    return {
+        "training_mode": environment["MODEL_TRAINER_TRAINING_MODE"],
+        "split_mode": environment["DATA_INGESTION_SPLIT_MODE"],
+        "load_seconds": report["load_seconds"],
+        "wall_seconds": report["wall_seconds"],
+        "peak_rss_bytes": report["peak_rss_bytes"],
+        "stages": stages,
+    }
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """
+    Stages slower or bigger than in the baseline beyond the tolerance
+    """
+    regressions = []
+    for rows, result in results.items():
+        for stage, metrics in result["stages"].items():
+            previous = baseline.get(rows, {}).get("stages", {}).get(stage)
+            if previous is None:
+                continue
+            for metric in ("wall_seconds", "peak_rss_bytes"):
+                ratio = metrics[metric] / max(previous[metric], 1e-9)
+                if ratio > 1 + REGRESSION_TOLERANCE:
+                    regressions.append(
+                        {
+                            "rows": rows,
+                            "stage": stage,
+                            "metric": metric,
+                            "ratio": ratio,
+                        }
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--phishing-ratio", type=float, default=0.44)
+    parser.add_argument("--missing-rate", type=float, default=0.01)
+    parser.add_argument("--drift", type=float, default=0.0)
+    parser.add_argument(
+        "--batch-max-rows",
+        type=int,
+        default=10_000,
+        help="Largest dataset the batch model search runs on",
+    )
+    parser.add_argument("--compare", help="Previous results file to compare with")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    results = {str(rows): benchmark_rows(rows, args) for rows in args.rows}
+    print(json.dumps(results, indent=2))
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file))
+        print(json.dumps({"regressions": regressions}, indent=2))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Grid search of the ModelTrainer candidates with the local search backend and
+with the socket backend, on search workers started as local processes that
+stand in for the nodes of the training cluster. Reports the seconds of both
+searches, the parameters they pick and their test f1 scores, which match.
+Unweighted, and weighted as after deduplication, which ships the repeated
+rows of KNN as a second dataset.
+
+Usage:
+    python -m benchmarks.benchmark_search_backend --rows 20000 --workers 4
+"""
+import os
+import json
+import time
+import socket
+import argparse
+import multiprocessing
+import numpy as np
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "search_backend.json")
+AUTHKEY: bytes = b"benchmark"
+
+
+def free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
+
+
+def start_workers(n_workers: int) -> tuple:
+    """
+    Search worker processes on free local ports, and their addresses
+    """
+    from src.utils.search_backend import serve_search_worker
+
+    addresses = [("127.0.0.1", free_port()) for _ in range(n_workers)]
+    workers = [
+        multiprocessing.Process(
+            target=serve_search_worker, args=(address, AUTHKEY, 1), daemon=True
+        )
+        for address in addresses
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(1)
+    return workers, addresses
+
+
+def search(X_train, y_train, X_test, y_test, train_weights, test_weights, **kwargs):
+    from benchmarks.benchmark_parallelism import models_and_params
+    from src.utils.utils import evaluate_model
+
+    models, params = models_and_params(X_train.shape[1])
+    start = time.perf_counter()
+    report = evaluate_model(
+        X_train=X_train,
+        y_train=y_train,
+        X_test=X_test,
+        y_test=y_test,
+        models=models,
+        param_grid=params,
+        train_weights=train_weights,
+        test_weights=test_weights,
+        **kwargs,
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "best_params": {
+            name: {key: model.get_params()[key] for key in params[name]}
+            for name, model in models.items()
+        },
+        "test_f1_scores": {name: float(score) for name, score in report.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from benchmarks.benchmark_boosting import make_ternary_dataset
+    from src.utils.search_backend import SocketSearchBackend
+
+    X, y = make_ternary_dataset(n_rows=args.rows + 10_000)
+    X_train, y_train = X[: args.rows], y[: args.rows]
+    X_test, y_test = X[args.rows :], y[args.rows :]
+    random = np.random.default_rng(42)
+    weights = {
+        "unweighted": (None, None),
+        "weighted": (
+            random.integers(1, 5, len(X_train)).astype(np.float64),
+            random.integers(1, 5, len(X_test)).astype(np.float64),
+        ),
+    }
+
+    workers, addresses = start_workers(args.workers)
+    results = {"rows": args.rows, "workers": args.workers}
+    try:
+        for name, (train_weights, test_weights) in weights.items():
+            data = (X_train, y_train, X_test, y_test, train_weights, test_weights)
+            local = search(*data, cpus=args.workers)
+            with SocketSearchBackend(addresses=addresses, authkey=AUTHKEY) as backend:
+                remote = search(*data, cpus=args.workers, backend=backend)
+            results[name] = {
+                "local": local,
+                "socket": remote,
+                "match": local["best_params"] == remote["best_params"]
+                and local["test_f1_scores"] == remote["test_f1_scores"],
+            }
+            print(name, json.dumps(results[name], indent=2))
+    finally:
+        for worker in workers:
+            worker.terminate()
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
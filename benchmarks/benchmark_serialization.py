@@ -0,0 +1,159 @@
+"""
+Compares load time and per-worker memory of pickle and the memory-mappable
+format for the serving preprocessor and model. Workers load the objects
+concurrently and score a batch so the arrays are paged in before memory is read
+(RSS and PSS from /proc/self/smaps_rollup, Linux only).
+
+Usage:
+    python -m benchmarks.benchmark_serialization --workers 4
+    python -m benchmarks.benchmark_serialization --synthetic-rows 1000000
+"""
+import os
+import json
+import time
+import pickle
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+from src.constants.training_pipeline import (
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH,
+    MODEL_TRAINER_WARM_START_MODEL_FILE_PATH,
+)
+from src.utils.utils import (
+    load_preprocessor,
+    save_preprocessor,
+    load_object_mmap,
+    save_object_mmap,
+)
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "serialization.json")
+
+
+def read_memory_kilobytes() -> dict:
+    memory = {}
+    with open("/proc/self/smaps_rollup") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss"):
+                memory[key.lower() + "_kb"] = int(value.split()[0])
+    return memory
+
+
+def worker(load_format, preprocessor_file_path, model_file_path, barrier, results):
+    # Import the estimator modules up front so only deserialization is timed
+    import sklearn.pipeline, sklearn.impute, sklearn.linear_model  # noqa: F401
+    import sklearn.ensemble, sklearn.tree, sklearn.neighbors  # noqa: F401
+
+    load = load_object_mmap if load_format == "mmap" else load_preprocessor
+    start = time.perf_counter()
+    preprocessor = load(preprocessor_file_path)
+    model = load(model_file_path)
+    load_seconds = time.perf_counter() - start
+
+    X = np.random.default_rng(0).choice([-1.0, 0.0, 1.0], size=(256, 30))
+    X[:, 0] = np.nan
+    model.predict(preprocessor.transform(X))
+
+    # Memory is read once every worker holds the model
+    barrier.wait()
+    results.put({"load_seconds": load_seconds, **read_memory_kilobytes()})
+    barrier.wait()
+
+
+def make_synthetic_files(n_rows: int, directory: str):
+    from sklearn.impute import KNNImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.linear_model import LogisticRegression
+
+    random_generator = np.random.default_rng(42)
+    X = random_generator.choice([-1.0, 0.0, 1.0], size=(n_rows, 30))
+    y = (X[:, :8].sum(axis=1) > 0).astype(int)
+    preprocessor = Pipeline([("imputer", KNNImputer(n_neighbors=3))]).fit(X)
+    model = LogisticRegression().fit(X, y)
+
+    preprocessor_file_path = os.path.join(directory, "preprocessor.pkl")
+    model_file_path = os.path.join(directory, "model.pkl")
+    save_preprocessor(file_path=preprocessor_file_path, preprocessor=preprocessor)
+    save_preprocessor(file_path=model_file_path, preprocessor=model)
+    return preprocessor_file_path, model_file_path
+
+
+def run_workers(load_format, preprocessor_file_path, model_file_path, n_workers):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                load_format,
+                preprocessor_file_path,
+                model_file_path,
+                barrier,
+                results,
+            ),
+        )
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    worker_results = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "format": load_format,
+        "workers": n_workers,
+        "mean_load_seconds": float(
+            np.mean([result["load_seconds"] for result in worker_results])
+        ),
+        "mean_rss_kb": float(np.mean([result["rss_kb"] for result in worker_results])),
+        "mean_pss_kb": float(np.mean([result["pss_kb"] for result in worker_results])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--synthetic-rows",
+        type=int,
+        default=None,
+        help="Benchmark a KNN imputer fitted on synthetic rows instead of models/",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.synthetic_rows:
+            preprocessor_file_path, model_file_path = make_synthetic_files(
+                n_rows=args.synthetic_rows, directory=directory
+            )
+        else:
+            preprocessor_file_path = DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH
+            model_file_path = MODEL_TRAINER_WARM_START_MODEL_FILE_PATH
+
+        file_paths = {"pickle": (preprocessor_file_path, model_file_path)}
+        file_paths["mmap"] = tuple(
+            os.path.join(directory, os.path.basename(file_path) + ".mmap")
+            for file_path in file_paths["pickle"]
+        )
+        for pickle_file_path, mmap_file_path in zip(
+            file_paths["pickle"], file_paths["mmap"]
+        ):
+            save_object_mmap(
+                file_path=mmap_file_path, obj=load_preprocessor(pickle_file_path)
+            )
+
+        results = []
+        for load_format in ("pickle", "mmap"):
+            result = run_workers(load_format, *file_paths[load_format], args.workers)
+            print(json.dumps(result))
+            results.append(result)
+
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Load test of /predict: concurrent clients post synthetic payloads for a fixed
+number of requests per scenario and report latency percentiles, throughput
+and error rate. The app is driven in-process through its ASGI interface by
+default, or over HTTP with --url (e.g. a uvicorn or gunicorn fleet).
+
+In-process, requests share one event loop with the app: the numbers measure
+the per-request cost of the serving path, not the parallelism of a fleet.
+
+Usage:
+    python -m benchmarks.load_test --batch-sizes 1 100 --concurrency 1 8
+    python -m benchmarks.load_test --payload-format arrow
+    python -m benchmarks.load_test --url http://localhost:8000 --save-baseline
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import httpx
+
+RESULTS_FILE_PATH: str = os.path.join("benchmarks", "results", "load_test.json")
+BASELINE_FILE_PATH: str = os.path.join(
+    "benchmarks", "results", "load_test_baseline.json"
+)
+PREDICT_PATH: str = "/predict"
+UPLOAD_TEMPLATE_FILE_PATH: str = os.path.join("templates", "table.html")
+
+
+def write_csv(df) -> bytes:
+    return df.to_csv(index=False).encode()
+
+
+def write_arrow(df) -> bytes:
+    import pyarrow
+    import pyarrow.ipc
+
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_npy(df) -> bytes:
+    """
+    int8 matrix without missing values, float32 with NaN otherwise
+    """
+    dtype = np.float32 if df.isna().to_numpy().any() else np.int8
+    buffer = io.BytesIO()
+    np.save(buffer, df.to_numpy(dtype=dtype), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def write_msgpack(df) -> bytes:
+    """
+    Columns without missing values as int8 bins, the others as arrays
+    """
+    import msgpack
+
+    return msgpack.packb(
+        {
+            name: (
+                column.to_numpy(dtype=np.int8).tobytes()
+                if not column.isna().any()
+                else [None if value != value else value for value in column.tolist()]
+            )
+            for name, column in df.items()
+        }
+    )
+
+
+def encode_csv(df) -> dict:
+    """
+    CSV file upload, the original /predict contract with an HTML response
+    """
+    return {"files": {"file": ("payload.csv", write_csv(df), "text/csv")}}
+
+
+def encode_body(write, content_type: str):
+    """
+    Request body in a payload format, answered in the same format
+    """
+    return lambda df: {
+        "content": write(df),
+        "headers": {"Content-Type": content_type},
+    }
+
+
+PAYLOAD_ENCODERS: dict = {
+    "csv": encode_csv,
+    "csv-body": encode_body(write_csv, "text/csv"),
+    "arrow": encode_body(write_arrow, "application/vnd.apache.arrow.stream"),
+    "npy": encode_body(write_npy, "application/x-npy"),
+    "msgpack": encode_body(write_msgpack, "application/msgpack"),
+}
+
+
+def make_payloads(batch_size: int, payload_format: str, count: int = 16) -> list:
+    """
+    A few distinct payloads per batch size, so caches don't serve every request
+    """
+    from src.constants.training_pipeline import TARGET_COLUMN
+    from src.utils.synthetic_data import generate_synthetic_dataset
+
+    df = generate_synthetic_dataset(batch_size * count, missing_rate=0.01)
+    df = df.drop(columns=[TARGET_COLUMN])
+    encode = PAYLOAD_ENCODERS[payload_format]
+    return [
+        encode(df.iloc[index * batch_size : (index + 1) * batch_size])
+        for index in range(count)
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    payloads: list,
+    concurrency: int,
+    requests: int,
+    latency_tier: str,
+) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for request_number in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    "POST",
+                    PREDICT_PATH,
+                    params={"latency_tier": latency_tier},
+                    **payloads[request_number % len(payloads)],
+                )
+                failed = response.status_code != 200
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = 1e3 * np.array(latencies)
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "requests_per_second": requests / elapsed,
+        "error_rate": errors / requests,
+    }
+
+
+async def run_load_test(args) -> dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        from app import app
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url = "http://load-test"
+
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=args.timeout
+    ) as client:
+        for batch_size in args.batch_sizes:
+            payloads = make_payloads(batch_size, args.payload_format)
+            # Warm up: model loading and first call costs are not measured
+            await run_scenario(client, payloads, 1, 3, args.latency_tier)
+            for concurrency in args.concurrency:
+                scenario = (
+                    f"{args.payload_format} batch={batch_size} "
+                    f"concurrency={concurrency} tier={args.latency_tier}"
+                )
+                result = await run_scenario(
+                    client, payloads, concurrency, args.requests, args.latency_tier
+                )
+                result["rows_per_second"] = result["requests_per_second"] * batch_size
+                results[scenario] = result
+                print(scenario, json.dumps(result))
+    return results
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """
+    Relative change of each metric against the baseline, per scenario
+    """
+    return {
+        scenario: {
+            metric: value / baseline[scenario][metric] - 1
+            for metric, value in result.items()
+            if baseline[scenario].get(metric)
+        }
+        for scenario, result in results.items()
+        if scenario in baseline
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Server to load, in-process app when omitted")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--payload-format", choices=sorted(PAYLOAD_ENCODERS), default="csv-body"
+    )
+    parser.add_argument("--latency-tier", default="standard")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--baseline", default=BASELINE_FILE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Also save the results as the baseline of the next runs",
+    )
+    args = parser.parse_args()
+    # The upload is answered with an HTML table rendered from the template
+    if (
+        args.payload_format == "csv"
+        and not args.url
+        and not os.path.exists(UPLOAD_TEMPLATE_FILE_PATH)
+    ):
+        parser.error(f"--payload-format csv needs {UPLOAD_TEMPLATE_FILE_PATH}")
+
+    results = asyncio.run(run_load_test(args))
+    os.makedirs(os.path.dirname(RESULTS_FILE_PATH), exist_ok=True)
+    with open(RESULTS_FILE_PATH, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            changes = compare(results, json.load(file))
+        print(json.dumps({"change_against_baseline": changes}, indent=2))
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if any(result["error_rate"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+In-memory stand-in for the parts of pymongo used by DataIngestion, push_data,
+batch scoring and the pre-screen build, so they can be benchmarked without a
+Mongo server.
+"""
+from types import SimpleNamespace
+
+
+class InMemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.documents = {}
+
+    def insert_many(self, documents: list):
+        start = len(self.documents)
+        inserted_ids = []
+        for identifier, document in enumerate(documents, start=start):
+            self.documents[identifier] = {"_id": identifier, **document}
+            inserted_ids.append(identifier)
+        return SimpleNamespace(inserted_ids=inserted_ids)
+
+    @staticmethod
+    def _matches(document: dict, filter: dict) -> bool:
+        """
+        Only equality and {"$exists": bool} conditions are supported
+        """
+        for field, condition in (filter or {}).items():
+            if isinstance(condition, dict):
+                if set(condition) != {"$exists"}:
+                    raise NotImplementedError(f"Unsupported condition: {condition}")
+                if (field in document) != condition["$exists"]:
+                    return False
+            elif document.get(field) != condition:
+                return False
+        return True
+
+    def find(self, filter: dict = None, projection: dict = None, batch_size: int = None):
+        """
+        Only inclusion projections are supported
+        """
+        fields = [field for field, include in (projection or {}).items() if include]
+        return (
+            {field: document[field] for field in fields if field in document}
+            if fields
+            else dict(document)
+            for document in list(self.documents.values())
+            if self._matches(document, filter)
+        )
+
+    def count_documents(self, filter: dict) -> int:
+        return sum(self._matches(document, filter) for document in self.documents.values())
+
+    def bulk_write(self, operations: list, ordered: bool = True):
+        """
+        UpdateOne operations with an _id filter and a $set update
+        """
+        modified_count = 0
+        for operation in operations:
+            document = self.documents.get(operation._filter["_id"])
+            if document is not None:
+                document.update(operation._doc["$set"])
+                modified_count += 1
+        return SimpleNamespace(modified_count=modified_count)
+
+
+class InMemoryDatabase(dict):
+    def __missing__(self, name: str) -> InMemoryCollection:
+        self[name] = InMemoryCollection(name)
+        return self[name]
+
+
+class InMemoryMongoClient(dict):
+    def __missing__(self, name: str) -> InMemoryDatabase:
+        self[name] = InMemoryDatabase()
+        return self[name]
+
+    def close(self):
+        pass
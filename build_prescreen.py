@@ -0,0 +1,50 @@
+"""
+Builds the pre-screen of known phishing and known legitimate hosts from a
+Mongo collection of labeled URLs. Serving workers pick up a new build on
+their next request.
+
+Usage:
+    python build_prescreen.py
+    python build_prescreen.py --mongo-collection url_verdicts --false-positive-rate 0.001
+"""
+import os
+import argparse
+from dotenv import load_dotenv
+from src.constants.training_pipeline import (
+    DATA_INGESTION_DATABASE_NAME,
+    PRESCREEN_COLLECTION_NAME,
+    PRESCREEN_DIRECTORY,
+    PRESCREEN_FALSE_POSITIVE_RATE,
+    PRESCREEN_LABEL_FIELD,
+    PRESCREEN_URL_FIELD,
+)
+from src.utils.prescreen import build_prescreen_from_collection
+
+load_dotenv()
+MONGODB_URI = os.getenv("MONGODB_URI")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-database", default=DATA_INGESTION_DATABASE_NAME)
+    parser.add_argument("--mongo-collection", default=PRESCREEN_COLLECTION_NAME)
+    parser.add_argument("--url-field", default=PRESCREEN_URL_FIELD)
+    parser.add_argument("--label-field", default=PRESCREEN_LABEL_FIELD)
+    parser.add_argument("--output", default=PRESCREEN_DIRECTORY)
+    parser.add_argument(
+        "--false-positive-rate", type=float, default=PRESCREEN_FALSE_POSITIVE_RATE
+    )
+    args = parser.parse_args()
+
+    import pymongo
+
+    mongo_client = pymongo.MongoClient(MONGODB_URI)
+    manifest = build_prescreen_from_collection(
+        mongo_client[args.mongo_database][args.mongo_collection],
+        directory=args.output,
+        url_field=args.url_field,
+        label_field=args.label_field,
+        false_positive_rate=args.false_positive_rate,
+    )
+    for name, entry in manifest["sets"].items():
+        print(f"{name}: {entry['hosts']} hosts")
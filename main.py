@@ -1,16 +1,23 @@
 from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
 from src.components.data_transformation import DataTransformation
+from src.components.feature_selection import FeatureSelection
 from src.components.model_trainer import ModelTrainer
 from src.entity.config_entity import (
     TrainingPipelineConfig,
     DataIngestionConfig,
     DataValidationConfig,
     DataTransformationConfig,
+    FeatureSelectionConfig,
     ModelTrainerConfig,
+    ArtifactStoreConfig,
+    InstrumentationConfig,
 )
+from src.entity.artifact_entity import DataTransformationArtifact
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
+from src.utils.instrumentation import instrument, run_report
+from src.utils.artifact_store import archive_run
 import sys
 
 if __name__ == "__main__":
@@ -26,48 +33,100 @@ if __name__ == "__main__":
         data_transformation_config = DataTransformationConfig(
             training_pipeline_config=training_pipeline_config
         )
+        feature_selection_config = FeatureSelectionConfig(
+            training_pipeline_config=training_pipeline_config
+        )
         model_trainer_config = ModelTrainerConfig(
             training_pipeline_config=training_pipeline_config
         )
+        artifact_store_config = ArtifactStoreConfig(
+            training_pipeline_config=training_pipeline_config
+        )
+        instrumentation_config = InstrumentationConfig(
+            training_pipeline_config=training_pipeline_config
+        )
 
-        # Data Ingestion
-        logging.info("=== INITIATING DATA INGESTION PROCESS ===")
-        data_ingestion = DataIngestion(data_ingestion_config=data_ingestion_config)
-        data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
-        print(data_ingestion_artifact)
-        logging.info("=== DATA INGESTION PROCESS COMPLETED ===")
+        with run_report(
+            report_file_path=instrumentation_config.run_report_file_path,
+            profile_directory=instrumentation_config.profile_directory,
+        ):
+            # Data Ingestion
+            logging.info("=== INITIATING DATA INGESTION PROCESS ===")
+            data_ingestion = DataIngestion(data_ingestion_config=data_ingestion_config)
+            with instrument("data_ingestion"):
+                data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
+            print(data_ingestion_artifact)
+            logging.info("=== DATA INGESTION PROCESS COMPLETED ===")
 
-        # Data Validation
-        logging.info("=== INITIATING DATA VALIDATION PROCESS ===")
-        data_validation = DataValidation(
-            data_ingestion_artifact=data_ingestion_artifact,
-            data_validation_config=data_validation_config,
-        )
-        data_validation_artifact = data_validation.initiate_data_validation()
-        print(data_validation_artifact)
-        logging.info("=== DATA VALIDATION PROCESS COMPLETED ===")
+            # Data Validation
+            logging.info("=== INITIATING DATA VALIDATION PROCESS ===")
+            data_validation = DataValidation(
+                data_ingestion_artifact=data_ingestion_artifact,
+                data_validation_config=data_validation_config,
+            )
+            with instrument("data_validation"):
+                data_validation_artifact = data_validation.initiate_data_validation()
+            print(data_validation_artifact)
+            logging.info("=== DATA VALIDATION PROCESS COMPLETED ===")
 
-        # Data Transformation
-        logging.info("=== INITIATING DATA TRANSFORMATION PROCESS ===")
-        data_transformation = DataTransformation(
-            data_validation_artifact=data_validation_artifact,
-            data_transformation_config=data_transformation_config,
-        )
-        data_transformation_artifact = (
-            data_transformation.initiate_data_transformation()
-        )
-        print(data_transformation_artifact)
-        logging.info("=== DATA TRANSFORMATION PROCESS COMPLETED ===")
+            # Incremental training streams the feature store and fits its own
+            # preprocessor on a sample, nothing is loaded whole
+            data_transformation_artifact = None
+            if model_trainer_config.training_mode != "incremental":
+                # Data Transformation
+                logging.info("=== INITIATING DATA TRANSFORMATION PROCESS ===")
+                data_transformation = DataTransformation(
+                    data_validation_artifact=data_validation_artifact,
+                    data_transformation_config=data_transformation_config,
+                )
+                with instrument("data_transformation"):
+                    data_transformation_artifact = (
+                        data_transformation.initiate_data_transformation()
+                    )
+                print(data_transformation_artifact)
+                logging.info("=== DATA TRANSFORMATION PROCESS COMPLETED ===")
 
-        # Model Trainer
-        logging.info("=== INITIATING MODEL TRAINING PROCESS ===")
-        model_trainer = ModelTrainer(
-            model_trainer_config=model_trainer_config,
-            data_transformation_artifact=data_transformation_artifact,
-        )
-        model_trainer_artifact = model_trainer.initiate_model_trainer()
-        print(model_trainer_artifact)
-        logging.info("=== MODEL TRAINING PROCESS COMPLETED ===")
+                # Feature Selection
+                if feature_selection_config.enabled:
+                    logging.info("=== INITIATING FEATURE SELECTION PROCESS ===")
+                    feature_selection = FeatureSelection(
+                        data_validation_artifact=data_validation_artifact,
+                        data_transformation_artifact=data_transformation_artifact,
+                        feature_selection_config=feature_selection_config,
+                    )
+                    with instrument("feature_selection"):
+                        feature_selection_artifact = (
+                            feature_selection.initiate_feature_selection()
+                        )
+                    print(feature_selection_artifact)
+                    data_transformation_artifact = DataTransformationArtifact(
+                        transformed_train_file_path=feature_selection_artifact.transformed_train_file_path,
+                        transformed_test_file_path=feature_selection_artifact.transformed_test_file_path,
+                        preprocessor_file_path=feature_selection_artifact.preprocessor_file_path,
+                        # Feature selection keeps the rows, and so their weights
+                        train_weight_file_path=data_transformation_artifact.train_weight_file_path,
+                        test_weight_file_path=data_transformation_artifact.test_weight_file_path,
+                        validated_train_file_path=data_transformation_artifact.validated_train_file_path,
+                        validated_test_file_path=data_transformation_artifact.validated_test_file_path,
+                    )
+                    logging.info("=== FEATURE SELECTION PROCESS COMPLETED ===")
+
+            # Model Trainer
+            logging.info("=== INITIATING MODEL TRAINING PROCESS ===")
+            model_trainer = ModelTrainer(
+                model_trainer_config=model_trainer_config,
+                data_transformation_artifact=data_transformation_artifact,
+            )
+            with instrument("model_trainer"):
+                model_trainer_artifact = model_trainer.initiate_model_trainer()
+            print(model_trainer_artifact)
+            logging.info("=== MODEL TRAINING PROCESS COMPLETED ===")
+
+            # Artifact Store
+            if artifact_store_config.enabled:
+                with instrument("artifact_store"):
+                    artifact_store_report = archive_run(artifact_store_config)
+                print(artifact_store_report)
 
     except Exception as e:
         logging.error("Something failed in the Data Ingestion Process")
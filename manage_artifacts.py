@@ -0,0 +1,66 @@
+"""
+Shows or manages the artifact store of the training runs. Every run gets a
+manifest of its files; the newest runs keep their files, older ones are
+stored and keep only their manifest, and runs past the retention are deleted.
+
+Usage:
+    python manage_artifacts.py --usage
+    python manage_artifacts.py --prune
+    python manage_artifacts.py --restore artifacts/<timestamp>
+"""
+import os
+import json
+import argparse
+from src.constants.training_pipeline import (
+    ARTIFACT_DIRECTORY,
+    ARTIFACT_STORE_COMPRESSION,
+    ARTIFACT_STORE_DIRECTORY_NAME,
+    ARTIFACT_STORE_KEEP_MATERIALIZED_RUNS,
+    ARTIFACT_STORE_KEEP_RUNS,
+)
+from src.utils.artifact_store import (
+    ArtifactStore,
+    disk_usage,
+    registered_model_file_paths,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--usage", action="store_true")
+    action.add_argument("--prune", action="store_true", help="Apply the retention")
+    action.add_argument("--restore", help="Run directory to restore the files of")
+    parser.add_argument("--keep-runs", type=int, default=ARTIFACT_STORE_KEEP_RUNS)
+    parser.add_argument(
+        "--keep-materialized-runs",
+        type=int,
+        default=ARTIFACT_STORE_KEEP_MATERIALIZED_RUNS,
+    )
+    args = parser.parse_args()
+
+    store_directory = os.path.join(ARTIFACT_DIRECTORY, ARTIFACT_STORE_DIRECTORY_NAME)
+    artifact_store = ArtifactStore(
+        store_directory=store_directory, compression=ARTIFACT_STORE_COMPRESSION
+    )
+    if args.restore:
+        print(f"Restored {artifact_store.restore_run(args.restore)} files")
+    elif args.prune:
+        print(
+            artifact_store.apply_retention(
+                artifact_directory=ARTIFACT_DIRECTORY,
+                keep_runs=args.keep_runs,
+                keep_materialized_runs=args.keep_materialized_runs,
+                keep_file_paths=registered_model_file_paths(),
+            )
+        )
+    else:
+        print(
+            json.dumps(
+                {
+                    "artifact_directory_bytes": disk_usage(ARTIFACT_DIRECTORY),
+                    "store_bytes": disk_usage(store_directory),
+                },
+                indent=2,
+            )
+        )
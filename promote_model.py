@@ -0,0 +1,42 @@
+"""
+Shows or changes the model registry of the serving workers. A training run
+with TRAINING_DEPLOYMENT=shadow registers its model as the candidate; the
+workers score a sample of live batches with it, see GET /shadow. Promoting
+flips the candidate and the primary, and promoting again rolls back.
+
+Usage:
+    python promote_model.py --show
+    python promote_model.py --promote
+    python promote_model.py --register artifacts/<timestamp>/model_trainer/trained_model/model.pkl
+    python promote_model.py --sample-rate 0.05
+"""
+import argparse
+import yaml
+from src.utils.model_registry import (
+    promote_candidate,
+    read_registry,
+    register_candidate,
+    write_registry,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--show", action="store_true")
+    action.add_argument("--promote", action="store_true")
+    action.add_argument("--register", help="ModelEstimator pickle to shadow")
+    action.add_argument("--sample-rate", type=float, help="Share of batches shadowed")
+    args = parser.parse_args()
+
+    if args.promote:
+        registry = promote_candidate()
+    elif args.register:
+        registry = register_candidate(args.register)
+    elif args.sample_rate is not None:
+        registry = read_registry()
+        registry["shadow_sample_rate"] = args.sample_rate
+        write_registry(registry)
+    else:
+        registry = read_registry()
+    print(yaml.safe_dump(registry), end="")
@@ -2,11 +2,11 @@ import os
 import sys
 from dotenv import load_dotenv
 import certifi
-import pandas as pd
 import pymongo
 import pymongo.mongo_client
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
+from src.utils.schema_csv import read_schema_csv
 
 load_dotenv()
 
@@ -38,7 +38,7 @@ class MongoETL:
         """
         logging.info("Initiating format transformation from CSV to JSON for MongoDB")
         try:
-            data = pd.read_csv(file_path)
+            data = read_schema_csv(file_path)
             self.records = data.to_dict(orient="records")
             return self.records
         except Exception as e:
@@ -0,0 +1,39 @@
+"""
+Search worker of the socket search backend: runs the grid search fits of a
+training on another node. Start one worker per group of CPUs of every node
+and point the training at them; workers and training share the authkey.
+Tasks arrive pickled, so only expose workers to the training network.
+
+Usage:
+    MODEL_TRAINER_SEARCH_AUTHKEY=<secret> python search_worker.py --port 7000 --threads 4
+
+    MODEL_TRAINER_SEARCH_BACKEND=socket \\
+    MODEL_TRAINER_SEARCH_WORKERS=node-1:7000,node-1:7001,node-2:7000 \\
+    MODEL_TRAINER_SEARCH_AUTHKEY=<secret> python main.py
+"""
+import os
+import argparse
+from dotenv import load_dotenv
+from src.constants.training_pipeline import SEARCH_WORKER_PORT
+from src.utils.search_backend import serve_search_worker
+
+load_dotenv()
+MODEL_TRAINER_SEARCH_AUTHKEY = os.getenv("MODEL_TRAINER_SEARCH_AUTHKEY")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=SEARCH_WORKER_PORT)
+    parser.add_argument(
+        "--threads", type=int, default=None, help="BLAS and OpenMP threads per fit"
+    )
+    args = parser.parse_args()
+
+    if not MODEL_TRAINER_SEARCH_AUTHKEY:
+        parser.error("MODEL_TRAINER_SEARCH_AUTHKEY must be set")
+    serve_search_worker(
+        address=(args.host, args.port),
+        authkey=MODEL_TRAINER_SEARCH_AUTHKEY.encode(),
+        threads=args.threads,
+    )
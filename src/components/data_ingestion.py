@@ -2,6 +2,7 @@ from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
 import os
 import sys
+import itertools
 import pandas as pd
 import numpy as np
 import pymongo
@@ -10,40 +11,74 @@ from dotenv import load_dotenv
 
 # Configurations for data ingestion
 from src.entity.config_entity import DataIngestionConfig
+from src.constants.training_pipeline import (
+    DATA_INGESTION_SPLIT_HASH,
+    SAMPLE_WEIGHT_COLUMN,
+    TARGET_COLUMN,
+)
 
 # Artifacts for data ingestion
 from src.entity.artifact_entity import DataIngestionArtifact
+from src.utils.instrumentation import instrument
+from src.utils.deduplication import deduplicate, pack_rows
+from src.utils.schema_csv import iter_schema_csv
 
 load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI")
 
 
 class DataIngestion:
-    def __init__(self, data_ingestion_config: DataIngestionConfig):
+    def __init__(self, data_ingestion_config: DataIngestionConfig, mongo_client=None):
         try:
             self.data_ingestion_config = data_ingestion_config
+            # A client can be injected, e.g. a local stand-in for benchmarks
+            self.mongo_client = mongo_client
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
+    def _collection(self):
+        database_name = self.data_ingestion_config.database_name
+        collection_name = self.data_ingestion_config.collection_name
+        if self.mongo_client is None:
+            self.mongo_client = pymongo.MongoClient(MONGODB_URI)
+        return self.mongo_client[database_name][collection_name]
+
+    @staticmethod
+    def _documents_as_dataframe(documents: list) -> pd.DataFrame:
+        dataframe = pd.DataFrame(documents)
+        if "_id" in dataframe.columns.to_list():
+            dataframe = dataframe.drop(columns=["_id"])
+        return dataframe.replace({"na": np.nan})
+
     def import_collection_as_dataframe(self):
         """
         Read data from MongoDB and format it as a DataFrame
         """
         try:
-            database_name = self.data_ingestion_config.database_name
-            collection_name = self.data_ingestion_config.collection_name
-            self.mongo_client = pymongo.MongoClient(MONGODB_URI)
-            collection = self.mongo_client[database_name][collection_name]
+            collection = self._collection()
 
-            dataframe = pd.DataFrame(list(collection.find()))
-            if "_id" in dataframe.columns.to_list():
-                dataframe = dataframe.drop(columns=["_id"])
-
-            dataframe = dataframe.replace({"na": np.nan})
+            with instrument("import_collection_as_dataframe") as stage:
+                dataframe = self._documents_as_dataframe(list(collection.find()))
+                stage["rows"] = len(dataframe)
             return dataframe
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
+    def iter_collection_chunks(self):
+        """
+        Read data from MongoDB as DataFrame chunks of chunk_size documents
+        """
+        try:
+            chunk_size = self.data_ingestion_config.chunk_size
+            cursor = self._collection().find(batch_size=min(chunk_size, 10_000))
+            while True:
+                documents = list(itertools.islice(cursor, chunk_size))
+                if not documents:
+                    return
+                yield self._documents_as_dataframe(documents)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
     def export_data_into_feature_store(self, dataframe: pd.DataFrame):
         """
         Saves data into the feature store
@@ -57,6 +92,226 @@ class DataIngestion:
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
+    def export_chunks_into_feature_store(self, chunks):
+        """
+        Saves a stream of DataFrame chunks into the feature store as they pass
+        through; the file replaces the previous one once the stream is done
+        """
+        try:
+            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+            os.makedirs(os.path.dirname(feature_store_file_path), exist_ok=True)
+            temporary_file_path = f"{feature_store_file_path}.tmp"
+            for chunk_number, chunk in enumerate(chunks):
+                chunk.to_csv(
+                    temporary_file_path,
+                    mode="w" if chunk_number == 0 else "a",
+                    index=False,
+                    header=chunk_number == 0,
+                )
+                yield chunk
+            os.replace(temporary_file_path, feature_store_file_path)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @staticmethod
+    def hash_fractions(dataframe: pd.DataFrame, hash_key: str) -> np.array:
+        """
+        A uniform fraction in [0, 1) for each record, by a hash of its feature
+        values. Values are hashed as float64 in column name order, so a record
+        hashes the same from Mongo or from a CSV file.
+        """
+        try:
+            features = dataframe.drop(
+                columns=[TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN], errors="ignore"
+            )
+            hashes = pd.util.hash_pandas_object(
+                features[sorted(features.columns)].astype("float64"),
+                index=False,
+                hash_key=hash_key,
+            ).to_numpy()
+            # The top 53 bits of the hash, as a fraction
+            return (hashes >> np.uint64(11)) / 2**53
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @staticmethod
+    def hash_test_mask(
+        dataframe: pd.DataFrame,
+        test_ratio: float,
+        hash_key: str,
+        key_counts: dict = None,
+        class_counts: dict = None,
+    ) -> tuple:
+        """
+        Whether each record belongs to the test set, stratified on the target:
+        records new to the split are taken in the order of their hash
+        fractions and sent, identical records together, to the side that
+        keeps the share of their class in the test set closest to the ratio.
+        Records seen before keep their side. key_counts (the count of every
+        record key on each side, in the order records were first seen) and
+        class_counts (the rows of each class on each side) carry the split
+        from one chunk to the next and are updated. Returns the test mask and
+        the mask of the first occurrences of new records.
+        """
+        try:
+            if key_counts is None:
+                key_counts = {"train": {}, "test": {}}
+            if class_counts is None:
+                class_counts = {"train": {}, "test": {}}
+            records = dataframe.drop(columns=[SAMPLE_WEIGHT_COLUMN], errors="ignore")
+            keys, first_positions, inverse, counts = np.unique(
+                pack_rows(records),
+                return_index=True,
+                return_inverse=True,
+                return_counts=True,
+            )
+            labels = dataframe[TARGET_COLUMN].to_numpy()[first_positions].tolist()
+            counts = counts.tolist()
+            group_test = np.zeros(len(keys), dtype=bool)
+            new_groups = []
+            for group, key in enumerate(keys.tolist()):
+                if key in key_counts["test"]:
+                    group_test[group] = True
+                elif key not in key_counts["train"]:
+                    new_groups.append(group)
+                    continue
+                side = "test" if group_test[group] else "train"
+                key_counts[side][key] += counts[group]
+                class_counts[side][labels[group]] = (
+                    class_counts[side].get(labels[group], 0) + counts[group]
+                )
+
+            new_groups = np.array(new_groups, dtype=np.int64)
+            fractions = DataIngestion.hash_fractions(
+                dataframe.iloc[first_positions[new_groups]], hash_key=hash_key
+            )
+            for group in new_groups[np.argsort(fractions, kind="stable")].tolist():
+                label, count = labels[group], counts[group]
+                test_rows = class_counts["test"].get(label, 0)
+                rows = test_rows + class_counts["train"].get(label, 0) + count
+                # Closer to the ratio with the records in the test set than without
+                group_test[group] = test_rows + count / 2 < test_ratio * rows
+                side = "test" if group_test[group] else "train"
+                class_counts[side][label] = class_counts[side].get(label, 0) + count
+
+            # New keys in the order of their first occurrence, as they are written
+            new_groups = new_groups[np.argsort(first_positions[new_groups])]
+            for group in new_groups.tolist():
+                side = "test" if group_test[group] else "train"
+                key_counts[side][keys[group].item()] = counts[group]
+            new_rows = np.zeros(len(dataframe), dtype=bool)
+            new_rows[first_positions[new_groups]] = True
+            return group_test[inverse.reshape(-1)], new_rows
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def deduplicate_rows(self, dataframe: pd.DataFrame, name: str) -> pd.DataFrame:
+        """
+        Collapses the identical (features, label) rows of a set into one row
+        weighted by their count, when deduplication is enabled
+        """
+        try:
+            if not self.data_ingestion_config.deduplicate:
+                return dataframe
+            with instrument(f"deduplicate[{name}]", rows=len(dataframe)):
+                unique_rows = deduplicate(dataframe)
+            rows = int(unique_rows[SAMPLE_WEIGHT_COLUMN].sum())
+            logging.info(
+                f"Deduplicated {name} set: {rows} rows into {len(unique_rows)} "
+                "unique rows"
+            )
+            return unique_rows
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def split_chunks_train_test(self, chunks) -> dict:
+        """
+        Stratified hash split of a stream of DataFrame chunks, e.g.
+        iter_collection_chunks or iter_schema_csv of the feature store,
+        written to the train and test files chunk by chunk. Returns the rows
+        of each class on each side. Identical records share a side, so with
+        deduplication only the first occurrence of a record is written and
+        its count is kept in a running map (a count per unique record, not
+        the record), added as the sample weight once the stream is done.
+        """
+        try:
+            file_paths = {
+                "train": self.data_ingestion_config.training_file_path,
+                "test": self.data_ingestion_config.testing_file_path,
+            }
+            os.makedirs(os.path.dirname(file_paths["train"]), exist_ok=True)
+            deduplicate = self.data_ingestion_config.deduplicate
+            key_counts = {"train": {}, "test": {}}
+            class_counts = {"train": {}, "test": {}}
+            columns = None
+
+            with instrument("split_chunks_train_test") as stage:
+                for chunk_number, chunk in enumerate(chunks):
+                    columns = chunk.columns if columns is None else columns
+                    chunk = chunk[columns]
+                    test_mask, new_rows = self.hash_test_mask(
+                        chunk,
+                        test_ratio=self.data_ingestion_config.train_test_split_ratio,
+                        hash_key=self.data_ingestion_config.split_hash_key,
+                        key_counts=key_counts,
+                        class_counts=class_counts,
+                    )
+                    for side, side_mask in (("train", ~test_mask), ("test", test_mask)):
+                        if deduplicate:
+                            side_mask = side_mask & new_rows
+                        chunk[side_mask].to_csv(
+                            f"{file_paths[side]}.tmp",
+                            mode="w" if chunk_number == 0 else "a",
+                            index=False,
+                            header=chunk_number == 0,
+                        )
+                if columns is None:
+                    raise Exception("There are no records to split")
+                for side, file_path in file_paths.items():
+                    if deduplicate:
+                        self.write_sample_weights(
+                            f"{file_path}.tmp", key_counts[side], name=side
+                        )
+                    os.replace(f"{file_path}.tmp", file_path)
+                stage["rows"] = sum(
+                    sum(counts.values()) for counts in class_counts.values()
+                )
+
+            logging.info(f"Performed hash train test split: {class_counts}")
+            return class_counts
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def write_sample_weights(self, file_path: str, counts: dict, name: str):
+        """
+        Adds the counts of the unique records of a file, in the order they
+        were written, as their sample weight, reading the file in chunks
+        """
+        try:
+            weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+            weighted_file_path = f"{file_path}.weighted"
+            with instrument(f"deduplicate[{name}]", rows=int(weights.sum())):
+                columns = pd.read_csv(file_path, nrows=0).columns
+                pd.DataFrame(columns=[*columns, SAMPLE_WEIGHT_COLUMN]).to_csv(
+                    weighted_file_path, index=False, header=True
+                )
+                for chunk in iter_schema_csv(
+                    file_path,
+                    chunk_size=self.data_ingestion_config.chunk_size,
+                    usecols=False,
+                ):
+                    chunk[SAMPLE_WEIGHT_COLUMN] = weights[chunk.index]
+                    chunk.to_csv(
+                        weighted_file_path, mode="a", index=False, header=False
+                    )
+                os.replace(weighted_file_path, file_path)
+            logging.info(
+                f"Deduplicated {name} set: {weights.sum()} rows into "
+                f"{len(weights)} unique rows"
+            )
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
     def split_data_train_test(self, dataframe: pd.DataFrame):
         try:
             train_set, test_set = train_test_split(
@@ -64,6 +319,8 @@ class DataIngestion:
                 test_size=self.data_ingestion_config.train_test_split_ratio,
             )
             logging.info("Performed train test split on the dataframe successfully.")
+            train_set = self.deduplicate_rows(train_set, name="train")
+            test_set = self.deduplicate_rows(test_set, name="test")
 
             directory_path = os.path.dirname(
                 self.data_ingestion_config.training_file_path
@@ -89,9 +346,15 @@ class DataIngestion:
 
     def initiate_data_ingestion(self):
         try:
-            dataframe = self.import_collection_as_dataframe()
-            dataframe = self.export_data_into_feature_store(dataframe=dataframe)
-            dataframe = self.split_data_train_test(dataframe=dataframe)
+            if self.data_ingestion_config.split_mode == DATA_INGESTION_SPLIT_HASH:
+                # One pass over the collection, never holding more than a chunk
+                self.split_chunks_train_test(
+                    self.export_chunks_into_feature_store(self.iter_collection_chunks())
+                )
+            else:
+                dataframe = self.import_collection_as_dataframe()
+                dataframe = self.export_data_into_feature_store(dataframe=dataframe)
+                dataframe = self.split_data_train_test(dataframe=dataframe)
             data_ingestion_artifact = DataIngestionArtifact(
                 train_file_path=self.data_ingestion_config.training_file_path,
                 test_file_path=self.data_ingestion_config.testing_file_path,
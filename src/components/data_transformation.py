@@ -3,12 +3,15 @@ import pandas as pd
 from sklearn.impute import KNNImputer
 from sklearn.pipeline import Pipeline
 from src.constants.training_pipeline import (
+    SAMPLE_WEIGHT_COLUMN,
     TARGET_COLUMN,
     DATA_TRANSFORMATION_IMPUTER_PARAMS,
 )
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
 from src.entity.config_entity import DataTransformationConfig
+from src.utils.instrumentation import instrument
+from src.utils.schema_csv import read_schema_csv
 from src.entity.artifact_entity import (
     DataValidationArtifact,
     DataTransformationArtifact,
@@ -34,10 +37,16 @@ class DataTransformation:
     @staticmethod
     def _read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_schema_csv(file_path)
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
+    @staticmethod
+    def _pop_weights(dataframe: pd.DataFrame) -> np.array:
+        if SAMPLE_WEIGHT_COLUMN not in dataframe:
+            return None
+        return dataframe.pop(SAMPLE_WEIGHT_COLUMN).to_numpy()
+
     def knn_imputer(cls) -> Pipeline:
         """
         Initiates KNN Imputer with specified parameters in training_pipeline
@@ -63,6 +72,11 @@ class DataTransformation:
                 self.data_validation_artifact.validated_test_file_path
             )
 
+            # Sample weights of deduplicated rows; the imputer is fit on the
+            # unique rows, KNNImputer has no sample weights
+            train_weights = DataTransformation._pop_weights(df_train)
+            test_weights = DataTransformation._pop_weights(df_test)
+
             # Splitting train and test sets into features and target
             df_train_features = df_train.drop(columns=[TARGET_COLUMN])
             df_train_target = df_train[TARGET_COLUMN]
@@ -74,9 +88,14 @@ class DataTransformation:
 
             # KNN Imputer
             imputer = self.knn_imputer()
-            preprocessor = imputer.fit(df_train_features)
-            df_train_features_transformed = preprocessor.transform(df_train_features)
-            df_test_features_transformed = preprocessor.transform(df_test_features)
+            with instrument("preprocessor.fit", rows=len(df_train_features)):
+                preprocessor = imputer.fit(df_train_features)
+            with instrument("preprocessor.transform", rows=len(df_train_features)):
+                df_train_features_transformed = preprocessor.transform(
+                    df_train_features
+                )
+            with instrument("preprocessor.transform", rows=len(df_test_features)):
+                df_test_features_transformed = preprocessor.transform(df_test_features)
 
             train_array_transformed = np.c_[
                 df_train_features_transformed, np.array(df_train_target)
@@ -95,13 +114,23 @@ class DataTransformation:
                 array=test_array_transformed,
             )
 
-            save_preprocessor(
-                file_path=self.data_transformation_config.preprocessor_file_path,
-                preprocessor=preprocessor,
-            )
+            train_weight_file_path, test_weight_file_path = None, None
+            if train_weights is not None and test_weights is not None:
+                train_weight_file_path = (
+                    self.data_transformation_config.transformed_train_weight_file_path
+                )
+                test_weight_file_path = (
+                    self.data_transformation_config.transformed_test_weight_file_path
+                )
+                save_numpy_array_data(
+                    file_path=train_weight_file_path, array=train_weights
+                )
+                save_numpy_array_data(
+                    file_path=test_weight_file_path, array=test_weights
+                )
 
             save_preprocessor(
-                file_path="models/preprocessor.pkl",
+                file_path=self.data_transformation_config.preprocessor_file_path,
                 preprocessor=preprocessor,
             )
 
@@ -109,6 +138,10 @@ class DataTransformation:
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
                 transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
                 preprocessor_file_path=self.data_transformation_config.preprocessor_file_path,
+                train_weight_file_path=train_weight_file_path,
+                test_weight_file_path=test_weight_file_path,
+                validated_train_file_path=self.data_validation_artifact.validated_train_file_path,
+                validated_test_file_path=self.data_validation_artifact.validated_test_file_path,
             )
             return data_transformation_artifact
 
@@ -1,13 +1,17 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 from scipy.stats import ks_2samp
 from src.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from src.entity.config_entity import DataValidationConfig
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
-from src.constants.training_pipeline import SCHEMA_FILE_PATH
+from src.constants.training_pipeline import SAMPLE_WEIGHT_COLUMN, SCHEMA_FILE_PATH
 from src.utils.utils import read_yaml_file, write_yaml_file
+from src.utils.schema_csv import read_schema_csv
+from src.utils.instrumentation import instrument
+from src.utils.artifact_store import link_file
 
 
 class DataValidation:
@@ -29,16 +33,33 @@ class DataValidation:
     @staticmethod
     def _read_data(file_path: str) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            # Columns outside the schema are kept for the column count check
+            return read_schema_csv(file_path, usecols=False)
 
         except Exception as e:
             logging.error("Unable to read data from file path")
             raise NetworkSecurityException(error_message=e)
 
+    @staticmethod
+    def _weighted_values(dataframe: pd.DataFrame, column: str) -> np.array:
+        """
+        Non-missing values of a column, deduplicated rows repeated by their
+        weight so the distribution is the one of the original rows
+        """
+        values = dataframe[column].to_numpy()
+        present = ~pd.isna(values)
+        if SAMPLE_WEIGHT_COLUMN not in dataframe:
+            return values[present]
+        repeats = dataframe[SAMPLE_WEIGHT_COLUMN].to_numpy().astype(np.int64)
+        return np.repeat(values[present], repeats[present])
+
     def validate_number_of_columns(self, dataframe: pd.DataFrame) -> bool:
         try:
             number_of_columns = len(self.schema_config["columns"])
-            actual_columns = len(dataframe.columns)
+            # The sample weights of deduplicated rows are not a schema column
+            actual_columns = len(
+                dataframe.columns.drop(SAMPLE_WEIGHT_COLUMN, errors="ignore")
+            )
 
             logging.info(f"DataFrame has {actual_columns} columns")
             logging.info(f"Required number of columns {number_of_columns}")
@@ -61,9 +82,11 @@ class DataValidation:
         try:
             status = True
             report = {}
-            for column in df_base.columns:
-                df_1 = df_base[column]
-                df_2 = df_current[column]
+            columns = df_base.columns.drop(SAMPLE_WEIGHT_COLUMN, errors="ignore")
+            for column in columns:
+                # Missing values would make the p-value NaN and flag drift
+                df_1 = self._weighted_values(df_base, column)
+                df_2 = self._weighted_values(df_current, column)
 
                 # Compare distribution of two samples
                 same_distance = ks_2samp(data1=df_1, data2=df_2)
@@ -120,7 +143,10 @@ class DataValidation:
                 raise NetworkSecurityException(error_message=error_message)
 
             # Detect data drift
-            drift_status = self.detect_data_drift(df_base=df_train, df_current=df_test)
+            with instrument("detect_data_drift", rows=len(df_train) + len(df_test)):
+                drift_status = self.detect_data_drift(
+                    df_base=df_train, df_current=df_test
+                )
 
             validation_status = train_status and test_status and drift_status
 
@@ -138,19 +164,10 @@ class DataValidation:
                     self.data_validation_config.validated_test_file_path
                 )
 
-                os.makedirs(os.path.dirname(validated_train_file_path), exist_ok=True)
-
-                df_train.to_csv(
-                    validated_train_file_path,
-                    index=False,
-                    header=True,
-                )
-
-                df_test.to_csv(
-                    validated_test_file_path,
-                    index=False,
-                    header=True,
-                )
+                # Validation does not change the data: the ingested files are
+                # linked, not written again
+                link_file(train_file_path, validated_train_file_path)
+                link_file(test_file_path, validated_test_file_path)
             else:
                 logging.warning(
                     "Data validation failed. Saving files in invalidated data path."
@@ -162,19 +179,8 @@ class DataValidation:
                     self.data_validation_config.invalidated_test_file_path
                 )
 
-                os.makedirs(os.path.dirname(invalidated_train_file_path), exist_ok=True)
-
-                df_train.to_csv(
-                    invalidated_train_file_path,
-                    index=False,
-                    header=True,
-                )
-
-                df_test.to_csv(
-                    invalidated_test_file_path,
-                    index=False,
-                    header=True,
-                )
+                link_file(train_file_path, invalidated_train_file_path)
+                link_file(test_file_path, invalidated_test_file_path)
 
             data_validation_artifact = DataValidationArtifact(
                 validation_status=validation_status,
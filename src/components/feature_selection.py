@@ -0,0 +1,316 @@
+import time
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import mutual_info_classif
+from sklearn.impute import KNNImputer
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from src.constants.training_pipeline import (
+    SAMPLE_WEIGHT_COLUMN,
+    TARGET_COLUMN,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+)
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.entity.config_entity import FeatureSelectionConfig
+from src.entity.artifact_entity import (
+    DataValidationArtifact,
+    DataTransformationArtifact,
+    FeatureSelectionArtifact,
+)
+from src.utils.estimators import ternary_codes
+from src.utils.deduplication import expand
+from src.utils.schema_csv import read_schema_csv
+from src.utils.utils import (
+    load_numpy_array_data,
+    load_preprocessor,
+    save_numpy_array_data,
+    save_preprocessor,
+    write_yaml_file,
+)
+
+
+class FeatureSelection:
+    """
+    Ranks the features and keeps the smallest top ranked subset whose f1 score
+    stays within the configured tolerance of the full feature set, so fewer
+    features have to be computed upstream, imputed and scored.
+    """
+
+    def __init__(
+        self,
+        data_validation_artifact: DataValidationArtifact,
+        data_transformation_artifact: DataTransformationArtifact,
+        feature_selection_config: FeatureSelectionConfig,
+    ):
+        try:
+            self.data_validation_artifact = data_validation_artifact
+            self.data_transformation_artifact = data_transformation_artifact
+            self.feature_selection_config = feature_selection_config
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @staticmethod
+    def _reference_model() -> RandomForestClassifier:
+        return RandomForestClassifier(
+            n_estimators=100, max_depth=10, random_state=42, n_jobs=-1
+        )
+
+    def rank_features(
+        self,
+        X: np.array,
+        y: np.array,
+        feature_names: list,
+        sample_weight: np.array = None,
+    ) -> dict:
+        """
+        Scores every feature with the configured method, best first. Rows are
+        weighted by sample_weight, the counts of deduplicated rows.
+        """
+        try:
+            if sample_weight is None:
+                sample_weight = np.ones(len(y))
+            if self.feature_selection_config.method == "permutation_importance":
+                X_fit, X_score, y_fit, y_score, w_fit, w_score = train_test_split(
+                    X,
+                    y,
+                    sample_weight,
+                    test_size=self.feature_selection_config.validation_split_ratio,
+                    random_state=42,
+                    stratify=y,
+                )
+                model = self._reference_model().fit(X_fit, y_fit, sample_weight=w_fit)
+                scores = permutation_importance(
+                    model,
+                    X_score,
+                    y_score,
+                    scoring="f1",
+                    n_repeats=5,
+                    random_state=42,
+                    sample_weight=w_score,
+                ).importances_mean
+            elif self.feature_selection_config.method == "mutual_information":
+                # Mutual information has no sample weights: codes are repeated
+                codes, y_expanded = expand(ternary_codes(X), y, sample_weight)
+                scores = mutual_info_classif(
+                    codes, y_expanded, discrete_features=True, random_state=42
+                )
+            else:
+                raise Exception(
+                    f"Unknown feature selection method: {self.feature_selection_config.method}"
+                )
+
+            ranking = sorted(
+                zip(feature_names, scores), key=lambda feature: -feature[1]
+            )
+            return {feature: float(score) for feature, score in ranking}
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def select_features(
+        self,
+        X: np.array,
+        y: np.array,
+        feature_names: list,
+        feature_ranking: dict,
+        sample_weight: np.array = None,
+    ):
+        """
+        Smallest number of top ranked features whose validation f1 score is
+        within the tolerance of the full feature set
+        """
+        try:
+            if sample_weight is None:
+                sample_weight = np.ones(len(y))
+            (
+                X_fit,
+                X_validation,
+                y_fit,
+                y_validation,
+                w_fit,
+                w_validation,
+            ) = train_test_split(
+                X,
+                y,
+                sample_weight,
+                test_size=self.feature_selection_config.validation_split_ratio,
+                random_state=42,
+                stratify=y,
+            )
+            ranked_features = list(feature_ranking)
+            feature_indices = {name: index for index, name in enumerate(feature_names)}
+
+            def score(features: list) -> float:
+                columns = [feature_indices[feature] for feature in features]
+                model = self._reference_model().fit(
+                    X_fit[:, columns], y_fit, sample_weight=w_fit
+                )
+                return f1_score(
+                    y_validation,
+                    model.predict(X_validation[:, columns]),
+                    sample_weight=w_validation,
+                )
+
+            full_score = score(ranked_features)
+            for n_features in range(1, len(ranked_features) + 1):
+                selected_features = ranked_features[:n_features]
+                selected_score = score(selected_features)
+                if (
+                    selected_score
+                    >= full_score - self.feature_selection_config.f1_tolerance
+                ):
+                    break
+            logging.info(
+                f"Selected {len(selected_features)} of {len(feature_names)} features, "
+                f"f1 score {selected_score} against {full_score}"
+            )
+            return selected_features, full_score, selected_score
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def serving_cost(self, preprocessor, X: pd.DataFrame, y: np.array) -> dict:
+        """
+        Imputation and inference latency of a preprocessor with a reference
+        model, and the memory held by the imputer reference data
+        """
+        try:
+            X_transformed = preprocessor.transform(X)
+            model = self._reference_model().fit(X_transformed, y)
+            imputation_seconds = []
+            inference_seconds = []
+            for _ in range(3):
+                start = time.perf_counter()
+                X_transformed = preprocessor.transform(X)
+                imputation_seconds.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                model.predict(X_transformed)
+                inference_seconds.append(time.perf_counter() - start)
+            return {
+                "imputation_ms_per_1k_rows": 1e6 * min(imputation_seconds) / len(X),
+                "inference_ms_per_1k_rows": 1e6 * min(inference_seconds) / len(X),
+                "imputer_memory_bytes": int(
+                    preprocessor.named_steps["imputer"]._fit_X.nbytes
+                ),
+            }
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def initiate_feature_selection(self) -> FeatureSelectionArtifact:
+        try:
+            train_array = load_numpy_array_data(
+                self.data_transformation_artifact.transformed_train_file_path
+            )
+            X_train, y_train = train_array[:, :-1], train_array[:, -1]
+            train_weights = (
+                load_numpy_array_data(
+                    self.data_transformation_artifact.train_weight_file_path
+                )
+                if self.data_transformation_artifact.train_weight_file_path
+                else None
+            )
+
+            df_train = read_schema_csv(
+                self.data_validation_artifact.validated_train_file_path
+            )
+            df_test = read_schema_csv(self.data_validation_artifact.validated_test_file_path)
+            df_train_features = df_train.drop(
+                columns=[TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN], errors="ignore"
+            )
+            df_test_features = df_test.drop(
+                columns=[TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN], errors="ignore"
+            )
+            feature_names = df_train_features.columns.to_list()
+
+            feature_ranking = self.rank_features(
+                X=X_train,
+                y=y_train,
+                feature_names=feature_names,
+                sample_weight=train_weights,
+            )
+            selected_features, full_score, selected_score = self.select_features(
+                X=X_train,
+                y=y_train,
+                feature_names=feature_names,
+                feature_ranking=feature_ranking,
+                sample_weight=train_weights,
+            )
+            # Keep the schema order of the selected columns
+            selected_features = [f for f in feature_names if f in selected_features]
+
+            # The reduced preprocessor selects its columns by name, so clients
+            # may send only the selected features
+            preprocessor = Pipeline(
+                [
+                    (
+                        "selector",
+                        ColumnTransformer(
+                            [("selected", "passthrough", selected_features)],
+                            remainder="drop",
+                            verbose_feature_names_out=False,
+                        ),
+                    ),
+                    ("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS)),
+                ]
+            )
+            preprocessor.fit(df_train_features)
+
+            y_test = df_test[TARGET_COLUMN].replace(-1, 0).to_numpy()
+            train_array_selected = np.c_[
+                preprocessor.transform(df_train_features),
+                df_train[TARGET_COLUMN].replace(-1, 0).to_numpy(),
+            ]
+            test_array_selected = np.c_[preprocessor.transform(df_test_features), y_test]
+
+            full_preprocessor = load_preprocessor(
+                file_path=self.data_transformation_artifact.preprocessor_file_path
+            )
+            full_cost = self.serving_cost(full_preprocessor, df_test_features, y_test)
+            selected_cost = self.serving_cost(preprocessor, df_test_features, y_test)
+
+            write_yaml_file(
+                file_path=self.feature_selection_config.report_file_path,
+                content={
+                    "method": self.feature_selection_config.method,
+                    "feature_ranking": [
+                        {"feature": feature, "score": score}
+                        for feature, score in feature_ranking.items()
+                    ],
+                    "selected_features": selected_features,
+                    "dropped_features": [
+                        f for f in feature_names if f not in selected_features
+                    ],
+                    "full_validation_f1_score": float(full_score),
+                    "selected_validation_f1_score": float(selected_score),
+                    "full_serving_cost": full_cost,
+                    "selected_serving_cost": selected_cost,
+                },
+                replace=True,
+            )
+
+            save_numpy_array_data(
+                file_path=self.feature_selection_config.transformed_train_file_path,
+                array=train_array_selected,
+            )
+            save_numpy_array_data(
+                file_path=self.feature_selection_config.transformed_test_file_path,
+                array=test_array_selected,
+            )
+            save_preprocessor(
+                file_path=self.feature_selection_config.preprocessor_file_path,
+                preprocessor=preprocessor,
+            )
+
+            feature_selection_artifact = FeatureSelectionArtifact(
+                selected_features=selected_features,
+                transformed_train_file_path=self.feature_selection_config.transformed_train_file_path,
+                transformed_test_file_path=self.feature_selection_config.transformed_test_file_path,
+                preprocessor_file_path=self.feature_selection_config.preprocessor_file_path,
+                report_file_path=self.feature_selection_config.report_file_path,
+            )
+            return feature_selection_artifact
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
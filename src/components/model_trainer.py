@@ -1,31 +1,61 @@
 import os
 import sys
+import math
+import time
+from contextlib import nullcontext
 import pandas as pd
 import numpy as np
-import mlflow
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
+from sklearn.metrics import f1_score
+from sklearn.feature_selection import mutual_info_classif
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
 from sklearn.ensemble import (
     AdaBoostClassifier,
     GradientBoostingClassifier,
     RandomForestClassifier,
 )
+from src.constants.training_pipeline import (
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    LATENCY_TIER_FAST,
+    SAMPLE_WEIGHT_COLUMN,
+    TARGET_COLUMN,
+)
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
 from src.entity.config_entity import ModelTrainerConfig
 from src.entity.artifact_entity import (
+    ClassificationMetricArtifact,
     DataTransformationArtifact,
     ModelTrainerArtifact,
 )
 from src.utils.utils import (
     save_preprocessor,
+    save_object_mmap,
     load_preprocessor,
     load_numpy_array_data,
+    read_csv_in_chunks,
+    read_yaml_file,
+    write_yaml_file,
     evaluate_model,
 )
 from src.utils.classification_metrics import classification_scores
+from src.utils.instrumentation import instrument
+from src.utils.schema_csv import read_schema_csv
 from src.utils.model_estimator import ModelEstimator
+from src.utils.mlflow_tracker import get_mlflow_tracker
+from src.utils.inference_bundle import export_inference_bundle
+from src.utils.model_registry import register_candidate
+from src.utils.deduplication import expand
+from src.utils.search_backend import get_search_backend
+from src.utils.estimators import (
+    TernaryCategoricalNB,
+    TernaryHistGradientBoostingClassifier,
+    TernaryLookupClassifier,
+    ternary_codes,
+)
 
 
 class ModelTrainer:
@@ -40,114 +70,539 @@ class ModelTrainer:
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
-    def track_mlflow(self, best_model, classification_metric):
+    def track_mlflow(
+        self,
+        best_model,
+        classification_train_metric: ClassificationMetricArtifact,
+        classification_test_metric: ClassificationMetricArtifact,
+    ):
+        """
+        Queues one MLflow run with the train and test metrics and the best model.
+        The run is written in the background so slow tracking can't delay training.
+        """
         try:
-            with mlflow.start_run():
-                precision_score = classification_metric.precision_score
-                recall_score = classification_metric.recall_score
-                f1_score = classification_metric.f1_score
-
-                mlflow.log_metrics(
+            metrics = {}
+            for prefix, classification_metric in (
+                ("train", classification_train_metric),
+                ("test", classification_test_metric),
+            ):
+                metrics.update(
                     {
-                        "precision_score": precision_score,
-                        "recall_score": recall_score,
-                        "f1_score": f1_score,
+                        f"{prefix}_precision_score": classification_metric.precision_score,
+                        f"{prefix}_recall_score": classification_metric.recall_score,
+                        f"{prefix}_f1_score": classification_metric.f1_score,
                     }
                 )
-                mlflow.sklearn.log_model(sk_model=best_model, name="model")
+            params = {"model_name": type(best_model).__name__}
+            params.update(best_model.get_params())
+
+            mlflow_tracker = get_mlflow_tracker(
+                tracking_uri=self.model_trainer_config.mlflow_tracking_uri,
+                exit_timeout=self.model_trainer_config.mlflow_exit_timeout,
+            )
+            mlflow_tracker.log_training_run(
+                params=params, metrics=metrics, model=best_model
+            )
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
-    def train_model(
-        self, X_train: np.array, y_train: np.array, X_test: np.array, y_test: np.array
+    @staticmethod
+    def _represented_rows(X: np.array, weights: np.array = None) -> int:
+        """
+        Rows counted with their duplicates
+        """
+        return len(X) if weights is None else int(weights.sum())
+
+    @staticmethod
+    def model_zoo(n_features: int) -> tuple:
+        """
+        Candidate models of the grid search and their parameter grids
+        """
+        models = {
+            "Logistic Regression": LogisticRegression(random_state=42, n_jobs=-1),
+            "KNN": KNeighborsClassifier(n_jobs=-1),
+            "Decision Tree": DecisionTreeClassifier(random_state=42),
+            "AdaBoost": AdaBoostClassifier(random_state=42),
+            "Gradient Boosting": GradientBoostingClassifier(random_state=42),
+            "Random Forest": RandomForestClassifier(random_state=42, n_jobs=-1),
+            "Hist Gradient Boosting": TernaryHistGradientBoostingClassifier(
+                categorical_features=np.ones(n_features, dtype=bool),
+                early_stopping=True,
+                random_state=42,
+            ),
+        }
+
+        params = {
+            "Logistic Regression": {"C": [0.1], "max_iter": [1000]},
+            "KNN": {"n_neighbors": [3, 5]},
+            "Decision Tree": {"max_depth": [5, 10], "min_samples_split": [2, 4]},
+            "AdaBoost": {
+                "n_estimators": [100, 200],
+                "learning_rate": [0.1, 0.01, 0.001],
+            },
+            "Gradient Boosting": {
+                "n_estimators": [100, 200],
+                "learning_rate": [0.1, 0.01, 0.001],
+                "max_depth": [3],
+            },
+            "Random Forest": {
+                "n_estimators": [100, 200],
+                "max_depth": [10],
+                "min_samples_split": [2],
+            },
+            "Hist Gradient Boosting": {
+                "learning_rate": [0.1, 0.05],
+                "max_iter": [300],
+                "max_leaf_nodes": [15, 31],
+                "l2_regularization": [0.0, 1.0],
+            },
+        }
+        return models, params
+
+    def search_best_model(
+        self,
+        X_train: np.array,
+        y_train: np.array,
+        X_test: np.array,
+        y_test: np.array,
+        train_weights: np.array = None,
+        test_weights: np.array = None,
     ):
+        """
+        Runs the grid search over the model zoo and returns the best fitted model.
+        The search runs on the configured backend: this machine or the search
+        workers of other nodes.
+        """
         try:
-            models = {
-                "Logistic Regression": LogisticRegression(random_state=42, n_jobs=-1),
-                "KNN": KNeighborsClassifier(n_jobs=-1),
-                "Decision Tree": DecisionTreeClassifier(random_state=42),
-                "AdaBoost": AdaBoostClassifier(random_state=42),
-                "Gradient Boosting": GradientBoostingClassifier(random_state=42),
-                "Random Forest": RandomForestClassifier(random_state=42, n_jobs=-1),
-            }
-
-            params = {
-                "Logistic Regression": {"C": [0.1], "max_iter": [1000]},
-                "KNN": {"n_neighbors": [3, 5]},
-                "Decision Tree": {"max_depth": [5, 10], "min_samples_split": [2, 4]},
-                "AdaBoost": {
-                    "n_estimators": [100, 200],
-                    "learning_rate": [0.1, 0.01, 0.001],
-                },
-                "Gradient Boosting": {
-                    "n_estimators": [100, 200],
-                    "learning_rate": [0.1, 0.01, 0.001],
-                    "max_depth": [3],
-                },
-                "Random Forest": {
-                    "n_estimators": [100, 200],
-                    "max_depth": [10],
-                    "min_samples_split": [2],
-                },
-            }
+            models, params = self.model_zoo(n_features=X_train.shape[1])
 
-            model_report: dict = evaluate_model(
-                X_train=X_train,
-                X_test=X_test,
-                y_train=y_train,
-                y_test=y_test,
-                models=models,
-                param_grid=params,
+            backend = get_search_backend(
+                name=self.model_trainer_config.search_backend,
+                addresses=self.model_trainer_config.search_workers,
+                authkey=self.model_trainer_config.search_authkey,
             )
+            with backend if backend is not None else nullcontext():
+                model_report: dict = evaluate_model(
+                    X_train=X_train,
+                    X_test=X_test,
+                    y_train=y_train,
+                    y_test=y_test,
+                    models=models,
+                    param_grid=params,
+                    train_weights=train_weights,
+                    test_weights=test_weights,
+                    cpus=self.model_trainer_config.cpus,
+                    backend=backend,
+                )
 
             best_model_score = max(sorted(model_report.values()))
             best_model_name = list(model_report.keys())[
                 list(model_report.values()).index(best_model_score)
             ]
-            best_model = models[best_model_name]
+            return models[best_model_name]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def warm_start_model(
+        self,
+        X_train: np.array,
+        y_train: np.array,
+        X_test: np.array,
+        y_test: np.array,
+        train_weights: np.array = None,
+        test_weights: np.array = None,
+    ):
+        """
+        Continues training the currently deployed model on the current data.
+        Forests and gradient boosting get new trees in proportion to the rows
+        added since the last training, and logistic regression continues from its
+        current coefficients. Returns None when there is no deployed model, it
+        can't be warm started, or its validation f1 score regresses.
+        """
+        try:
+            warm_start_model_file_path = (
+                self.model_trainer_config.warm_start_model_file_path
+            )
+            if not os.path.exists(warm_start_model_file_path):
+                logging.info("No deployed model found to warm start from.")
+                return None
+
+            model = load_preprocessor(file_path=warm_start_model_file_path)
+            if not isinstance(
+                model,
+                (RandomForestClassifier, GradientBoostingClassifier, LogisticRegression),
+            ):
+                logging.info(f"{type(model).__name__} does not support warm start.")
+                return None
+            if getattr(model, "n_features_in_", None) != X_train.shape[1]:
+                logging.info("Deployed model was trained on different features.")
+                return None
+
+            metadata_file_path = self.model_trainer_config.model_metadata_file_path
+            metadata = (
+                read_yaml_file(metadata_file_path)
+                if os.path.exists(metadata_file_path)
+                else {}
+            )
+            # With duplicates, so the count compares across deduplicated runs
+            train_rows = self._represented_rows(X_train, train_weights)
+            previous_train_rows = metadata.get("train_rows", train_rows)
+            delta_rows = max(train_rows - previous_train_rows, 0)
+            previous_score = f1_score(
+                y_true=y_test, y_pred=model.predict(X_test), sample_weight=test_weights
+            )
+
+            if isinstance(model, LogisticRegression):
+                model.set_params(warm_start=True)
+            else:
+                new_estimators = max(
+                    math.ceil(model.n_estimators * delta_rows / train_rows),
+                    self.model_trainer_config.warm_start_min_estimators,
+                )
+                model.set_params(
+                    warm_start=True, n_estimators=model.n_estimators + new_estimators
+                )
+            logging.info(
+                f"Warm starting {type(model).__name__} with {delta_rows} new rows"
+            )
+            model.fit(X_train, y_train, sample_weight=train_weights)
+
+            score = f1_score(
+                y_true=y_test, y_pred=model.predict(X_test), sample_weight=test_weights
+            )
+            logging.info(
+                f"Warm start f1 score: {score}, deployed model f1 score: {previous_score}"
+            )
+            if score < previous_score - self.model_trainer_config.warm_start_tolerance:
+                logging.warning("Warm started model regressed, running full search.")
+                return None
+            return model
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def train_model(
+        self,
+        X_train: np.array,
+        y_train: np.array,
+        X_test: np.array,
+        y_test: np.array,
+        train_weights: np.array = None,
+        test_weights: np.array = None,
+    ):
+        """
+        Trains and saves the best model. Weights are the counts of deduplicated
+        rows: models are fit and scored as on the rows with their duplicates.
+        """
+        try:
+            weights = {"train_weights": train_weights, "test_weights": test_weights}
+            best_model = None
+            if self.model_trainer_config.warm_start:
+                best_model = self.warm_start_model(
+                    X_train=X_train,
+                    y_train=y_train,
+                    X_test=X_test,
+                    y_test=y_test,
+                    **weights,
+                )
+            if best_model is None:
+                best_model = self.search_best_model(
+                    X_train=X_train,
+                    y_train=y_train,
+                    X_test=X_test,
+                    y_test=y_test,
+                    **weights,
+                )
 
             y_train_pred = best_model.predict(X_train)
             y_test_pred = best_model.predict(X_test)
 
             classification_train_metric = classification_scores(
-                y_true=y_train, y_pred=y_train_pred
+                y_true=y_train, y_pred=y_train_pred, sample_weight=train_weights
             )
             classification_test_metric = classification_scores(
-                y_true=y_test, y_pred=y_test_pred
+                y_true=y_test, y_pred=y_test_pred, sample_weight=test_weights
             )
 
             preprocessor = load_preprocessor(
                 file_path=self.data_transformation_artifact.preprocessor_file_path
             )
-
-            model_directory = os.path.dirname(
-                self.model_trainer_config.trained_model_file_path
+            student = None
+            validated_file_paths = (
+                self.data_transformation_artifact.validated_train_file_path,
+                self.data_transformation_artifact.validated_test_file_path,
             )
+            if self.model_trainer_config.distillation_enabled and all(
+                validated_file_paths
+            ):
+                X_train_raw, X_test_raw = (
+                    read_schema_csv(file_path).drop(
+                        columns=[TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN], errors="ignore"
+                    )
+                    for file_path in validated_file_paths
+                )
+                student = self.distill_model(
+                    best_model=best_model,
+                    preprocessor=preprocessor,
+                    X_train=X_train,
+                    X_train_raw=X_train_raw,
+                    X_test_raw=X_test_raw,
+                    y_test=y_test,
+                    **weights,
+                )
 
-            self.track_mlflow(
+            return self.save_model(
                 best_model=best_model,
-                classification_metric=classification_train_metric,
+                classification_train_metric=classification_train_metric,
+                classification_test_metric=classification_test_metric,
+                train_rows=self._represented_rows(X_train, train_weights),
+                student=student,
+            )
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def distill_model(
+        self,
+        best_model,
+        preprocessor,
+        X_train: np.array,
+        X_train_raw: pd.DataFrame,
+        X_test_raw: pd.DataFrame,
+        y_test: np.array,
+        train_weights: np.array = None,
+        test_weights: np.array = None,
+    ) -> TernaryLookupClassifier:
+        """
+        Trains a lookup table student on the teacher's predictions over its most
+        important features, and writes a fidelity report comparing agreement,
+        f1 score and single row latency of the teacher and the fast tier. The
+        student is fit and scored on the raw rows it serves: those that have
+        all its features; the fast tier leaves the others to the teacher.
+        """
+        try:
+            feature_names = preprocessor.get_feature_names_out().tolist()
+            y_teacher = best_model.predict(X_train)
+
+            if hasattr(best_model, "feature_importances_"):
+                importances = best_model.feature_importances_
+            else:
+                codes, y_codes = ternary_codes(X_train), y_teacher
+                if train_weights is not None:
+                    codes, y_codes = expand(codes, y_teacher, train_weights)
+                importances = mutual_info_classif(
+                    codes, y_codes, discrete_features=True, random_state=42
+                )
+            n_features = min(self.model_trainer_config.student_n_features, len(feature_names))
+            student_features = [
+                feature_names[index] for index in np.argsort(-importances)[:n_features]
+            ]
+
+            student = TernaryLookupClassifier(
+                features=student_features,
+                max_depth=self.model_trainer_config.student_max_depth,
+            )
+            student_rows = (
+                X_train_raw[student_features].notna().all(axis=1).to_numpy()
+            )
+            if not student_rows.any():
+                logging.warning("No training row has every student feature.")
+                return None
+            student.fit(
+                X_train_raw[student_rows],
+                y_teacher[student_rows],
+                sample_weight=(
+                    None if train_weights is None else train_weights[student_rows]
+                ),
+            )
+
+            teacher = ModelEstimator(preprocessor=preprocessor, model=best_model)
+            fast_tier = ModelEstimator(
+                preprocessor=preprocessor, model=best_model, student=student
+            )
+            y_teacher_test = teacher.predict(X_test_raw)
+            y_fast_test = fast_tier.predict(X_test_raw, latency_tier=LATENCY_TIER_FAST)
+            student_test_rows = student.available(X_test_raw)
+            student_test_weights = (
+                None if test_weights is None else test_weights[student_test_rows]
+            )
+
+            # Single raw rows, as /predict serves them
+            row = X_test_raw[student_test_rows].iloc[:1]
+            if row.empty:
+                row = X_test_raw.iloc[:1]
+            latency_us = {}
+            for name, predict in (
+                ("teacher", teacher.predict),
+                (
+                    "fast_tier",
+                    lambda X: fast_tier.predict(X, latency_tier=LATENCY_TIER_FAST),
+                ),
+            ):
+                seconds = []
+                for _ in range(20):
+                    start = time.perf_counter()
+                    predict(row)
+                    seconds.append(time.perf_counter() - start)
+                latency_us[name] = 1e6 * float(np.median(seconds))
+
+            fidelity_report = {
+                "teacher_model": type(best_model).__name__,
+                "student_features": student_features,
+                "student_table_cells": int(student.table_.size),
+                # Test rows with every student feature, scored by the student
+                "student_coverage": float(
+                    np.average(student_test_rows, weights=test_weights)
+                ),
+                "student_agreement": (
+                    float(
+                        np.average(
+                            y_teacher_test[student_test_rows]
+                            == y_fast_test[student_test_rows],
+                            weights=student_test_weights,
+                        )
+                    )
+                    if student_test_rows.any()
+                    else None
+                ),
+                "agreement": float(
+                    np.average(y_teacher_test == y_fast_test, weights=test_weights)
+                ),
+                "teacher_f1_score": float(
+                    f1_score(y_test, y_teacher_test, sample_weight=test_weights)
+                ),
+                "fast_tier_f1_score": float(
+                    f1_score(y_test, y_fast_test, sample_weight=test_weights)
+                ),
+                "teacher_latency_us_per_row": latency_us["teacher"],
+                "fast_tier_latency_us_per_row": latency_us["fast_tier"],
+            }
+            logging.info(f"Student model fidelity report: {fidelity_report}")
+            write_yaml_file(
+                file_path=self.model_trainer_config.student_report_file_path,
+                content=fidelity_report,
+                replace=True,
+            )
+            return student
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def deploy_model(
+        self,
+        preprocessor,
+        best_model,
+        classification_test_metric: ClassificationMetricArtifact,
+        train_rows: int,
+        student: TernaryLookupClassifier = None,
+    ):
+        """
+        Saves the model to the serving models directory, along with the
+        preprocessor it was trained on, the distilled student, the numpy
+        inference bundle and the metadata used to warm start the next training
+        """
+        try:
+            save_preprocessor(
+                file_path=self.model_trainer_config.serving_preprocessor_file_path,
+                preprocessor=preprocessor,
+            )
+            save_object_mmap(
+                file_path=self.model_trainer_config.serving_preprocessor_mmap_file_path,
+                obj=preprocessor,
+            )
+
+            save_preprocessor(
+                file_path=self.model_trainer_config.warm_start_model_file_path,
+                preprocessor=best_model,
+            )
+
+            save_object_mmap(
+                file_path=self.model_trainer_config.serving_model_mmap_file_path,
+                obj=best_model,
+            )
+
+            # A student from an earlier training must not outlive its teacher
+            if student is not None:
+                save_preprocessor(
+                    file_path=self.model_trainer_config.student_file_path,
+                    preprocessor=student,
+                )
+            elif os.path.exists(self.model_trainer_config.student_file_path):
+                os.remove(self.model_trainer_config.student_file_path)
+
+            export_inference_bundle(
+                preprocessor=preprocessor,
+                model=best_model,
+                bundle_directory=self.model_trainer_config.inference_bundle_directory,
+                student=student,
+            )
+
+            write_yaml_file(
+                file_path=self.model_trainer_config.model_metadata_file_path,
+                content={
+                    "model_name": type(best_model).__name__,
+                    "train_rows": int(train_rows),
+                    "f1_score": float(classification_test_metric.f1_score),
+                },
+                replace=True,
+            )
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def save_model(
+        self,
+        best_model,
+        classification_train_metric: ClassificationMetricArtifact,
+        classification_test_metric: ClassificationMetricArtifact,
+        train_rows: int,
+        student: TernaryLookupClassifier = None,
+        preprocessor=None,
+    ) -> ModelTrainerArtifact:
+        """
+        Tracks the best model, wraps it with the preprocessor (the one of the
+        data transformation unless given) in a ModelEstimator and saves it to
+        the trained model path. A live deployment also saves it to the serving
+        models directory, a shadow deployment registers it as the candidate
+        compared with the live model.
+        """
+        try:
+            if preprocessor is None:
+                preprocessor = load_preprocessor(
+                    file_path=self.data_transformation_artifact.preprocessor_file_path
+                )
+
+            model_directory = os.path.dirname(
+                self.model_trainer_config.trained_model_file_path
             )
 
             self.track_mlflow(
                 best_model=best_model,
-                classification_metric=classification_test_metric,
+                classification_train_metric=classification_train_metric,
+                classification_test_metric=classification_test_metric,
             )
 
             os.makedirs(model_directory, exist_ok=True)
 
-            model = ModelEstimator(preprocessor=preprocessor, model=best_model)
+            model = ModelEstimator(
+                preprocessor=preprocessor, model=best_model, student=student
+            )
 
             save_preprocessor(
                 file_path=self.model_trainer_config.trained_model_file_path,
                 preprocessor=model,
             )
-            
-            save_preprocessor(
-                file_path="models/model.pkl",
-                preprocessor=best_model,
-                
-            )
+
+            if self.model_trainer_config.deploy_serving_files:
+                self.deploy_model(
+                    preprocessor=preprocessor,
+                    best_model=best_model,
+                    classification_test_metric=classification_test_metric,
+                    train_rows=train_rows,
+                    student=student,
+                )
+            else:
+                # Shadow deployment: the live model stays, this one is compared with it
+                register_candidate(
+                    model_file_path=self.model_trainer_config.trained_model_file_path,
+                    registry_file_path=self.model_trainer_config.model_registry_file_path,
+                )
 
             model_trainer_artifact = ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
@@ -159,8 +614,154 @@ class ModelTrainer:
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
+    def _split_feature_store_chunk(self, chunk: pd.DataFrame, chunk_number: int):
+        """
+        Splits a feature store chunk into features and target, and assigns every
+        row to the training or held-out stream. The assignment is seeded by the
+        chunk number so every pass over the stream sees the same held-out rows.
+        """
+        try:
+            X = chunk.drop(columns=[TARGET_COLUMN])
+            y = chunk[TARGET_COLUMN].replace(-1, 0).to_numpy()
+            random_generator = np.random.default_rng(seed=42 + chunk_number)
+            holdout_mask = (
+                random_generator.random(len(chunk))
+                < self.model_trainer_config.incremental_holdout_ratio
+            )
+            return X, y, holdout_mask
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def fit_incremental_preprocessor(self) -> Pipeline:
+        """
+        Fits the KNN imputer on a uniform sample of at most the configured
+        number of training rows, drawn in one pass over the feature store.
+        Held-out rows are left out, so they stay unseen until evaluation.
+        """
+        try:
+            sample_size = self.model_trainer_config.incremental_preprocessor_sample_size
+            random_generator = np.random.default_rng(seed=42)
+            sample, sample_keys = None, np.empty(0)
+            for chunk_number, chunk in enumerate(
+                read_csv_in_chunks(
+                    self.model_trainer_config.feature_store_file_path,
+                    self.model_trainer_config.incremental_chunk_size,
+                )
+            ):
+                X, _, holdout_mask = self._split_feature_store_chunk(
+                    chunk=chunk, chunk_number=chunk_number
+                )
+                # Bottom-k sampling: the rows with the smallest random keys
+                candidates = pd.concat([sample, X[~holdout_mask]], ignore_index=True)
+                keys = np.concatenate(
+                    [sample_keys, random_generator.random(int((~holdout_mask).sum()))]
+                )
+                if len(keys) > sample_size:
+                    kept = np.argpartition(keys, sample_size - 1)[:sample_size]
+                    candidates, keys = candidates.iloc[kept], keys[kept]
+                sample, sample_keys = candidates.reset_index(drop=True), keys
+
+            preprocessor = Pipeline(
+                [("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]
+            )
+            with instrument("preprocessor.fit", rows=len(sample)):
+                preprocessor.fit(sample)
+            save_preprocessor(
+                file_path=self.model_trainer_config.incremental_preprocessor_file_path,
+                preprocessor=preprocessor,
+            )
+            return preprocessor
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def train_incremental_model(self) -> ModelTrainerArtifact:
+        """
+        Out-of-core training: fits the preprocessor on a bounded sample of the
+        training stream, streams chunks from the feature store through it into
+        estimators supporting partial_fit, and evaluates them on a held-out
+        stream, so the dataset never has to fit in memory.
+        """
+        try:
+            feature_store_file_path = self.model_trainer_config.feature_store_file_path
+            chunk_size = self.model_trainer_config.incremental_chunk_size
+            preprocessor = self.fit_incremental_preprocessor()
+
+            models = {
+                "SGD Logistic Regression": SGDClassifier(
+                    loss="log_loss", alpha=1e-4, random_state=42
+                ),
+                "Categorical Naive Bayes": TernaryCategoricalNB(min_categories=3),
+            }
+            classes = np.array([0, 1])
+
+            for epoch in range(self.model_trainer_config.incremental_epochs):
+                logging.info(f"Incremental training epoch {epoch + 1}")
+                for chunk_number, chunk in enumerate(
+                    read_csv_in_chunks(feature_store_file_path, chunk_size)
+                ):
+                    X, y, holdout_mask = self._split_feature_store_chunk(
+                        chunk=chunk, chunk_number=chunk_number
+                    )
+                    if holdout_mask.all():
+                        continue
+                    X_transformed = preprocessor.transform(X[~holdout_mask])
+                    for model in models.values():
+                        model.partial_fit(
+                            X_transformed, y[~holdout_mask], classes=classes
+                        )
+
+            # Final pass: only labels and predictions are kept in memory
+            y_true = {"train": [], "test": []}
+            y_pred = {
+                model_name: {"train": [], "test": []} for model_name in models
+            }
+            for chunk_number, chunk in enumerate(
+                read_csv_in_chunks(feature_store_file_path, chunk_size)
+            ):
+                X, y, holdout_mask = self._split_feature_store_chunk(
+                    chunk=chunk, chunk_number=chunk_number
+                )
+                X_transformed = preprocessor.transform(X)
+                y_true["train"].append(y[~holdout_mask])
+                y_true["test"].append(y[holdout_mask])
+                for model_name, model in models.items():
+                    predictions = model.predict(X_transformed)
+                    y_pred[model_name]["train"].append(predictions[~holdout_mask])
+                    y_pred[model_name]["test"].append(predictions[holdout_mask])
+
+            y_train = np.concatenate(y_true["train"])
+            y_test = np.concatenate(y_true["test"])
+            model_report = {
+                model_name: classification_scores(
+                    y_true=y_test, y_pred=np.concatenate(predictions["test"])
+                )
+                for model_name, predictions in y_pred.items()
+            }
+            logging.info(f"Incremental model report: {model_report}")
+
+            best_model_name = max(
+                model_report, key=lambda model_name: model_report[model_name].f1_score
+            )
+            classification_train_metric = classification_scores(
+                y_true=y_train,
+                y_pred=np.concatenate(y_pred[best_model_name]["train"]),
+            )
+
+            return self.save_model(
+                best_model=models[best_model_name],
+                classification_train_metric=classification_train_metric,
+                classification_test_metric=model_report[best_model_name],
+                train_rows=len(y_train),
+                preprocessor=preprocessor,
+            )
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         try:
+            if self.model_trainer_config.training_mode == "incremental":
+                return self.train_incremental_model()
+
             train_file_path = (
                 self.data_transformation_artifact.transformed_train_file_path
             )
@@ -179,11 +780,21 @@ class ModelTrainer:
                 test_array[:, -1],
             )
 
+            # Counts of deduplicated rows, None when rows are not deduplicated
+            train_weights, test_weights = (
+                load_numpy_array_data(file_path=file_path) if file_path else None
+                for file_path in (
+                    self.data_transformation_artifact.train_weight_file_path,
+                    self.data_transformation_artifact.test_weight_file_path,
+                )
+            )
             model_trainer_artifact = self.train_model(
                 X_train=X_train,
                 y_train=y_train,
                 X_test=X_test,
                 y_test=y_test,
+                train_weights=train_weights,
+                test_weights=test_weights,
             )
             return model_trainer_artifact
 
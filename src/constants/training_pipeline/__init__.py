@@ -11,6 +11,21 @@ SCHEMA_FILE_PATH: str = os.path.join("data_schema", "schema.yaml")
 TRAIN_FILE_NAME: str = "train.csv"
 TEST_FILE_NAME: str = "test.csv"
 TARGET_COLUMN: str = "Result"
+# Number of identical rows a deduplicated row stands for, used as sample weight
+SAMPLE_WEIGHT_COLUMN: str = "sample_weight"
+# CSV files are read with the dtypes of the schema: the ternary features as
+# float32, which holds their missing values, and the binary target as int8
+CSV_NA_VALUES: list = ["na"]
+CSV_FEATURE_DTYPE: str = "float32"
+CSV_TARGET_DTYPE: str = "int8"
+# Latency tiers served by ModelEstimator: the model or its distilled student
+LATENCY_TIER_STANDARD: str = "standard"
+LATENCY_TIER_FAST: str = "fast"
+# Deployment of a training: "live" replaces the serving files in models/,
+# "shadow" leaves them and registers the trained model as the shadow candidate
+DEPLOYMENT_LIVE: str = "live"
+DEPLOYMENT_SHADOW: str = "shadow"
+TRAINING_DEPLOYMENT: str = os.getenv("TRAINING_DEPLOYMENT", DEPLOYMENT_LIVE)
 
 
 """
@@ -22,6 +37,21 @@ DATA_INGESTION_DIRECTORY_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIRECTORY: str = "feature_store"
 DATA_INGESTION_INGESTED_DIRECTORY: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO: float = 0.2
+# Split modes: "random" splits the whole collection in memory at random;
+# "hash" streams the collection in chunks and splits every class of the target
+# at the ratio in the order of a hash of the features, identical records on
+# the same side
+DATA_INGESTION_SPLIT_HASH: str = "hash"
+DATA_INGESTION_SPLIT_RANDOM: str = "random"
+DATA_INGESTION_SPLIT_MODE: str = os.getenv(
+    "DATA_INGESTION_SPLIT_MODE", DATA_INGESTION_SPLIT_RANDOM
+)
+# Changing the hash key (16 characters) reshuffles the hash split
+DATA_INGESTION_SPLIT_HASH_KEY: str = "network-security"
+DATA_INGESTION_CHUNK_SIZE: int = 50_000
+# Opt-in: identical (features, label) rows of the train and test sets are
+# collapsed into one row weighted by their count
+DATA_INGESTION_DEDUPLICATE: bool = os.getenv("DATA_INGESTION_DEDUPLICATE", "0") == "1"
 
 
 """
@@ -42,7 +72,16 @@ DATA_TRANSFORMATION_TRANSFORMED_DATA_DIRECTORY: str = "transformed"
 DATA_TRANSFORMATION_PREPROCESSOR_DIRECTORY: str = "preprocessor"
 DATA_TRANSFORMATION_TRAIN_FILE_PATH: str = "train.npy"
 DATA_TRANSFORMATION_TEST_FILE_PATH: str = "test.npy"
+DATA_TRANSFORMATION_TRAIN_WEIGHT_FILE_PATH: str = "train_weight.npy"
+DATA_TRANSFORMATION_TEST_WEIGHT_FILE_PATH: str = "test_weight.npy"
 DATA_TRANSFORMATION_PREPROCESSOR_FILE_NAME = "preprocessor.pkl"
+DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH: str = os.path.join(
+    "models", "preprocessor.pkl"
+)
+# Memory-mappable copy shared by all serving workers
+DATA_TRANSFORMATION_SERVING_PREPROCESSOR_MMAP_FILE_PATH: str = os.path.join(
+    "models", "preprocessor.mmap"
+)
 # KNN-Imputer params
 DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
     "missing_values": np.nan,
@@ -51,6 +90,23 @@ DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
 }
 
 
+"""
+FEATURE SELECTION RELATED CONSTANTS
+"""
+# Opt-in: up to one reference forest fit per feature. The model trainer
+# deploys the reduced preprocessor along with the model trained on it.
+FEATURE_SELECTION_ENABLED: bool = os.getenv("FEATURE_SELECTION_ENABLED", "0") == "1"
+FEATURE_SELECTION_DIRECTORY_NAME: str = "feature_selection"
+FEATURE_SELECTION_TRANSFORMED_DATA_DIRECTORY: str = "transformed"
+FEATURE_SELECTION_PREPROCESSOR_DIRECTORY: str = "preprocessor"
+FEATURE_SELECTION_REPORT_FILE_NAME: str = "report.yaml"
+# Ranking method: "mutual_information" or "permutation_importance"
+FEATURE_SELECTION_METHOD: str = "mutual_information"
+# Largest f1 score drop accepted for the reduced feature model
+FEATURE_SELECTION_F1_TOLERANCE: float = 0.01
+FEATURE_SELECTION_VALIDATION_SPLIT_RATIO: float = 0.2
+
+
 """
 MODEL TRAINER RELATED CONSTANTS
 """
@@ -59,4 +115,119 @@ MODEL_TRAINER_TRAINED_MODEL_DIRECTORY: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD: float = 0.05
+# Training mode: "batch" loads the transformed arrays in memory, "incremental"
+# streams chunks from the feature store into estimators supporting partial_fit
+MODEL_TRAINER_TRAINING_MODE: str = os.getenv("MODEL_TRAINER_TRAINING_MODE", "batch")
+MODEL_TRAINER_INCREMENTAL_CHUNK_SIZE: int = 50_000
+MODEL_TRAINER_INCREMENTAL_EPOCHS: int = 3
+MODEL_TRAINER_INCREMENTAL_HOLDOUT_RATIO: float = 0.2
+# Training rows the preprocessor of incremental training is fit on, sampled
+# uniformly from the stream: KNNImputer keeps them all as reference data
+MODEL_TRAINER_INCREMENTAL_PREPROCESSOR_SAMPLE_SIZE: int = 50_000
+# Opt-in: warm start retraining from the deployed model
+MODEL_TRAINER_WARM_START: bool = os.getenv("MODEL_TRAINER_WARM_START", "0") == "1"
+MODEL_TRAINER_WARM_START_MODEL_FILE_PATH: str = os.path.join("models", "model.pkl")
+MODEL_TRAINER_SERVING_MODEL_MMAP_FILE_PATH: str = os.path.join("models", "model.mmap")
+MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY: str = os.path.join("models", "bundle")
+# Opt-in: distilled student model for the fast latency tier, which is served
+# by the model when there is no student
+MODEL_TRAINER_DISTILLATION_ENABLED: bool = (
+    os.getenv("MODEL_TRAINER_DISTILLATION_ENABLED", "0") == "1"
+)
+MODEL_TRAINER_STUDENT_FILE_PATH: str = os.path.join("models", "student.pkl")
+MODEL_TRAINER_STUDENT_REPORT_FILE_PATH: str = os.path.join(
+    "models", "student_report.yaml"
+)
+MODEL_TRAINER_STUDENT_N_FEATURES: int = 10
+MODEL_TRAINER_STUDENT_MAX_DEPTH: int = 8
+MODEL_TRAINER_MODEL_METADATA_FILE_PATH: str = os.path.join(
+    "models", "model_metadata.yaml"
+)
+MODEL_TRAINER_WARM_START_MIN_ESTIMATORS: int = 10
+MODEL_TRAINER_WARM_START_TOLERANCE: float = 0.01
+# MLflow tracking, a local sqlite file store unless MLFLOW_TRACKING_URI is set
+MODEL_TRAINER_MLFLOW_TRACKING_URI: str = os.getenv(
+    "MLFLOW_TRACKING_URI", "sqlite:///mlflow.db"
+)
+MODEL_TRAINER_MLFLOW_EXIT_TIMEOUT: float = 60.0
+# CPUs split between grid search processes and the threads of every fit,
+# 0 for all the CPUs available to the process (affinity and cgroup quota)
+MODEL_TRAINER_CPUS: int = int(os.getenv("MODEL_TRAINER_CPUS", "0"))
+# Search backend: "local" runs the grid search on this machine, "socket" on
+# the search workers (search_worker.py) of MODEL_TRAINER_SEARCH_WORKERS,
+# comma separated host:port addresses sharing MODEL_TRAINER_SEARCH_AUTHKEY
+SEARCH_BACKEND_LOCAL: str = "local"
+SEARCH_BACKEND_SOCKET: str = "socket"
+MODEL_TRAINER_SEARCH_BACKEND: str = os.getenv(
+    "MODEL_TRAINER_SEARCH_BACKEND", SEARCH_BACKEND_LOCAL
+)
+MODEL_TRAINER_SEARCH_WORKERS: str = os.getenv("MODEL_TRAINER_SEARCH_WORKERS", "")
+MODEL_TRAINER_SEARCH_AUTHKEY: str = os.getenv("MODEL_TRAINER_SEARCH_AUTHKEY", "")
+SEARCH_WORKER_PORT: int = 7000
 TRAINING_BUCKET_NAME: str = "netwworksecurity"
+
+"""
+BATCH SCORING RELATED CONSTANTS
+"""
+BATCH_SCORING_SHARD_SIZE: int = 100_000
+BATCH_SCORING_OUTPUT_DIRECTORY: str = os.path.join("predictions", "batch")
+BATCH_SCORING_PREDICTION_FIELD: str = "predicted"
+BATCH_SCORING_MANIFEST_FILE_NAME: str = "_manifest.json"
+BATCH_SCORING_SUCCESS_FILE_NAME: str = "_SUCCESS"
+
+"""
+PREDICTION LOG RELATED CONSTANTS
+"""
+# Rows scored by the API and their verdicts, logged to Mongo for future training
+PREDICTION_LOG_COLLECTION_NAME: str = "prediction_log"
+PREDICTION_LOG_FLUSH_ROWS: int = 5_000
+PREDICTION_LOG_FLUSH_SECONDS: float = 2.0
+PREDICTION_LOG_INSERT_TIMEOUT_SECONDS: float = 10.0
+# Rows kept in memory before the oldest are spilled to disk
+PREDICTION_LOG_MAX_BUFFER_ROWS: int = 100_000
+PREDICTION_LOG_SPILL_DIRECTORY: str = os.path.join("predictions", "spill")
+PREDICTION_LOG_MAX_POOL_SIZE: int = 10
+
+"""
+MODEL REGISTRY RELATED CONSTANTS
+"""
+# Primary and candidate serving models: a ModelEstimator pickle, or the
+# serving files written to models/ by a live training
+MODEL_REGISTRY_FILE_PATH: str = os.path.join("models", "registry.yaml")
+MODEL_REGISTRY_SERVING_FILES: str = "models"
+SHADOW_SAMPLE_RATE: float = float(os.getenv("SHADOW_SAMPLE_RATE", "0.1"))
+SHADOW_QUEUE_SIZE: int = 16
+
+"""
+ARTIFACT STORE RELATED CONSTANTS
+"""
+# Run files are stored once per content, compressed, in artifacts/.store and
+# listed in the manifest of their run. Opt-in: retention packs and deletes the
+# files of older runs
+ARTIFACT_STORE_ENABLED: bool = os.getenv("ARTIFACT_STORE_ENABLED", "0") == "1"
+ARTIFACT_STORE_DIRECTORY_NAME: str = ".store"
+ARTIFACT_STORE_MANIFEST_FILE_NAME: str = "manifest.json"
+# "zstd" (pyarrow) or "gzip"
+ARTIFACT_STORE_COMPRESSION: str = "zstd"
+# Runs kept, the newest with their files and the others as a manifest
+ARTIFACT_STORE_KEEP_RUNS: int = 10
+ARTIFACT_STORE_KEEP_MATERIALIZED_RUNS: int = 1
+
+"""
+PRE-SCREEN RELATED CONSTANTS
+"""
+PRESCREEN_DIRECTORY: str = os.path.join("models", "prescreen")
+PRESCREEN_MANIFEST_FILE_NAME: str = "manifest.json"
+PRESCREEN_FALSE_POSITIVE_RATE: float = 0.01
+# Labeled URL verdicts from earlier scoring and feeds, one document per URL
+PRESCREEN_COLLECTION_NAME: str = "url_verdicts"
+PRESCREEN_URL_FIELD: str = "url"
+PRESCREEN_LABEL_FIELD: str = TARGET_COLUMN
+
+"""
+INSTRUMENTATION RELATED CONSTANTS
+"""
+INSTRUMENTATION_RUN_REPORT_FILE_NAME: str = "run_report.json"
+INSTRUMENTATION_PROFILE_DIRECTORY_NAME: str = "profiles"
+# Set TRAINING_PIPELINE_PROFILE=1 to dump a cProfile file per stage
+INSTRUMENTATION_PROFILE_ENABLED: bool = os.getenv("TRAINING_PIPELINE_PROFILE") == "1"
@@ -22,6 +22,21 @@ class DataTransformationArtifact:
     transformed_train_file_path: str
     transformed_test_file_path: str
     preprocessor_file_path: str
+    # Sample weights of deduplicated rows, None when rows are not deduplicated
+    train_weight_file_path: str = None
+    test_weight_file_path: str = None
+    # Raw rows of the transformed arrays, in the same order
+    validated_train_file_path: str = None
+    validated_test_file_path: str = None
+
+
+@dataclass
+class FeatureSelectionArtifact:
+    selected_features: list
+    transformed_train_file_path: str
+    transformed_test_file_path: str
+    preprocessor_file_path: str
+    report_file_path: str
 
 
 @dataclass
@@ -36,6 +36,10 @@ class DataIngestionConfig:
         self.train_test_split_ratio: float = (
             training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO
         )
+        self.split_mode: str = training_pipeline.DATA_INGESTION_SPLIT_MODE
+        self.split_hash_key: str = training_pipeline.DATA_INGESTION_SPLIT_HASH_KEY
+        self.chunk_size: int = training_pipeline.DATA_INGESTION_CHUNK_SIZE
+        self.deduplicate: bool = training_pipeline.DATA_INGESTION_DEDUPLICATE
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
 
@@ -93,6 +97,16 @@ class DataTransformationConfig:
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIRECTORY,
             training_pipeline.DATA_TRANSFORMATION_TEST_FILE_PATH,
         )
+        self.transformed_train_weight_file_path = os.path.join(
+            self.data_transformation_directory,
+            training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_TRAIN_WEIGHT_FILE_PATH,
+        )
+        self.transformed_test_weight_file_path = os.path.join(
+            self.data_transformation_directory,
+            training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_TEST_WEIGHT_FILE_PATH,
+        )
         self.preprocessor_file_path = os.path.join(
             self.data_transformation_directory,
             training_pipeline.DATA_TRANSFORMATION_PREPROCESSOR_DIRECTORY,
@@ -100,6 +114,39 @@ class DataTransformationConfig:
         )
 
 
+class FeatureSelectionConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.feature_selection_directory: str = os.path.join(
+            training_pipeline_config.artifact_path,
+            training_pipeline.FEATURE_SELECTION_DIRECTORY_NAME,
+        )
+        self.transformed_train_file_path: str = os.path.join(
+            self.feature_selection_directory,
+            training_pipeline.FEATURE_SELECTION_TRANSFORMED_DATA_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_TRAIN_FILE_PATH,
+        )
+        self.transformed_test_file_path: str = os.path.join(
+            self.feature_selection_directory,
+            training_pipeline.FEATURE_SELECTION_TRANSFORMED_DATA_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_TEST_FILE_PATH,
+        )
+        self.preprocessor_file_path: str = os.path.join(
+            self.feature_selection_directory,
+            training_pipeline.FEATURE_SELECTION_PREPROCESSOR_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_PREPROCESSOR_FILE_NAME,
+        )
+        self.report_file_path: str = os.path.join(
+            self.feature_selection_directory,
+            training_pipeline.FEATURE_SELECTION_REPORT_FILE_NAME,
+        )
+        self.enabled: bool = training_pipeline.FEATURE_SELECTION_ENABLED
+        self.method: str = training_pipeline.FEATURE_SELECTION_METHOD
+        self.f1_tolerance: float = training_pipeline.FEATURE_SELECTION_F1_TOLERANCE
+        self.validation_split_ratio: float = (
+            training_pipeline.FEATURE_SELECTION_VALIDATION_SPLIT_RATIO
+        )
+
+
 class ModelTrainerConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
         self.model_trainer_directory: str = os.path.join(
@@ -115,3 +162,112 @@ class ModelTrainerConfig:
         self.overfit_underfit_threshold: float = (
             training_pipeline.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
         )
+        self.training_mode: str = training_pipeline.MODEL_TRAINER_TRAINING_MODE
+        self.feature_store_file_path: str = DataIngestionConfig(
+            training_pipeline_config=training_pipeline_config
+        ).feature_store_file_path
+        self.incremental_chunk_size: int = (
+            training_pipeline.MODEL_TRAINER_INCREMENTAL_CHUNK_SIZE
+        )
+        self.incremental_epochs: int = training_pipeline.MODEL_TRAINER_INCREMENTAL_EPOCHS
+        self.incremental_holdout_ratio: float = (
+            training_pipeline.MODEL_TRAINER_INCREMENTAL_HOLDOUT_RATIO
+        )
+        self.incremental_preprocessor_sample_size: int = (
+            training_pipeline.MODEL_TRAINER_INCREMENTAL_PREPROCESSOR_SAMPLE_SIZE
+        )
+        self.incremental_preprocessor_file_path: str = os.path.join(
+            self.model_trainer_directory,
+            training_pipeline.DATA_TRANSFORMATION_PREPROCESSOR_DIRECTORY,
+            training_pipeline.DATA_TRANSFORMATION_PREPROCESSOR_FILE_NAME,
+        )
+        self.warm_start: bool = training_pipeline.MODEL_TRAINER_WARM_START
+        self.warm_start_model_file_path: str = (
+            training_pipeline.MODEL_TRAINER_WARM_START_MODEL_FILE_PATH
+        )
+        self.serving_preprocessor_file_path: str = (
+            training_pipeline.DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH
+        )
+        self.serving_preprocessor_mmap_file_path: str = (
+            training_pipeline.DATA_TRANSFORMATION_SERVING_PREPROCESSOR_MMAP_FILE_PATH
+        )
+        self.serving_model_mmap_file_path: str = (
+            training_pipeline.MODEL_TRAINER_SERVING_MODEL_MMAP_FILE_PATH
+        )
+        self.inference_bundle_directory: str = (
+            training_pipeline.MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY
+        )
+        self.distillation_enabled: bool = (
+            training_pipeline.MODEL_TRAINER_DISTILLATION_ENABLED
+        )
+        self.student_file_path: str = training_pipeline.MODEL_TRAINER_STUDENT_FILE_PATH
+        self.student_report_file_path: str = (
+            training_pipeline.MODEL_TRAINER_STUDENT_REPORT_FILE_PATH
+        )
+        self.student_n_features: int = training_pipeline.MODEL_TRAINER_STUDENT_N_FEATURES
+        self.student_max_depth: int = training_pipeline.MODEL_TRAINER_STUDENT_MAX_DEPTH
+        self.model_metadata_file_path: str = (
+            training_pipeline.MODEL_TRAINER_MODEL_METADATA_FILE_PATH
+        )
+        self.warm_start_min_estimators: int = (
+            training_pipeline.MODEL_TRAINER_WARM_START_MIN_ESTIMATORS
+        )
+        self.warm_start_tolerance: float = (
+            training_pipeline.MODEL_TRAINER_WARM_START_TOLERANCE
+        )
+        self.mlflow_tracking_uri: str = (
+            training_pipeline.MODEL_TRAINER_MLFLOW_TRACKING_URI
+        )
+        self.mlflow_exit_timeout: float = (
+            training_pipeline.MODEL_TRAINER_MLFLOW_EXIT_TIMEOUT
+        )
+        self.cpus: int = training_pipeline.MODEL_TRAINER_CPUS
+        self.search_backend: str = training_pipeline.MODEL_TRAINER_SEARCH_BACKEND
+        self.search_workers: list = [
+            (host, int(port))
+            for host, port in (
+                address.strip().rsplit(":", 1)
+                for address in training_pipeline.MODEL_TRAINER_SEARCH_WORKERS.split(",")
+                if address.strip()
+            )
+        ]
+        self.search_authkey: bytes = (
+            training_pipeline.MODEL_TRAINER_SEARCH_AUTHKEY.encode()
+        )
+        self.deploy_serving_files: bool = (
+            training_pipeline.TRAINING_DEPLOYMENT != training_pipeline.DEPLOYMENT_SHADOW
+        )
+        self.model_registry_file_path: str = training_pipeline.MODEL_REGISTRY_FILE_PATH
+
+
+class ArtifactStoreConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.enabled: bool = training_pipeline.ARTIFACT_STORE_ENABLED
+        self.artifact_directory: str = training_pipeline_config.artifact_directory
+        self.run_directory: str = training_pipeline_config.artifact_path
+        self.store_directory: str = os.path.join(
+            training_pipeline_config.artifact_directory,
+            training_pipeline.ARTIFACT_STORE_DIRECTORY_NAME,
+        )
+        self.compression: str = training_pipeline.ARTIFACT_STORE_COMPRESSION
+        self.keep_runs: int = training_pipeline.ARTIFACT_STORE_KEEP_RUNS
+        self.keep_materialized_runs: int = (
+            training_pipeline.ARTIFACT_STORE_KEEP_MATERIALIZED_RUNS
+        )
+        self.model_registry_file_path: str = training_pipeline.MODEL_REGISTRY_FILE_PATH
+
+
+class InstrumentationConfig:
+    def __init__(self, training_pipeline_config: TrainingPipelineConfig):
+        self.run_report_file_path: str = os.path.join(
+            training_pipeline_config.artifact_path,
+            training_pipeline.INSTRUMENTATION_RUN_REPORT_FILE_NAME,
+        )
+        self.profile_directory: str = (
+            os.path.join(
+                training_pipeline_config.artifact_path,
+                training_pipeline.INSTRUMENTATION_PROFILE_DIRECTORY_NAME,
+            )
+            if training_pipeline.INSTRUMENTATION_PROFILE_ENABLED
+            else None
+        )
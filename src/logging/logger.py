@@ -1,7 +1,21 @@
+import json
+import queue
+import atexit
 import logging
+import logging.handlers
 import os
 from datetime import datetime
 
+# Logging is configured from the environment:
+#   LOG_LEVEL         DEBUG, INFO (default), WARNING, ERROR
+#   LOG_FORMAT        text (default) or json, one object per line
+#   LOG_MAX_BYTES     size at which the log file is rotated, 10 MiB by default
+#   LOG_BACKUP_COUNT  rotated files kept, 5 by default
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))
+
 todays_date = datetime.now().strftime("%Y_%m_%d")
 log_directory = os.path.join(os.getcwd(), "logs", todays_date)
 os.makedirs(log_directory, exist_ok=True)
@@ -9,8 +23,63 @@ os.makedirs(log_directory, exist_ok=True)
 log_file_name = f"{datetime.now().strftime('%Y_%m_%d-%H:%M:%S')}.log"
 log_file_path = os.path.join(log_directory, log_file_name)
 
-logging.basicConfig(
-    filename=log_file_path,
-    format="[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
+
+class JsonFormatter(logging.Formatter):
+    """
+    One json object per record, for log shippers. Tracebacks are part of the
+    message, the queue handler merges them before the record is queued.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {
+                "timestamp": self.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+            }
+        )
+
+
+# Records carry no caller file and line, so logging never inspects frames
+logging._srcfile = None
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Opened on the first record: worker processes logging through the queue of
+# their parent never open a file of their own
+file_handler = logging.handlers.RotatingFileHandler(
+    log_file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
 )
+file_handler.setFormatter(
+    JsonFormatter()
+    if LOG_FORMAT == "json"
+    else logging.Formatter("[ %(asctime)s] %(name)s - %(levelname)s - %(message)s")
+)
+
+# Callers only enqueue the record, a background thread writes the file
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(
+    log_queue, file_handler, respect_handler_level=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(handlers=[queue_handler], level=LOG_LEVEL)
+
+
+def configure_worker_logging(worker_log_queue) -> None:
+    """
+    Sends the records of a worker process to a multiprocessing queue of its
+    parent, whose listener writes them to the parent's log file. Called by
+    the initializer of a process pool.
+    """
+    worker_queue_handler = logging.handlers.QueueHandler(worker_log_queue)
+    worker_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(worker_queue_handler)
+    root_logger.setLevel(LOG_LEVEL)
@@ -0,0 +1,265 @@
+import os
+import json
+import multiprocessing
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import configure_worker_logging, logging
+from src.utils.schema_csv import iter_schema_csv
+from src.constants.training_pipeline import (
+    TARGET_COLUMN,
+    BATCH_SCORING_SHARD_SIZE,
+    BATCH_SCORING_PREDICTION_FIELD,
+    BATCH_SCORING_MANIFEST_FILE_NAME,
+    BATCH_SCORING_SUCCESS_FILE_NAME,
+)
+
+# Serving model of a scoring worker process, loaded once by _initialize_worker
+_worker_model = {}
+
+
+def _initialize_worker(latency_tier: str, worker_log_queue):
+    from src.utils.serving_model import get_serving_model
+
+    configure_worker_logging(worker_log_queue)
+    _worker_model["model"] = get_serving_model()
+    _worker_model["latency_tier"] = latency_tier
+
+
+def _predict(df: pd.DataFrame):
+    features = df.drop(
+        columns=[TARGET_COLUMN, "_id", BATCH_SCORING_PREDICTION_FIELD], errors="ignore"
+    )
+    return _worker_model["model"].predict(
+        features, latency_tier=_worker_model["latency_tier"]
+    )
+
+
+def _score_shard_to_file(df: pd.DataFrame, part_file_path: str) -> int:
+    """
+    Scores a shard and writes it as one partition. The partition is written
+    under a temporary name and renamed, so a partition on disk is complete.
+    """
+    df[BATCH_SCORING_PREDICTION_FIELD] = _predict(df)
+    temporary_file_path = f"{part_file_path}.tmp"
+    if part_file_path.endswith(".parquet"):
+        df.to_parquet(temporary_file_path, index=False)
+    else:
+        df.to_csv(temporary_file_path, index=False)
+    os.replace(temporary_file_path, part_file_path)
+    return len(df)
+
+
+def _score_shard(df: pd.DataFrame) -> list:
+    return _predict(df).tolist()
+
+
+class BatchScoringPipeline:
+    """
+    Offline scoring of a CSV or Parquet file, or of a Mongo collection, with
+    the serving model. The input is split into shards scored by a pool of
+    processes, each loading the model once. Files are scored into one
+    partition per shard and Mongo documents get a prediction field; both
+    resume where an interrupted run stopped.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        shard_size: int = BATCH_SCORING_SHARD_SIZE,
+        latency_tier: str = None,
+    ):
+        try:
+            self.max_workers = max_workers or os.cpu_count()
+            self.shard_size = shard_size
+            self.latency_tier = latency_tier
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _executor(self, context, worker_log_queue) -> ProcessPoolExecutor:
+        # Spawned rather than forked: the parent runs the logging listener thread
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_initialize_worker,
+            initargs=(self.latency_tier, worker_log_queue),
+        )
+
+    def _run(self, shards, submit, on_result):
+        """
+        Submits shards to the pool with at most two shards per worker in
+        flight, so the input is streamed rather than loaded whole. Records of
+        the workers are handled by the handlers of this process.
+        """
+        context = multiprocessing.get_context("spawn")
+        worker_log_queue = context.Queue()
+        worker_log_listener = logging.handlers.QueueListener(
+            worker_log_queue, *logging.getLogger().handlers, respect_handler_level=True
+        )
+        worker_log_listener.start()
+        try:
+            with self._executor(context, worker_log_queue) as executor:
+                pending = {}
+                for shard_number, shard in shards:
+                    if len(pending) >= 2 * self.max_workers:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            on_result(pending.pop(future), future.result())
+                    pending[submit(executor, shard_number, shard)] = shard_number
+                for future in wait(pending).done:
+                    on_result(pending.pop(future), future.result())
+        finally:
+            worker_log_listener.stop()
+
+    @staticmethod
+    def _read_shards(input_file_path: str, shard_size: int):
+        if input_file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            batches = pq.ParquetFile(input_file_path).iter_batches(
+                batch_size=shard_size
+            )
+            shards = (batch.to_pandas() for batch in batches)
+        else:
+            shards = iter_schema_csv(input_file_path, shard_size)
+        return enumerate(shards)
+
+    def score_file(
+        self, input_file_path: str, output_directory: str, output_format: str = None
+    ) -> int:
+        """
+        Scores a CSV or Parquet file into part-<shard>.<format> files of the
+        output directory. Partitions written by an earlier run over the same
+        input and shard size, with the same model and latency tier, are kept
+        and their shards are not scored again.
+        """
+        try:
+            from src.utils.serving_model import serving_model_fingerprint
+
+            output_format = output_format or (
+                "parquet" if input_file_path.endswith(".parquet") else "csv"
+            )
+            input_stat = os.stat(input_file_path)
+            manifest = {
+                "input_file_path": os.path.abspath(input_file_path),
+                "input_size": input_stat.st_size,
+                "input_mtime_ns": input_stat.st_mtime_ns,
+                "shard_size": self.shard_size,
+                "output_format": output_format,
+                "latency_tier": self.latency_tier,
+                "model_fingerprint": serving_model_fingerprint(),
+            }
+            os.makedirs(output_directory, exist_ok=True)
+            manifest_file_path = os.path.join(
+                output_directory, BATCH_SCORING_MANIFEST_FILE_NAME
+            )
+            if os.path.exists(manifest_file_path):
+                with open(manifest_file_path) as file:
+                    previous_manifest = json.load(file)
+                if previous_manifest != manifest:
+                    changed = [
+                        key
+                        for key in manifest
+                        if previous_manifest.get(key) != manifest[key]
+                    ]
+                    raise Exception(
+                        f"{output_directory} holds scores of another run "
+                        f"(changed: {', '.join(changed)}), remove it or choose "
+                        "another output directory"
+                    )
+            else:
+                with open(manifest_file_path, "w") as file:
+                    json.dump(manifest, file, indent=2)
+
+            def part_file_path(shard_number: int) -> str:
+                return os.path.join(
+                    output_directory, f"part-{shard_number:05d}.{output_format}"
+                )
+
+            # Shards already written are read again but not scored
+            shards = (
+                (shard_number, shard)
+                for shard_number, shard in self._read_shards(
+                    input_file_path, self.shard_size
+                )
+                if not os.path.exists(part_file_path(shard_number))
+            )
+            scored_rows = []
+
+            def on_result(shard_number: int, rows: int):
+                scored_rows.append(rows)
+                logging.info(f"Scored shard {shard_number}: {rows} rows")
+
+            self._run(
+                shards,
+                submit=lambda executor, shard_number, shard: executor.submit(
+                    _score_shard_to_file, shard, part_file_path(shard_number)
+                ),
+                on_result=on_result,
+            )
+            success_file_path = os.path.join(
+                output_directory, BATCH_SCORING_SUCCESS_FILE_NAME
+            )
+            open(success_file_path, "w").close()
+            logging.info(f"Batch scoring of {input_file_path}: {sum(scored_rows)} rows")
+            return sum(scored_rows)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def score_collection(self, collection) -> int:
+        """
+        Scores the documents of a Mongo collection without a prediction field
+        and sets it with unordered bulk writes, so an interrupted run resumes
+        with the documents left
+        """
+        try:
+            from pymongo import UpdateOne
+
+            cursor = collection.find(
+                {BATCH_SCORING_PREDICTION_FIELD: {"$exists": False}},
+                batch_size=min(self.shard_size, 10_000),
+            )
+
+            def shards():
+                documents = []
+                for document in cursor:
+                    documents.append(document)
+                    if len(documents) == self.shard_size:
+                        yield documents
+                        documents = []
+                if documents:
+                    yield documents
+
+            identifiers = {}
+            scored_rows = []
+
+            def submit(executor, shard_number, documents):
+                df = pd.DataFrame(documents).replace({"na": float("nan")})
+                identifiers[shard_number] = df["_id"].tolist()
+                return executor.submit(_score_shard, df)
+
+            def on_result(shard_number: int, predictions: list):
+                result = collection.bulk_write(
+                    [
+                        UpdateOne(
+                            {"_id": identifier},
+                            {"$set": {BATCH_SCORING_PREDICTION_FIELD: prediction}},
+                        )
+                        for identifier, prediction in zip(
+                            identifiers.pop(shard_number), predictions
+                        )
+                    ],
+                    ordered=False,
+                )
+                scored_rows.append(result.modified_count)
+                logging.info(
+                    f"Scored shard {shard_number}: {result.modified_count} documents"
+                )
+
+            self._run(enumerate(shards()), submit=submit, on_result=on_result)
+            logging.info(
+                f"Batch scoring of {collection.name}: {sum(scored_rows)} documents"
+            )
+            return sum(scored_rows)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
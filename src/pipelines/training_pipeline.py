@@ -9,25 +9,42 @@ from src.entity.config_entity import (
     DataIngestionConfig,
     DataValidationConfig,
     DataTransformationConfig,
+    FeatureSelectionConfig,
     ModelTrainerConfig,
+    ArtifactStoreConfig,
+    InstrumentationConfig,
 )
 
 from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
 from src.components.data_transformation import DataTransformation
+from src.components.feature_selection import FeatureSelection
 from src.components.model_trainer import ModelTrainer
+from src.utils.instrumentation import instrument, run_report
+from src.utils.artifact_store import archive_run
 
 from src.entity.artifact_entity import (
     DataIngestionArtifact,
     DataValidationArtifact,
     DataTransformationArtifact,
+    FeatureSelectionArtifact,
     ModelTrainerArtifact,
 )
 
 
 class TrainingPipeline:
-    def __init__(self):
+    def __init__(self, mongo_client=None):
         self.training_pipeline_config = TrainingPipelineConfig()
+        self.mongo_client = mongo_client
+        self.feature_selection_config = FeatureSelectionConfig(
+            training_pipeline_config=self.training_pipeline_config
+        )
+        self.instrumentation_config = InstrumentationConfig(
+            training_pipeline_config=self.training_pipeline_config
+        )
+        self.model_trainer_config = ModelTrainerConfig(
+            training_pipeline_config=self.training_pipeline_config
+        )
 
     def start_data_ingestion(self) -> DataIngestionArtifact:
         try:
@@ -35,8 +52,12 @@ class TrainingPipeline:
                 training_pipeline_config=self.training_pipeline_config
             )
             logging.info("=== INITIATING DATA INGESTION PROCESS ===")
-            data_ingestion = DataIngestion(data_ingestion_config=data_ingestion_config)
-            data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
+            data_ingestion = DataIngestion(
+                data_ingestion_config=data_ingestion_config,
+                mongo_client=self.mongo_client,
+            )
+            with instrument("data_ingestion"):
+                data_ingestion_artifact = data_ingestion.initiate_data_ingestion()
             logging.info("=== DATA INGESTION PROCESS COMPLETED ===")
             logging.info(f"Data ingestion artifact: {data_ingestion_artifact}")
             return data_ingestion_artifact
@@ -55,7 +76,8 @@ class TrainingPipeline:
                 data_ingestion_artifact=data_ingestion_artifact,
                 data_validation_config=data_validation_config,
             )
-            data_validation_artifact = data_validation.initiate_data_validation()
+            with instrument("data_validation"):
+                data_validation_artifact = data_validation.initiate_data_validation()
             logging.info("=== DATA VALIDATION PROCESS COMPLETED ===")
             logging.info(f"Data validation artifact: {data_validation_artifact}")
             return data_validation_artifact
@@ -74,48 +96,115 @@ class TrainingPipeline:
                 data_validation_artifact=data_validation_artifact,
                 data_transformation_config=data_transformation_config,
             )
-            data_transformation_artifact = (
-                data_transformation.initiate_data_transformation()
-            )
+            with instrument("data_transformation"):
+                data_transformation_artifact = (
+                    data_transformation.initiate_data_transformation()
+                )
             logging.info("=== DATA TRANSFORMATION PROCESS COMPLETED ===")
             logging.info(
                 f"Data transformation artifact: {data_transformation_artifact}"
             )
             return data_transformation_artifact
         except Exception as e:
-            return NetworkSecurityException(error_message=e)
+            raise NetworkSecurityException(error_message=e)
+
+    def start_feature_selection(
+        self,
+        data_validation_artifact: DataValidationArtifact,
+        data_transformation_artifact: DataTransformationArtifact,
+    ) -> FeatureSelectionArtifact:
+        try:
+            logging.info("=== INITIATING FEATURE SELECTION PROCESS ===")
+            feature_selection = FeatureSelection(
+                data_validation_artifact=data_validation_artifact,
+                data_transformation_artifact=data_transformation_artifact,
+                feature_selection_config=self.feature_selection_config,
+            )
+            with instrument("feature_selection"):
+                feature_selection_artifact = (
+                    feature_selection.initiate_feature_selection()
+                )
+            logging.info("=== FEATURE SELECTION PROCESS COMPLETED ===")
+            logging.info(f"Feature selection artifact: {feature_selection_artifact}")
+            return feature_selection_artifact
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
 
     def start_model_trainer(
         self, data_transformation_artifact: DataTransformationArtifact
     ) -> ModelTrainerArtifact:
         try:
-            model_trainer_config = ModelTrainerConfig(
-                training_pipeline_config=self.training_pipeline_config
-            )
             logging.info("=== INITIATING MODEL TRAINING PROCESS ===")
             model_trainer = ModelTrainer(
                 data_transformation_artifact=data_transformation_artifact,
-                model_trainer_config=model_trainer_config,
+                model_trainer_config=self.model_trainer_config,
             )
-            model_trainer_artifact = model_trainer.initiate_model_trainer()
+            with instrument("model_trainer"):
+                model_trainer_artifact = model_trainer.initiate_model_trainer()
             logging.info("=== MODEL TRAINING PROCESS COMPLETED ===")
             logging.info(f"Model trainer artifact: {model_trainer_artifact}")
             return model_trainer_artifact
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
-    def run_pipeline(self):
+    def start_artifact_archiving(self) -> dict:
+        """
+        Stores the artifacts of the run once per content and prunes old runs
+        """
         try:
-            data_ingestion_artifact = self.start_data_ingestion()
-            data_validation_artifact = self.start_data_validation(
-                data_ingestion_artifact=data_ingestion_artifact
-            )
-            data_transformation_artifact = self.start_data_transformation(
-                data_validation_artifact=data_validation_artifact
-            )
-            model_trainer_artifact = self.start_model_trainer(
-                data_transformation_artifact=data_transformation_artifact
+            artifact_store_config = ArtifactStoreConfig(
+                training_pipeline_config=self.training_pipeline_config
             )
-            return model_trainer_artifact
+            if not artifact_store_config.enabled:
+                return None
+            with instrument("artifact_store"):
+                artifact_store_report = archive_run(artifact_store_config)
+            return artifact_store_report
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def run_pipeline(self):
+        try:
+            with run_report(
+                report_file_path=self.instrumentation_config.run_report_file_path,
+                profile_directory=self.instrumentation_config.profile_directory,
+            ):
+                data_ingestion_artifact = self.start_data_ingestion()
+                data_validation_artifact = self.start_data_validation(
+                    data_ingestion_artifact=data_ingestion_artifact
+                )
+                if self.model_trainer_config.training_mode == "incremental":
+                    # The trainer streams the feature store and fits its own
+                    # preprocessor on a sample, nothing is loaded whole
+                    data_transformation_artifact = None
+                else:
+                    data_transformation_artifact = self.start_data_transformation(
+                        data_validation_artifact=data_validation_artifact
+                    )
+                feature_selection_enabled = (
+                    data_transformation_artifact is not None
+                    and self.feature_selection_config.enabled
+                )
+                if feature_selection_enabled:
+                    feature_selection_artifact = self.start_feature_selection(
+                        data_validation_artifact=data_validation_artifact,
+                        data_transformation_artifact=data_transformation_artifact,
+                    )
+                    # The model is trained on the selected features only
+                    data_transformation_artifact = DataTransformationArtifact(
+                        transformed_train_file_path=feature_selection_artifact.transformed_train_file_path,
+                        transformed_test_file_path=feature_selection_artifact.transformed_test_file_path,
+                        preprocessor_file_path=feature_selection_artifact.preprocessor_file_path,
+                        # Feature selection keeps the rows, and so their weights
+                        train_weight_file_path=data_transformation_artifact.train_weight_file_path,
+                        test_weight_file_path=data_transformation_artifact.test_weight_file_path,
+                        validated_train_file_path=data_transformation_artifact.validated_train_file_path,
+                        validated_test_file_path=data_transformation_artifact.validated_test_file_path,
+                    )
+                model_trainer_artifact = self.start_model_trainer(
+                    data_transformation_artifact=data_transformation_artifact
+                )
+                self.start_artifact_archiving()
+                return model_trainer_artifact
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,390 @@
+import os
+import gzip
+import json
+import shutil
+import hashlib
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.model_registry import read_registry
+from src.constants.training_pipeline import (
+    ARTIFACT_STORE_COMPRESSION,
+    ARTIFACT_STORE_MANIFEST_FILE_NAME,
+    MODEL_REGISTRY_FILE_PATH,
+)
+
+# Suffix of the blobs of every compression
+_BLOB_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _open_blob(file_path: str, mode: str, suffix: str):
+    """
+    Streaming (de)compression of a blob with the compression of its suffix,
+    zstd on pyarrow or gzip
+    """
+    if suffix == _BLOB_SUFFIXES["zstd"]:
+        pyarrow = _pyarrow()
+        if pyarrow is None:
+            raise Exception(f"pyarrow is needed to read {file_path}")
+        if mode == "wb":
+            return pyarrow.CompressedOutputStream(file_path, "zstd")
+        return pyarrow.CompressedInputStream(pyarrow.OSFile(file_path), "zstd")
+    return gzip.open(file_path, mode, compresslevel=1)
+
+
+def _file_digest(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def link_file(source_file_path: str, file_path: str):
+    """
+    Hardlinks a file to another path of the same file system, or copies it
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        try:
+            os.link(source_file_path, file_path)
+        except OSError:
+            shutil.copyfile(source_file_path, file_path)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def disk_usage(directory: str) -> int:
+    """
+    Bytes of the files under a directory, hardlinked files counted once
+    """
+    inodes = {}
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            stat = os.lstat(os.path.join(root, file_name))
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_blocks * 512
+    return sum(inodes.values())
+
+
+class ArtifactStore:
+    """
+    Content addressed store of the artifact files of the training runs: every
+    distinct content is written once, compressed, under its sha256. A run
+    committed to the store has a manifest of its files and their digests, so
+    its files can be removed and restored from the blobs. The blobs of a run
+    are written when it is packed: a run keeping its files is not stored
+    twice.
+    """
+
+    def __init__(
+        self, store_directory: str, compression: str = ARTIFACT_STORE_COMPRESSION
+    ):
+        try:
+            self.store_directory = store_directory
+            self.blobs_directory = os.path.join(store_directory, "blobs")
+            if compression == "zstd" and _pyarrow() is None:
+                compression = "gzip"
+            self.suffix = _BLOB_SUFFIXES[compression]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _blob_file_path(self, digest: str, suffix: str = None) -> str:
+        return os.path.join(
+            self.blobs_directory, digest[:2], digest + (suffix or self.suffix)
+        )
+
+    def _find_blob(self, digest: str) -> str:
+        """
+        Blob of a digest in any compression, None when it is not stored
+        """
+        for suffix in _BLOB_SUFFIXES.values():
+            blob_file_path = self._blob_file_path(digest, suffix)
+            if os.path.exists(blob_file_path):
+                return blob_file_path
+        return None
+
+    def put_file(self, file_path: str) -> tuple:
+        """
+        Stores the content of a file, once. Returns its digest and the bytes
+        written to the store: 0 when the content was already stored.
+        """
+        try:
+            digest = _file_digest(file_path)
+            if self._find_blob(digest) is not None:
+                return digest, 0
+
+            blob_file_path = self._blob_file_path(digest)
+            os.makedirs(os.path.dirname(blob_file_path), exist_ok=True)
+            temporary_file_path = f"{blob_file_path}.tmp"
+            with open(file_path, "rb") as file, _open_blob(
+                temporary_file_path, "wb", self.suffix
+            ) as blob:
+                shutil.copyfileobj(file, blob, length=1 << 20)
+            os.replace(temporary_file_path, blob_file_path)
+            return digest, os.path.getsize(blob_file_path)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def restore_file(self, digest: str, file_path: str):
+        try:
+            blob_file_path = self._find_blob(digest)
+            if blob_file_path is None:
+                raise Exception(f"Blob {digest} of {file_path} is not in the store")
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            temporary_file_path = f"{file_path}.tmp"
+            suffix = os.path.splitext(blob_file_path)[1]
+            with _open_blob(blob_file_path, "rb", suffix) as blob, open(
+                temporary_file_path, "wb"
+            ) as file:
+                shutil.copyfileobj(blob, file, length=1 << 20)
+            os.replace(temporary_file_path, file_path)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @staticmethod
+    def read_manifest(run_directory: str) -> dict:
+        """
+        Files of a committed run, {relative path: {digest, size}}; None when
+        the run was not committed
+        """
+        manifest_file_path = os.path.join(
+            run_directory, ARTIFACT_STORE_MANIFEST_FILE_NAME
+        )
+        if not os.path.exists(manifest_file_path):
+            return None
+        with open(manifest_file_path) as file:
+            return json.load(file)["files"]
+
+    def commit_run(self, run_directory: str, store_files: bool = True) -> dict:
+        """
+        Writes the manifest of a run, and stores every file of it unless
+        store_files is False (pack_run stores them before removing them).
+        Returns the bytes of the run and the bytes written to the store for
+        it. Hardlinked files are read once.
+        """
+        try:
+            files, stored_bytes, inode_digests = {}, 0, {}
+            for root, _, file_names in os.walk(run_directory):
+                for file_name in sorted(file_names):
+                    file_path = os.path.join(root, file_name)
+                    relative_path = os.path.relpath(file_path, run_directory)
+                    if relative_path == ARTIFACT_STORE_MANIFEST_FILE_NAME:
+                        continue
+                    stat = os.stat(file_path)
+                    inode = (stat.st_dev, stat.st_ino)
+                    if inode not in inode_digests and store_files:
+                        inode_digests[inode], written = self.put_file(file_path)
+                        stored_bytes += written
+                    elif inode not in inode_digests:
+                        inode_digests[inode] = _file_digest(file_path)
+                    files[relative_path] = {
+                        "digest": inode_digests[inode],
+                        "size": stat.st_size,
+                    }
+
+            manifest_file_path = os.path.join(
+                run_directory, ARTIFACT_STORE_MANIFEST_FILE_NAME
+            )
+            with open(f"{manifest_file_path}.tmp", "w") as file:
+                json.dump({"files": files}, file, indent=2)
+            os.replace(f"{manifest_file_path}.tmp", manifest_file_path)
+
+            return {
+                "files": len(files),
+                "run_bytes": sum(file["size"] for file in files.values()),
+                "unique_bytes": sum(
+                    {file["digest"]: file["size"] for file in files.values()}.values()
+                ),
+                "stored_bytes": stored_bytes,
+            }
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def pack_run(self, run_directory: str, keep_file_paths: set = frozenset()) -> int:
+        """
+        Removes the files of a committed run, all but keep_file_paths, leaving
+        its manifest. A file is stored first when its blob is missing, and
+        refused when it no longer has the content of the manifest. Returns the
+        number of files removed.
+        """
+        try:
+            manifest = self.read_manifest(run_directory)
+            if manifest is None:
+                raise Exception(f"Run {run_directory} was not committed")
+            removed = 0
+            for relative_path, file in manifest.items():
+                file_path = os.path.join(run_directory, relative_path)
+                if os.path.abspath(file_path) in keep_file_paths:
+                    continue
+                if not os.path.exists(file_path):
+                    continue
+                if self._find_blob(file["digest"]) is None:
+                    digest, _ = self.put_file(file_path)
+                    if digest != file["digest"]:
+                        raise Exception(
+                            f"{file_path} changed since its run was committed"
+                        )
+                os.remove(file_path)
+                removed += 1
+            for root, directory_names, _ in os.walk(run_directory, topdown=False):
+                for directory_name in directory_names:
+                    directory = os.path.join(root, directory_name)
+                    if not os.listdir(directory):
+                        os.rmdir(directory)
+            return removed
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def restore_run(self, run_directory: str) -> int:
+        """
+        Restores the removed files of a packed run from the store. Returns the
+        number of files restored.
+        """
+        try:
+            manifest = self.read_manifest(run_directory)
+            if manifest is None:
+                raise Exception(f"Run {run_directory} was not committed")
+            restored = 0
+            for relative_path, file in manifest.items():
+                file_path = os.path.join(run_directory, relative_path)
+                if not os.path.exists(file_path):
+                    self.restore_file(file["digest"], file_path)
+                    restored += 1
+            return restored
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def collect_garbage(self, run_directories: list) -> int:
+        """
+        Removes the blobs no manifest of the runs refers to. Returns the bytes
+        freed.
+        """
+        try:
+            referenced = set()
+            for run_directory in run_directories:
+                manifest = self.read_manifest(run_directory) or {}
+                referenced.update(file["digest"] for file in manifest.values())
+
+            freed = 0
+            for root, _, file_names in os.walk(self.blobs_directory):
+                for file_name in file_names:
+                    digest = file_name.split(".")[0]
+                    if digest not in referenced:
+                        blob_file_path = os.path.join(root, file_name)
+                        freed += os.path.getsize(blob_file_path)
+                        os.remove(blob_file_path)
+            return freed
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def apply_retention(
+        self,
+        artifact_directory: str,
+        keep_runs: int,
+        keep_materialized_runs: int,
+        keep_file_paths: set = frozenset(),
+    ) -> dict:
+        """
+        Retention of the runs of an artifact directory, newest first: the
+        newest keep_materialized_runs keep their files, the next ones up to
+        keep_runs are committed and packed, older runs are deleted, then
+        unreferenced blobs are collected. Runs holding one of keep_file_paths
+        (e.g. a registered model) are neither deleted nor packed.
+        """
+        try:
+            run_directories = sorted(
+                (
+                    os.path.join(artifact_directory, name)
+                    for name in os.listdir(artifact_directory)
+                    if not name.startswith(".")
+                    and os.path.isdir(os.path.join(artifact_directory, name))
+                ),
+                reverse=True,
+            )
+            kept, packed, deleted = [], 0, 0
+            for age, run_directory in enumerate(run_directories):
+                protected = any(
+                    file_path.startswith(os.path.abspath(run_directory) + os.sep)
+                    for file_path in keep_file_paths
+                )
+                if age >= keep_runs and not protected:
+                    shutil.rmtree(run_directory)
+                    deleted += 1
+                    continue
+                kept.append(run_directory)
+                if age >= max(keep_materialized_runs, 1):
+                    if self.read_manifest(run_directory) is None:
+                        self.commit_run(run_directory, store_files=False)
+                    if self.pack_run(run_directory, keep_file_paths):
+                        packed += 1
+            freed = self.collect_garbage(kept)
+            logging.info(
+                f"Artifact retention: {len(kept)} runs kept, {packed} packed, "
+                f"{deleted} deleted, {freed} blob bytes freed"
+            )
+            return {"kept": len(kept), "packed": packed, "deleted": deleted}
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+
+def registered_model_file_paths(
+    registry_file_path: str = MODEL_REGISTRY_FILE_PATH,
+) -> set:
+    """
+    Model files of the registry, which must stay where the registry points
+    """
+    try:
+        registry = read_registry(registry_file_path)
+        return {
+            os.path.abspath(registry[role])
+            for role in ("primary", "candidate")
+            if registry[role] and os.path.isfile(registry[role])
+        }
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def archive_run(artifact_store_config) -> dict:
+    """
+    Commits the artifacts of a finished run to the store and applies the
+    retention policy. The run keeps its files and only gets a manifest, its
+    blobs are written once retention packs it. Returns the bytes of the run,
+    the disk usage of the store and of the artifact directory before and
+    after.
+    """
+    try:
+        artifact_directory = artifact_store_config.artifact_directory
+        disk_usage_before = disk_usage(artifact_directory)
+        artifact_store = ArtifactStore(
+            store_directory=artifact_store_config.store_directory,
+            compression=artifact_store_config.compression,
+        )
+        report = artifact_store.commit_run(
+            artifact_store_config.run_directory, store_files=False
+        )
+
+        keep_file_paths = registered_model_file_paths(
+            artifact_store_config.model_registry_file_path
+        )
+        report.update(
+            artifact_store.apply_retention(
+                artifact_directory=artifact_directory,
+                keep_runs=artifact_store_config.keep_runs,
+                keep_materialized_runs=artifact_store_config.keep_materialized_runs,
+                keep_file_paths=keep_file_paths,
+            )
+        )
+        report["store_bytes"] = disk_usage(artifact_store.store_directory)
+        report["disk_usage_before"] = disk_usage_before
+        report["disk_usage_after"] = disk_usage(artifact_directory)
+        logging.info(f"Artifact store report: {report}")
+        return report
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
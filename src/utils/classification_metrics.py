@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from src.entity.artifact_entity import ClassificationMetricArtifact
 from src.exception.exception import NetworkSecurityException
@@ -6,12 +7,18 @@ from sklearn.metrics import precision_score, recall_score, f1_score
 
 
 def classification_scores(
-    y_true: pd.Series, y_pred: pd.Series
+    y_true: pd.Series, y_pred: pd.Series, sample_weight: np.array = None
 ) -> ClassificationMetricArtifact:
     try:
-        model_precision_score = precision_score(y_true=y_true, y_pred=y_pred)
-        model_recall_score = recall_score(y_true=y_true, y_pred=y_pred)
-        model_f1_score = f1_score(y_true=y_true, y_pred=y_pred)
+        model_precision_score = precision_score(
+            y_true=y_true, y_pred=y_pred, sample_weight=sample_weight
+        )
+        model_recall_score = recall_score(
+            y_true=y_true, y_pred=y_pred, sample_weight=sample_weight
+        )
+        model_f1_score = f1_score(
+            y_true=y_true, y_pred=y_pred, sample_weight=sample_weight
+        )
 
         classification_metric_artifact = ClassificationMetricArtifact(
             precision_score=model_precision_score,
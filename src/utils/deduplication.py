@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from src.exception.exception import NetworkSecurityException
+from src.constants.training_pipeline import SAMPLE_WEIGHT_COLUMN
+
+# Two bits per ternary value (missing, -1, 0 or 1) in a uint64 key
+MAX_PACKED_COLUMNS: int = 32
+
+
+def pack_rows(df: pd.DataFrame) -> np.array:
+    """
+    One uint64 key per row, equal for identical rows. Rows of up to 32
+    ternary columns are packed two bits per value, without collisions; other
+    rows (wider, or with non-ternary values) get a 64-bit hash instead.
+    """
+    try:
+        keys = np.zeros(len(df), dtype=np.uint64)
+        if df.shape[1] <= MAX_PACKED_COLUMNS:
+            for position, (_, column) in enumerate(df.items()):
+                values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+                # missing -> 0, -1 -> 1, 0 -> 2, 1 -> 3
+                codes = np.nan_to_num(values + 2, nan=0.0)
+                if not np.isin(codes, (0, 1, 2, 3)).all():
+                    break
+                keys |= codes.astype(np.uint64) << np.uint64(2 * position)
+            else:
+                return keys
+        return pd.util.hash_pandas_object(
+            df.astype("float64"), index=False
+        ).to_numpy()
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def deduplicate(
+    df: pd.DataFrame, weight_column: str = SAMPLE_WEIGHT_COLUMN
+) -> pd.DataFrame:
+    """
+    Collapses identical rows into their first occurrence, with the number of
+    rows it stands for in the weight column. Weights of already deduplicated
+    rows add up, so deduplicating chunks and then their concatenation gives
+    the same rows as deduplicating the whole.
+    """
+    try:
+        weights = df[weight_column].to_numpy() if weight_column in df else None
+        rows = df.drop(columns=[weight_column], errors="ignore")
+        _, first_positions, inverse = np.unique(
+            pack_rows(rows), return_index=True, return_inverse=True
+        )
+        counts = np.bincount(inverse, weights=weights).astype(np.int64)
+        order = np.argsort(first_positions)
+        unique_rows = rows.iloc[first_positions[order]].reset_index(drop=True)
+        unique_rows[weight_column] = counts[order]
+        return unique_rows
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def expand(X: np.array, y: np.array, sample_weight: np.array) -> tuple:
+    """
+    Repeats every row as many times as its weight, for estimators and
+    scores that do not take sample weights
+    """
+    try:
+        repeats = np.asarray(sample_weight).astype(np.int64)
+        return np.repeat(X, repeats, axis=0), np.repeat(y, repeats)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
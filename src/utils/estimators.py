@@ -0,0 +1,139 @@
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.naive_bayes import CategoricalNB
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.tree import DecisionTreeClassifier
+from src.exception.exception import NetworkSecurityException
+from src.utils.numpy_predictor import column_positions
+
+
+def ternary_codes(X: np.array) -> np.array:
+    """
+    Map ternary features {-1, 0, 1} to non-negative category codes {0, 1, 2}.
+    Imputed (fractional) values are rounded and missing values map to 0.
+    """
+    try:
+        X = np.nan_to_num(np.asarray(X, dtype=np.float64), nan=0.0)
+        return (np.clip(np.rint(X), -1, 1) + 1).astype(np.int8)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+class TernaryCategoricalNB(CategoricalNB):
+    """
+    Categorical naive Bayes over the ternary feature codes, usable directly on
+    the imputed feature matrix and trainable out-of-core with partial_fit.
+    """
+
+    def fit(self, X, y, sample_weight=None):
+        return super().fit(ternary_codes(X), y, sample_weight=sample_weight)
+
+    def partial_fit(self, X, y, classes=None, sample_weight=None):
+        return super().partial_fit(
+            ternary_codes(X), y, classes=classes, sample_weight=sample_weight
+        )
+
+    def predict(self, X):
+        return super().predict(ternary_codes(X))
+
+    # predict_proba delegates to predict_log_proba, so it is encoded only once
+    def predict_log_proba(self, X):
+        return super().predict_log_proba(ternary_codes(X))
+
+
+class TernaryHistGradientBoostingClassifier(HistGradientBoostingClassifier):
+    """
+    Histogram gradient boosting over the ternary feature codes. Codes are
+    non-negative so they can be declared as native categorical features,
+    which the booster would otherwise treat -1 as missing.
+    """
+
+    def fit(self, X, y, sample_weight=None):
+        return super().fit(ternary_codes(X), y, sample_weight=sample_weight)
+
+    def predict(self, X):
+        return super().predict(ternary_codes(X))
+
+    def predict_proba(self, X):
+        return super().predict_proba(ternary_codes(X))
+
+    def decision_function(self, X):
+        return super().decision_function(ternary_codes(X))
+
+
+class TernaryLookupClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Compact student model: a lookup table indexed by the packed ternary codes
+    of a few features (3 ** len(features) cells). Cells seen in training hold
+    their majority label; the others are filled by a shallow decision tree.
+    It works on raw, unimputed features, so scoring is a single table lookup
+    per row; rows missing one of its features are not available to it and
+    are left to the model.
+    """
+
+    def __init__(self, features: list = None, max_depth: int = 8):
+        self.features = features
+        self.max_depth = max_depth
+
+    def _student_columns(self, X) -> np.array:
+        if hasattr(X, "columns"):
+            # Positional take on the whole frame: selecting columns by label
+            # costs more than the table lookup itself for a single row
+            X = X.to_numpy()[:, column_positions(X.columns, self.features)]
+        else:
+            X = np.asarray(X)[:, self.feature_indices_]
+        return np.asarray(X, dtype=np.float64)
+
+    def _packed_codes(self, X) -> np.array:
+        return ternary_codes(self._student_columns(X)).astype(np.int64) @ self.powers_
+
+    def available(self, X) -> np.array:
+        """
+        Mask of the rows that have every feature of the student
+        """
+        try:
+            return ~np.isnan(self._student_columns(X)).any(axis=1)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def fit(self, X, y, sample_weight=None):
+        try:
+            if hasattr(X, "columns"):
+                self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+                self.feature_indices_ = [
+                    X.columns.get_loc(feature) for feature in self.features
+                ]
+            else:
+                self.feature_indices_ = list(range(len(self.features)))
+            self.n_features_in_ = X.shape[1]
+            self.powers_ = 3 ** np.arange(len(self.features), dtype=np.int64)
+            self.classes_, y_encoded = np.unique(y, return_inverse=True)
+
+            codes = self._packed_codes(X)
+            n_cells = 3 ** len(self.features)
+            counts = np.bincount(
+                codes * len(self.classes_) + y_encoded,
+                weights=sample_weight,
+                minlength=n_cells * len(self.classes_),
+            ).reshape(n_cells, len(self.classes_))
+
+            # Unseen cells: decision tree over the codes of every possible cell
+            cells = (np.arange(n_cells)[:, None] // self.powers_) % 3
+            tree = DecisionTreeClassifier(max_depth=self.max_depth, random_state=42)
+            tree.fit(
+                (codes[:, None] // self.powers_) % 3,
+                y_encoded,
+                sample_weight=sample_weight,
+            )
+            self.table_ = np.where(
+                counts.sum(axis=1) > 0, counts.argmax(axis=1), tree.predict(cells)
+            ).astype(np.int8)
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def predict(self, X):
+        try:
+            return self.classes_[self.table_[self._packed_codes(X)]]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,176 @@
+import os
+import json
+import shutil
+import numpy as np
+from sklearn.pipeline import Pipeline
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import CategoricalNB
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import (
+    AdaBoostClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.numpy_predictor import BUNDLE_ARRAYS_DIRECTORY, BUNDLE_MANIFEST_FILE_NAME
+
+
+def _flatten_trees(trees: list, normalize: bool) -> dict:
+    """
+    Concatenates the node arrays of fitted trees, offsetting child indices so
+    all trees can be traversed together.
+    """
+    arrays = {
+        "children_left": [],
+        "children_right": [],
+        "feature": [],
+        "threshold": [],
+        "value": [],
+    }
+    roots = []
+    offset = 0
+    for tree in trees:
+        tree = tree.tree_
+        is_leaf = tree.children_left == -1
+        arrays["children_left"].append(
+            np.where(is_leaf, -1, tree.children_left + offset)
+        )
+        arrays["children_right"].append(
+            np.where(is_leaf, -1, tree.children_right + offset)
+        )
+        arrays["feature"].append(np.where(is_leaf, 0, tree.feature))
+        arrays["threshold"].append(tree.threshold)
+        value = tree.value[:, 0, :]
+        if normalize:
+            value = value / value.sum(axis=1, keepdims=True)
+        arrays["value"].append(value)
+        roots.append(offset)
+        offset += tree.node_count
+
+    flattened = {
+        f"trees_{name}": np.concatenate(values) for name, values in arrays.items()
+    }
+    flattened["trees_roots"] = np.asarray(roots, dtype=np.intp)
+    return flattened
+
+
+def _export_model(model, arrays: dict) -> dict:
+    """
+    Adds the model parameters to arrays and returns the model manifest, or
+    None if the model type can't be exported. KNN is left out on purpose: its
+    tree based neighbor search orders equidistant ternary neighbors in a way
+    that can't be reproduced (the imputer's brute force argpartition can).
+    """
+    if len(model.classes_) != 2:
+        return None
+    manifest = {"classes": model.classes_.tolist()}
+
+    if isinstance(model, (LogisticRegression, SGDClassifier)):
+        arrays["coef"] = model.coef_[0]
+        manifest.update({"kind": "linear", "intercept": float(model.intercept_[0])})
+    elif isinstance(model, (RandomForestClassifier, DecisionTreeClassifier)):
+        trees = model.estimators_ if hasattr(model, "estimators_") else [model]
+        arrays.update(_flatten_trees(trees, normalize=True))
+        manifest["kind"] = "tree_ensemble"
+    elif isinstance(model, GradientBoostingClassifier):
+        arrays.update(_flatten_trees(model.estimators_[:, 0], normalize=False))
+        if model.init_ == "zero":
+            init = 0.0
+        else:
+            prior = model.init_.predict_proba(np.zeros((1, model.n_features_in_)))
+            init = float(np.log(prior[0, 1] / prior[0, 0]))
+        manifest.update(
+            {
+                "kind": "gradient_boosting",
+                "init": init,
+                "learning_rate": float(model.learning_rate),
+            }
+        )
+    elif isinstance(model, AdaBoostClassifier):
+        n_estimators = len(model.estimators_)
+        arrays.update(_flatten_trees(model.estimators_, normalize=True))
+        arrays["estimator_weights"] = model.estimator_weights_[:n_estimators]
+        manifest["kind"] = "samme"
+    elif isinstance(model, CategoricalNB):
+        arrays["feature_log_prob"] = np.stack(model.feature_log_prob_)
+        arrays["class_log_prior"] = model.class_log_prior_
+        manifest["kind"] = "categorical_nb"
+    else:
+        return None
+    return manifest
+
+
+def export_inference_bundle(
+    preprocessor, model, bundle_directory: str, student=None
+) -> bool:
+    """
+    Exports the preprocessor, model and optional distilled student as a
+    self-contained inference bundle: a json manifest plus numpy arrays, served
+    by NumpyPredictor without pandas or scikit-learn. Returns False, and
+    removes any stale bundle, when the model type is not supported.
+    """
+    try:
+        feature_names = None
+        if isinstance(preprocessor, Pipeline):
+            imputer = preprocessor.named_steps["imputer"]
+            if len(preprocessor.steps) > 1:
+                # Columns kept by the feature selection step
+                feature_names = preprocessor[:-1].get_feature_names_out().tolist()
+        else:
+            imputer = preprocessor
+        if feature_names is None and hasattr(imputer, "feature_names_in_"):
+            feature_names = imputer.feature_names_in_.tolist()
+        if not isinstance(imputer, KNNImputer) or not np.isnan(imputer.missing_values):
+            raise Exception(f"Unsupported preprocessor: {preprocessor}")
+
+        # In its own dtype: imputation runs in float32 when both sides are
+        fit_X = np.asarray(imputer._fit_X)
+        fit_X_missing = np.isnan(fit_X)
+        arrays = {
+            "imputer_fit_X": fit_X,
+            "imputer_valid_mask": ~fit_X_missing.all(axis=0),
+        }
+        manifest = {
+            "preprocessor": {
+                "feature_names": feature_names,
+                "n_neighbors": int(imputer.n_neighbors),
+                "weights": imputer.weights,
+            },
+        }
+
+        model_manifest = _export_model(model, arrays)
+        if model_manifest is None:
+            logging.warning(
+                f"{type(model).__name__} can't be exported as an inference bundle."
+            )
+            shutil.rmtree(bundle_directory, ignore_errors=True)
+            return False
+        manifest["model"] = model_manifest
+        if student is not None:
+            arrays["student_table"] = student.table_
+            manifest["student"] = {
+                "features": list(student.features),
+                "classes": student.classes_.tolist(),
+            }
+        manifest["arrays"] = sorted(arrays)
+
+        # Write next to the bundle and swap it in, so workers never read a partial one
+        staging_directory = f"{bundle_directory}.staging"
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        os.makedirs(os.path.join(staging_directory, BUNDLE_ARRAYS_DIRECTORY))
+        for name, array in arrays.items():
+            np.save(
+                os.path.join(staging_directory, BUNDLE_ARRAYS_DIRECTORY, f"{name}.npy"),
+                np.ascontiguousarray(array),
+            )
+        with open(os.path.join(staging_directory, BUNDLE_MANIFEST_FILE_NAME), "w") as file:
+            json.dump(manifest, file, indent=2)
+
+        shutil.rmtree(bundle_directory, ignore_errors=True)
+        os.replace(staging_directory, bundle_directory)
+        logging.info(f"Inference bundle exported to: {bundle_directory}")
+        return True
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
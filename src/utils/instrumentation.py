@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import cProfile
+import resource
+from datetime import datetime
+from contextlib import contextmanager
+from src.logging.logger import logging
+
+# Run being recorded, empty outside of run_report
+_active_run = {}
+
+
+def _rss_bytes(field: str) -> int:
+    """
+    Current (VmRSS) or peak (VmHWM) resident set size of the process. Falls
+    back to the lifetime peak from getrusage where /proc is not available.
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Resets the peak RSS of the process (Linux 4.0+), so every stage measures
+    its own peak. Returns False when the peak can't be reset.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def instrument(stage: str, rows: int = None):
+    """
+    Records wall time, CPU time, peak RSS and rows processed of a block into
+    the active run report. Yields the stage record, so rows can be set once
+    they are known. Nested stages are named after their parents. CPU time
+    covers the threads of this process, not joblib worker processes.
+    """
+    stack = _active_run.setdefault("stack", [])
+    name = "/".join([parent["stage"] for parent in stack[-1:]] + [stage])
+    record = {
+        "stage": name,
+        "started_at": datetime.now().isoformat(),
+        "rows": rows,
+        "status": "running",
+    }
+    profile = _active_run.get("profile_directory") is not None and not stack
+
+    # The peak is reset for every stage: fold it into the open stages first
+    peak_rss = _rss_bytes("VmHWM")
+    for parent in stack:
+        parent["peak_rss_bytes"] = max(parent["peak_rss_bytes"], peak_rss)
+    peak_reset = _reset_peak_rss()
+    record["peak_rss_bytes"] = 0
+    record["rss_start_bytes"] = _rss_bytes("VmRSS")
+    stack.append(record)
+
+    profiler = cProfile.Profile() if profile else None
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+        record["status"] = "completed"
+    except BaseException:
+        record["status"] = "failed"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record["wall_seconds"] = time.perf_counter() - wall_start
+        record["cpu_seconds"] = time.process_time() - cpu_start
+        record["rss_end_bytes"] = _rss_bytes("VmRSS")
+        # Without a reset the peak is the process peak so far
+        record["peak_rss_bytes"] = max(
+            record["peak_rss_bytes"], _rss_bytes("VmHWM")
+        )
+        record["peak_rss_is_stage_peak"] = peak_reset
+        stack.pop()
+
+        if profiler is not None:
+            os.makedirs(_active_run["profile_directory"], exist_ok=True)
+            profile_file_path = os.path.join(
+                _active_run["profile_directory"], f"{stage}.prof"
+            )
+            profiler.dump_stats(profile_file_path)
+            record["profile_file_path"] = profile_file_path
+        if "stages" in _active_run:
+            _active_run["stages"].append(record)
+        logging.info(
+            f"Stage {name} {record['status']} in {record['wall_seconds']:.3f}s "
+            f"(cpu {record['cpu_seconds']:.3f}s, peak rss "
+            f"{record['peak_rss_bytes'] / 2**20:.1f} MiB, rows {record['rows']})"
+        )
+
+
+@contextmanager
+def run_report(report_file_path: str, profile_directory: str = None):
+    """
+    Collects the stages instrumented during a training run and writes them to
+    a json run report, also when the run fails. With a profile directory, each
+    top level stage is profiled with cProfile into <stage>.prof (pstats format,
+    readable by snakeviz, gprof2dot or pstats).
+    """
+    _active_run.clear()
+    _active_run.update(
+        {"stages": [], "stack": [], "profile_directory": profile_directory}
+    )
+    report = {"started_at": datetime.now().isoformat(), "status": "running"}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield report
+        report["status"] = "completed"
+    except BaseException:
+        report["status"] = "failed"
+        raise
+    finally:
+        stages = _active_run["stages"]
+        report.update(
+            {
+                "finished_at": datetime.now().isoformat(),
+                "wall_seconds": time.perf_counter() - wall_start,
+                "cpu_seconds": time.process_time() - cpu_start,
+                "peak_rss_bytes": max(
+                    [_rss_bytes("VmHWM")] + [stage["peak_rss_bytes"] for stage in stages]
+                ),
+                # Nested stages finish first, order the report by start instead
+                "stages": sorted(stages, key=lambda stage: stage["started_at"]),
+            }
+        )
+        _active_run.clear()
+        os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
+        with open(report_file_path, "w") as file:
+            json.dump(report, file, indent=2)
+        logging.info(f"Run report written to: {report_file_path}")
@@ -0,0 +1,83 @@
+import atexit
+import queue
+import threading
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+
+
+class MLflowTracker:
+    """
+    Non-blocking MLflow tracking. Training runs are queued and written by a
+    background thread: one MLflow run per training job, with params and metrics
+    batched in single calls and the model serialized once.
+    """
+
+    def __init__(self, tracking_uri: str):
+        try:
+            self.tracking_uri = tracking_uri
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._worker, name="mlflow-tracker", daemon=True
+            )
+            self._thread.start()
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def log_training_run(self, params: dict, metrics: dict, model) -> threading.Event:
+        """
+        Queues a training run and returns an event set once it has been written
+        """
+        try:
+            done = threading.Event()
+            self._queue.put((params, metrics, model, done))
+            return done
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def flush(self, timeout: float) -> bool:
+        """
+        Waits at most timeout seconds for the queued runs to be written
+        """
+        done = self.log_training_run(params=None, metrics=None, model=None)
+        return done.wait(timeout=timeout)
+
+    def _worker(self):
+        import mlflow
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        while True:
+            params, metrics, model, done = self._queue.get()
+            try:
+                if model is not None:
+                    with mlflow.start_run():
+                        mlflow.log_params(params)
+                        mlflow.log_metrics(metrics)
+                        mlflow.sklearn.log_model(
+                            sk_model=model,
+                            name="model",
+                            serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE,
+                        )
+                    logging.info("MLflow training run logged.")
+            except Exception as e:
+                # Tracking must never fail the training job
+                logging.error(f"Unable to log training run to MLflow: {e}")
+            finally:
+                done.set()
+                self._queue.task_done()
+
+
+_mlflow_tracker = None
+_mlflow_tracker_lock = threading.Lock()
+
+
+def get_mlflow_tracker(tracking_uri: str, exit_timeout: float) -> MLflowTracker:
+    """
+    Returns the process wide tracker, creating it on first use. On interpreter
+    exit, pending runs are given exit_timeout seconds to be written.
+    """
+    global _mlflow_tracker
+    with _mlflow_tracker_lock:
+        if _mlflow_tracker is None:
+            _mlflow_tracker = MLflowTracker(tracking_uri=tracking_uri)
+            atexit.register(_mlflow_tracker.flush, timeout=exit_timeout)
+        return _mlflow_tracker
@@ -1,25 +1,59 @@
 import os
 import sys
+import numpy as np
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
 from src.constants.training_pipeline import (
     MODEL_TRAINER_TRAINED_MODEL_DIRECTORY,
     MODEL_TRAINER_TRAINED_MODEL_NAME,
+    LATENCY_TIER_FAST,
 )
 
 
 class ModelEstimator:
-    def __init__(self, preprocessor: object, model):
+    def __init__(self, preprocessor: object, model, student=None):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            self.student = student
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
 
-    def predict(self, X):
+    @property
+    def has_student(self) -> bool:
+        return getattr(self, "student", None) is not None
+
+    def transform(self, X):
+        try:
+            return self.preprocessor.transform(X)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def predict_transformed(self, X_transformed):
+        try:
+            return self.model.predict(X_transformed)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def predict(self, X, latency_tier: str = None):
+        """
+        Predicts with the preprocessor and model, or with the distilled student
+        on raw features when the fast latency tier is requested. Rows missing
+        a feature of the student are still preprocessed and scored by the model.
+        """
         try:
-            X_transformed = self.preprocessor.transform(X)
-            y_pred = self.model.predict(X_transformed)
+            if latency_tier == LATENCY_TIER_FAST and self.has_student:
+                model_rows = ~self.student.available(X)
+                if not model_rows.any():
+                    return self.student.predict(X)
+                if model_rows.all():
+                    return self.predict(X)
+                y_pred = np.empty(len(X), dtype=self.student.classes_.dtype)
+                y_pred[model_rows] = self.predict(X[model_rows])
+                y_pred[~model_rows] = self.student.predict(X[~model_rows])
+                return y_pred
+            X_transformed = self.transform(X)
+            y_pred = self.predict_transformed(X_transformed)
             return y_pred
         except Exception as e:
             raise NetworkSecurityException(error_message=e)
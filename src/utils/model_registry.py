@@ -0,0 +1,75 @@
+import os
+import yaml
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.constants.training_pipeline import (
+    MODEL_REGISTRY_FILE_PATH,
+    MODEL_REGISTRY_SERVING_FILES,
+    SHADOW_SAMPLE_RATE,
+)
+
+
+def read_registry(registry_file_path: str = MODEL_REGISTRY_FILE_PATH) -> dict:
+    """
+    Serving model of each role: the path of a ModelEstimator pickle or
+    MODEL_REGISTRY_SERVING_FILES. The primary serves the serving files until
+    a promotion; without a candidate there is no shadow evaluation.
+    """
+    try:
+        registry = {
+            "primary": MODEL_REGISTRY_SERVING_FILES,
+            "candidate": None,
+            "shadow_sample_rate": SHADOW_SAMPLE_RATE,
+        }
+        if os.path.exists(registry_file_path):
+            with open(registry_file_path) as file:
+                registry.update(yaml.safe_load(file) or {})
+        return registry
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def write_registry(registry: dict, registry_file_path: str = MODEL_REGISTRY_FILE_PATH):
+    """
+    Replaces the registry at once, so serving workers never read half of it
+    """
+    try:
+        os.makedirs(os.path.dirname(registry_file_path) or ".", exist_ok=True)
+        temporary_file_path = f"{registry_file_path}.tmp"
+        with open(temporary_file_path, "w") as file:
+            yaml.safe_dump(registry, file)
+        os.replace(temporary_file_path, registry_file_path)
+        logging.info(f"Model registry: {registry}")
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def register_candidate(
+    model_file_path: str, registry_file_path: str = MODEL_REGISTRY_FILE_PATH
+) -> dict:
+    try:
+        registry = read_registry(registry_file_path)
+        registry["candidate"] = os.path.abspath(model_file_path)
+        write_registry(registry, registry_file_path)
+        return registry
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def promote_candidate(registry_file_path: str = MODEL_REGISTRY_FILE_PATH) -> dict:
+    """
+    Flips the roles: the candidate becomes the primary and the primary the
+    candidate, so flipping again rolls the promotion back
+    """
+    try:
+        registry = read_registry(registry_file_path)
+        if registry["candidate"] is None:
+            raise Exception("There is no candidate model to promote")
+        registry["primary"], registry["candidate"] = (
+            registry["candidate"],
+            registry["primary"],
+        )
+        write_registry(registry, registry_file_path)
+        return registry
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,262 @@
+import os
+import json
+import numpy as np
+from src.exception.exception import NetworkSecurityException
+from src.constants.training_pipeline import LATENCY_TIER_FAST
+
+BUNDLE_MANIFEST_FILE_NAME: str = "manifest.json"
+BUNDLE_ARRAYS_DIRECTORY: str = "arrays"
+KNN_IMPUTER_CHUNK_SIZE: int = 256
+
+
+def column_positions(columns, features: list) -> list:
+    """
+    Positions of features among the columns of a DataFrame. A plain dict is
+    much cheaper than a pandas indexer lookup for single row requests.
+    """
+    positions = {column: position for position, column in enumerate(columns)}
+    return [positions[feature] for feature in features]
+
+
+def _nan_euclidean_distances(X: np.array, Y: np.array) -> np.array:
+    """
+    Euclidean distances ignoring missing coordinates, scaled up by the
+    proportion of present coordinates. The operations, their order and dtype
+    are those of scikit-learn's nan_euclidean_distances (float32 when both
+    inputs are, squared norms of float64 upcasts), so neighbors get bitwise
+    the same distances and KNN imputation breaks their ties the same way.
+    """
+    dtype = np.float32 if X.dtype == Y.dtype == np.float32 else np.float64
+    X, Y = X.astype(dtype), Y.astype(dtype)
+    missing_X, missing_Y = np.isnan(X), np.isnan(Y)
+    X[missing_X] = 0
+    Y[missing_Y] = 0
+
+    X_upcast, Y_upcast = X.astype(np.float64), Y.astype(np.float64)
+    distances = -2 * np.dot(X_upcast, Y_upcast.T)
+    distances += np.einsum("ij,ij->i", X_upcast, X_upcast)[:, None]
+    distances += np.einsum("ij,ij->i", Y_upcast, Y_upcast)[None, :]
+    distances = distances.astype(dtype, copy=False)
+    np.maximum(distances, 0, out=distances)
+
+    distances -= np.dot(X * X, missing_Y.T)
+    distances -= np.dot(missing_X, (Y * Y).T)
+    np.clip(distances, 0, None, out=distances)
+
+    present_count = np.dot(1 - missing_X, (~missing_Y).T)
+    distances[present_count == 0] = np.nan
+    np.maximum(1, present_count, out=present_count)
+    distances /= present_count
+    distances *= X.shape[1]
+    return np.sqrt(distances, out=distances)
+
+
+class NumpyPredictor:
+    """
+    Pure numpy predictor for an inference bundle exported at the end of model
+    training. Arrays are memory mapped, so workers on one host share them.
+    It has the same predict contract as ModelEstimator.
+    """
+
+    def __init__(self, bundle_directory: str):
+        try:
+            with open(os.path.join(bundle_directory, BUNDLE_MANIFEST_FILE_NAME)) as file:
+                self.manifest = json.load(file)
+            self.arrays = {
+                name: np.load(
+                    os.path.join(bundle_directory, BUNDLE_ARRAYS_DIRECTORY, f"{name}.npy"),
+                    mmap_mode="r",
+                )
+                for name in self.manifest["arrays"]
+            }
+            self.feature_names = self.manifest["preprocessor"]["feature_names"]
+            self.classes = np.asarray(self.manifest["model"]["classes"])
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _as_array(self, X) -> np.array:
+        """
+        Writable copy of the features, float dtypes kept like scikit-learn
+        does (float32 CSV columns are imputed in float32), others as float64
+        """
+        if hasattr(X, "columns") and self.feature_names is not None:
+            X = X[self.feature_names]
+        X = np.asarray(X)
+        dtype = X.dtype if X.dtype in (np.float64, np.float32, np.float16) else None
+        return np.array(X, dtype=dtype or np.float64)
+
+    def transform(self, X) -> np.array:
+        """
+        KNN imputation of the missing values, step for step as KNNImputer:
+        same distances, and argpartition over them with missing distances
+        left as NaN, so equidistant donors are picked the same way
+        """
+        try:
+            X = self._as_array(X)
+            imputer = self.manifest["preprocessor"]
+            fit_X = self.arrays["imputer_fit_X"]
+            fit_X_missing = np.isnan(fit_X)
+            valid_columns = self.arrays["imputer_valid_mask"]
+            n_neighbors = imputer["n_neighbors"]
+
+            missing = np.isnan(X)
+            missing_rows = np.flatnonzero(missing[:, valid_columns].any(axis=1))
+            for start in range(0, len(missing_rows), KNN_IMPUTER_CHUNK_SIZE):
+                rows = missing_rows[start : start + KNN_IMPUTER_CHUNK_SIZE]
+                distances = _nan_euclidean_distances(X[rows], fit_X)
+
+                for column in np.flatnonzero(valid_columns):
+                    receivers = np.flatnonzero(missing[rows, column])
+                    if not receivers.size:
+                        continue
+                    donors = np.flatnonzero(~fit_X_missing[:, column])
+                    donor_distances = distances[receivers][:, donors]
+
+                    # Receivers without any defined distance get the column mean
+                    all_nan = np.isnan(donor_distances).all(axis=1)
+                    if all_nan.any():
+                        X[rows[receivers[all_nan]], column] = np.ma.array(
+                            fit_X[:, column], mask=fit_X_missing[:, column]
+                        ).mean()
+                    receivers = receivers[~all_nan]
+                    donor_distances = donor_distances[~all_nan]
+                    if not receivers.size:
+                        continue
+
+                    k = min(n_neighbors, len(donors))
+                    nearest = np.argpartition(donor_distances, k - 1, axis=1)[:, :k]
+                    nearest_distances = np.take_along_axis(
+                        donor_distances, nearest, axis=1
+                    )
+                    if imputer["weights"] == "distance":
+                        with np.errstate(divide="ignore"):
+                            weights = 1.0 / nearest_distances
+                        exact = np.isinf(weights)
+                        exact_rows = exact.any(axis=1)
+                        weights[exact_rows] = exact[exact_rows]
+                    else:
+                        weights = np.ones_like(nearest_distances)
+                    weights[np.isnan(nearest_distances)] = 0.0
+
+                    donor_values = fit_X[donors, column][nearest]
+                    X[rows[receivers], column] = np.multiply(
+                        donor_values, weights
+                    ).sum(axis=1) / weights.sum(axis=1)
+
+            return X[:, valid_columns]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _tree_probabilities(self, X: np.array, prefix: str) -> np.array:
+        """
+        Leaf values of every tree of a flattened ensemble, (n_trees, n_rows, n_values)
+        """
+        left = self.arrays[f"{prefix}_children_left"]
+        right = self.arrays[f"{prefix}_children_right"]
+        feature = self.arrays[f"{prefix}_feature"]
+        threshold = self.arrays[f"{prefix}_threshold"]
+        value = self.arrays[f"{prefix}_value"]
+        roots = self.arrays[f"{prefix}_roots"]
+        # scikit-learn trees compare float32 features against the thresholds
+        X = X.astype(np.float32)
+
+        nodes = np.repeat(roots[:, None], len(X), axis=1)
+        rows = np.arange(len(X))
+        active = left[nodes] != -1
+        while active.any():
+            tree_index, row_index = np.nonzero(active)
+            current = nodes[tree_index, row_index]
+            go_left = X[rows[row_index], feature[current]] <= threshold[current]
+            nodes[tree_index, row_index] = np.where(
+                go_left, left[current], right[current]
+            )
+            active = left[nodes] != -1
+        return value[nodes]
+
+    def decision_function(self, X: np.array) -> np.array:
+        """
+        Score of the positive class, predicted when greater than zero
+        """
+        try:
+            model = self.manifest["model"]
+            kind = model["kind"]
+            if kind == "linear":
+                return X @ self.arrays["coef"] + model["intercept"]
+            if kind == "tree_ensemble":
+                probabilities = self._tree_probabilities(X, prefix="trees").mean(axis=0)
+                return probabilities[:, 1] - 0.5
+            if kind == "gradient_boosting":
+                leaf_values = self._tree_probabilities(X, prefix="trees")[:, :, 0]
+                return model["init"] + model["learning_rate"] * leaf_values.sum(axis=0)
+            if kind == "samme":
+                votes = self._tree_probabilities(X, prefix="trees").argmax(axis=2)
+                return self.arrays["estimator_weights"] @ (2.0 * votes - 1.0)
+            if kind == "categorical_nb":
+                codes = (np.clip(np.rint(X), -1, 1) + 1).astype(np.intp)
+                log_probabilities = self.arrays["feature_log_prob"]
+                joint = self.arrays["class_log_prior"] + log_probabilities[
+                    np.arange(X.shape[1]), :, codes
+                ].sum(axis=1)
+                return joint[:, 1] - joint[:, 0]
+            raise Exception(f"Unknown model kind: {kind}")
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _student_columns(self, X) -> np.array:
+        features = self.manifest["student"]["features"]
+        if hasattr(X, "columns"):
+            X = X.to_numpy()[:, column_positions(X.columns, features)]
+        else:
+            X = np.asarray(X)[:, [self.feature_names.index(f) for f in features]]
+        return np.asarray(X, dtype=np.float64)
+
+    def student_available(self, X) -> np.array:
+        """
+        Mask of the rows that have every feature of the student
+        """
+        try:
+            return ~np.isnan(self._student_columns(X)).any(axis=1)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def predict_student(self, X):
+        """
+        Lookup table prediction of the distilled student on the raw features
+        """
+        try:
+            X = np.nan_to_num(self._student_columns(X), nan=0.0)
+            codes = (np.clip(np.rint(X), -1, 1) + 1).astype(np.int64)
+            cells = codes @ (3 ** np.arange(codes.shape[1], dtype=np.int64))
+            classes = np.asarray(self.manifest["student"]["classes"])
+            return classes[self.arrays["student_table"][cells]]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @property
+    def has_student(self) -> bool:
+        return "student" in self.manifest
+
+    def predict_transformed(self, X_transformed: np.array):
+        try:
+            return self.classes[(self.decision_function(X_transformed) > 0).astype(int)]
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def predict(self, X, latency_tier: str = None):
+        """
+        Rows missing a feature of the student are scored by the model in the
+        fast latency tier too
+        """
+        try:
+            if latency_tier == LATENCY_TIER_FAST and self.has_student:
+                model_rows = ~self.student_available(X)
+                if not model_rows.any():
+                    return self.predict_student(X)
+                if not model_rows.all():
+                    y_pred = np.empty(len(X), dtype=self.classes.dtype)
+                    y_pred[model_rows] = self.predict(X[model_rows])
+                    y_pred[~model_rows] = self.predict_student(X[~model_rows])
+                    return y_pred
+            return self.predict_transformed(self.transform(X))
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
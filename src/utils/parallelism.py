@@ -0,0 +1,93 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from contextlib import ExitStack, contextmanager
+import numpy as np
+from joblib import cpu_count, parallel_config
+from threadpoolctl import threadpool_limits
+from src.exception.exception import NetworkSecurityException
+
+
+@dataclass
+class ParallelismPlan:
+    cpus: int
+    # Grid search worker processes, one fit task (candidate and fold) each
+    search_jobs: int
+    # n_jobs of the estimator and BLAS/OpenMP threads inside every worker
+    threads: int
+
+
+def available_cpus(cpus: int = 0) -> int:
+    """
+    CPUs the training may use: cpus when set, otherwise the CPUs of the
+    affinity mask of the process limited by the cgroup CPU quota of its
+    container, as counted by joblib
+    """
+    try:
+        return cpus if cpus > 0 else max(cpu_count(), 1)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def plan_parallelism(n_tasks: int, cpus: int = 0) -> ParallelismPlan:
+    """
+    Splits the CPUs between the grid search processes and the threads of
+    every fit, so that their product never exceeds the CPUs. Processes come
+    first: independent fits scale better than the threads of one fit.
+    """
+    try:
+        cpus = available_cpus(cpus)
+        search_jobs = max(min(cpus, n_tasks), 1)
+        return ParallelismPlan(
+            cpus=cpus, search_jobs=search_jobs, threads=max(cpus // search_jobs, 1)
+        )
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def set_model_jobs(model, n_jobs: int):
+    """
+    Sets n_jobs of models that have it and returns the previous value
+    """
+    params = model.get_params(deep=False)
+    if "n_jobs" not in params:
+        return None
+    model.set_params(n_jobs=n_jobs)
+    return params["n_jobs"]
+
+
+@contextmanager
+def search_parallelism(plan: ParallelismPlan):
+    """
+    Runs a grid search under the plan: loky worker processes get their BLAS
+    and OpenMP pools pinned to plan.threads, and so do the pools of this
+    process for searches run in it (a single job)
+    """
+    with ExitStack() as stack:
+        stack.enter_context(threadpool_limits(limits=plan.threads))
+        stack.enter_context(
+            parallel_config(backend="loky", inner_max_num_threads=plan.threads)
+        )
+        yield plan
+
+
+@contextmanager
+def shared_arrays(*arrays, temp_folder: str = None):
+    """
+    Saves arrays to .npy files of a temporary folder and yields read only
+    memory maps of them (None stays None). joblib pickles memory maps as
+    their file name, so every worker maps the same pages instead of getting
+    a copy of the arrays with every task. The files are removed on exit.
+    """
+    with tempfile.TemporaryDirectory(
+        prefix="network-security-", dir=temp_folder
+    ) as folder:
+        shared = []
+        for position, array in enumerate(arrays):
+            if array is None:
+                shared.append(None)
+                continue
+            file_path = os.path.join(folder, f"array_{position}.npy")
+            np.save(file_path, np.ascontiguousarray(array))
+            shared.append(np.load(file_path, mmap_mode="r"))
+        yield shared
@@ -0,0 +1,190 @@
+import io
+import numpy as np
+import pandas as pd
+from src.exception.exception import NetworkSecurityException
+from src.utils.schema_csv import read_schema_csv
+
+CSV_MEDIA_TYPE: str = "text/csv"
+ARROW_MEDIA_TYPE: str = "application/vnd.apache.arrow.stream"
+NPY_MEDIA_TYPE: str = "application/x-npy"
+MSGPACK_MEDIA_TYPE: str = "application/msgpack"
+MEDIA_TYPE_ALIASES: dict = {
+    "application/csv": CSV_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+    "application/vnd.msgpack": MSGPACK_MEDIA_TYPE,
+    "application/octet-stream+npy": NPY_MEDIA_TYPE,
+}
+PREDICTION_COLUMN: str = "predicted_column"
+
+
+class UnsupportedPayloadFormat(Exception):
+    """
+    Media type without a codec, or whose optional dependency is missing
+    """
+
+
+class MalformedPayload(Exception):
+    """
+    Body of a supported format that does not decode into the feature columns
+    """
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+
+        return pyarrow
+    except ImportError:
+        raise UnsupportedPayloadFormat("Arrow payloads need pyarrow installed")
+
+
+def _msgpack():
+    try:
+        import msgpack
+
+        return msgpack
+    except ImportError:
+        raise UnsupportedPayloadFormat("msgpack payloads need msgpack installed")
+
+
+def _decode_csv(body: bytes, feature_names: list) -> pd.DataFrame:
+    return read_schema_csv(body)
+
+
+def _decode_arrow(body: bytes, feature_names: list) -> pd.DataFrame:
+    """
+    Arrow IPC stream of feature columns. Columns without nulls are handed to
+    pandas without a copy; split blocks avoid consolidating them into one.
+    """
+    table = _pyarrow().ipc.open_stream(body).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _decode_npy(body: bytes, feature_names: list) -> pd.DataFrame:
+    """
+    .npy matrix with the features in schema order, any numeric dtype (int8
+    without missing values, a float dtype with NaN for missing). The matrix
+    is a view on the request body.
+    """
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    if dtype.hasobject or len(shape) != 2 or shape[1] != len(feature_names):
+        raise Exception(
+            f"Expected a numeric matrix of {len(feature_names)} features, "
+            f"got {dtype} {shape}"
+        )
+    matrix = np.frombuffer(
+        body, dtype=dtype, count=shape[0] * shape[1], offset=stream.tell()
+    ).reshape(shape, order="F" if fortran_order else "C")
+    return pd.DataFrame(matrix, columns=feature_names, copy=False)
+
+
+def _decode_msgpack(body: bytes, feature_names: list) -> pd.DataFrame:
+    """
+    msgpack map of feature name to its column: a bin of int8 values, read
+    without a copy, or an array of numbers with nil for missing
+    """
+    columns = _msgpack().unpackb(body)
+    return pd.DataFrame(
+        {
+            name: (
+                np.frombuffer(values, dtype=np.int8)
+                if isinstance(values, bytes)
+                else np.array(values, dtype=np.float64)
+            )
+            for name, values in columns.items()
+        },
+        copy=False,
+    )
+
+
+def _encode_csv(y_pred: np.array) -> bytes:
+    return pd.DataFrame({PREDICTION_COLUMN: y_pred}).to_csv(index=False).encode()
+
+
+def _encode_arrow(y_pred: np.array) -> bytes:
+    pyarrow = _pyarrow()
+    table = pyarrow.table({PREDICTION_COLUMN: np.asarray(y_pred, dtype=np.int8)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_npy(y_pred: np.array) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(y_pred, dtype=np.int8), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _encode_msgpack(y_pred: np.array) -> bytes:
+    return _msgpack().packb(
+        {PREDICTION_COLUMN: np.asarray(y_pred, dtype=np.int8).tobytes()}
+    )
+
+
+DECODERS: dict = {
+    CSV_MEDIA_TYPE: _decode_csv,
+    ARROW_MEDIA_TYPE: _decode_arrow,
+    NPY_MEDIA_TYPE: _decode_npy,
+    MSGPACK_MEDIA_TYPE: _decode_msgpack,
+}
+ENCODERS: dict = {
+    CSV_MEDIA_TYPE: _encode_csv,
+    ARROW_MEDIA_TYPE: _encode_arrow,
+    NPY_MEDIA_TYPE: _encode_npy,
+    MSGPACK_MEDIA_TYPE: _encode_msgpack,
+}
+
+
+def media_type(header: str) -> str:
+    """
+    Payload format of a Content-Type header, None when it has no codec
+    """
+    name = (header or "").split(";")[0].strip().lower()
+    name = MEDIA_TYPE_ALIASES.get(name, name)
+    return name if name in DECODERS else None
+
+
+def negotiate_response_type(accept: str, request_type: str) -> str:
+    """
+    First format of the Accept header with a codec, else the request format
+    """
+    for candidate in (accept or "").split(","):
+        candidate_type = media_type(candidate)
+        if candidate_type is not None:
+            return candidate_type
+    return request_type
+
+
+def decode_payload(body: bytes, content_type: str, feature_names: list) -> pd.DataFrame:
+    """
+    Feature frame of a request body. A body the codec can't read (truncated,
+    corrupt) or without every feature column raises MalformedPayload.
+    """
+    try:
+        df = DECODERS[content_type](body, feature_names)
+    except UnsupportedPayloadFormat:
+        raise
+    except Exception as e:
+        raise MalformedPayload(f"Malformed {content_type} payload: {e}")
+    missing_columns = [name for name in feature_names if name not in df.columns]
+    if missing_columns:
+        raise MalformedPayload(
+            f"Malformed {content_type} payload: missing columns {missing_columns}"
+        )
+    return df
+
+
+def encode_predictions(y_pred: np.array, content_type: str) -> bytes:
+    try:
+        return ENCODERS[content_type](y_pred)
+    except UnsupportedPayloadFormat:
+        raise
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
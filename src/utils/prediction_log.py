@@ -0,0 +1,204 @@
+import os
+import glob
+import time
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+import pandas as pd
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.serving_metrics import PREDICTION_LOG_BUFFERED_ROWS, PREDICTION_LOG_ROWS
+from src.constants.training_pipeline import (
+    BATCH_SCORING_PREDICTION_FIELD,
+    PREDICTION_LOG_FLUSH_ROWS,
+    PREDICTION_LOG_FLUSH_SECONDS,
+    PREDICTION_LOG_INSERT_TIMEOUT_SECONDS,
+    PREDICTION_LOG_MAX_BUFFER_ROWS,
+    PREDICTION_LOG_SPILL_DIRECTORY,
+)
+
+SPILL_FILE_SUFFIX: str = ".csv"
+SCORED_AT_FIELD: str = "scored_at"
+
+
+class PredictionLog:
+    """
+    Logs the rows scored by the API with their predictions to a Mongo
+    collection of an async client. Requests append to an in-memory buffer
+    without awaiting; a task of the event loop flushes it in unordered bulk
+    inserts once it holds flush_rows rows or every flush_seconds. When Mongo
+    fails or is slower than the insert timeout, and when the buffer outgrows
+    max_buffer_rows, the oldest rows are spilled to CSV files, replayed once
+    inserts succeed again. Delivery is at least once: an insert cut by the
+    timeout may be replayed in full.
+    """
+
+    def __init__(
+        self,
+        collection,
+        flush_rows: int = PREDICTION_LOG_FLUSH_ROWS,
+        flush_seconds: float = PREDICTION_LOG_FLUSH_SECONDS,
+        max_buffer_rows: int = PREDICTION_LOG_MAX_BUFFER_ROWS,
+        insert_timeout_seconds: float = PREDICTION_LOG_INSERT_TIMEOUT_SECONDS,
+        spill_directory: str = PREDICTION_LOG_SPILL_DIRECTORY,
+    ):
+        self.collection = collection
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_buffer_rows = max_buffer_rows
+        self.insert_timeout_seconds = insert_timeout_seconds
+        self.spill_directory = spill_directory
+        self._chunks = deque()
+        self._buffered_rows = 0
+        self._wakeup = None
+        self._task = None
+
+    def append(self, df: pd.DataFrame, predictions, **fields):
+        """
+        Buffers scored rows, with their predictions and extra fields (e.g. the
+        latency tier). Called on the event loop, it never waits for Mongo.
+        """
+        try:
+            # Documents are built by the flush task, not on the request path; a
+            # shallow copy keeps later changes of the caller's frame out
+            self._chunks.append(
+                (df.copy(deep=False), predictions, fields, datetime.now(timezone.utc))
+            )
+            self._buffered_rows += len(df)
+            PREDICTION_LOG_BUFFERED_ROWS.labels().set(self._buffered_rows)
+            if self._wakeup is not None and (
+                self._buffered_rows >= self.flush_rows
+                or self._buffered_rows > self.max_buffer_rows
+            ):
+                self._wakeup.set()
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Stops the flush task and flushes what is left, to Mongo or to disk
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._flush(replay=False)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._flush()
+            except Exception as e:
+                logging.error(f"Prediction log flush failed: {e}")
+
+    def _take(self, max_rows: int) -> list:
+        chunks = []
+        rows = 0
+        while self._chunks and rows < max_rows:
+            chunk = self._chunks.popleft()
+            chunks.append(chunk)
+            rows += len(chunk[0])
+        self._buffered_rows -= rows
+        PREDICTION_LOG_BUFFERED_ROWS.labels().set(self._buffered_rows)
+        return chunks
+
+    @staticmethod
+    def _rows(chunks: list) -> pd.DataFrame:
+        return pd.concat(
+            [
+                df.assign(
+                    **{BATCH_SCORING_PREDICTION_FIELD: predictions},
+                    **fields,
+                    **{SCORED_AT_FIELD: scored_at},
+                )
+                for df, predictions, fields, scored_at in chunks
+            ],
+            ignore_index=True,
+        )
+
+    async def _insert(self, df: pd.DataFrame) -> bool:
+        try:
+            documents = await asyncio.to_thread(df.to_dict, orient="records")
+            await asyncio.wait_for(
+                self.collection.insert_many(documents, ordered=False),
+                timeout=self.insert_timeout_seconds,
+            )
+            return True
+        except Exception as e:
+            logging.warning(f"Prediction log insert of {len(df)} rows failed: {e}")
+            return False
+
+    def _spill(self, df: pd.DataFrame):
+        os.makedirs(self.spill_directory, exist_ok=True)
+        spill_file_path = os.path.join(
+            self.spill_directory, f"{time.time_ns()}-{os.getpid()}{SPILL_FILE_SUFFIX}"
+        )
+        df.to_csv(f"{spill_file_path}.tmp", index=False)
+        os.replace(f"{spill_file_path}.tmp", spill_file_path)
+        PREDICTION_LOG_ROWS.labels("spilled").inc(len(df))
+
+    async def _spill_chunks(self, chunks: list):
+        await asyncio.to_thread(lambda: self._spill(self._rows(chunks)))
+
+    async def _flush(self, replay: bool = True):
+        # Past the buffer bound the oldest rows go to disk instead of memory
+        while self._buffered_rows > self.max_buffer_rows:
+            await self._spill_chunks(self._take(self.flush_rows))
+
+        while self._buffered_rows:
+            chunks = self._take(self.flush_rows)
+            df = await asyncio.to_thread(self._rows, chunks)
+            if not await self._insert(df):
+                # Mongo is failing or slow: keep the rest on disk until it recovers
+                await asyncio.to_thread(self._spill, df)
+                while self._buffered_rows:
+                    await self._spill_chunks(self._take(self.flush_rows))
+                return
+            PREDICTION_LOG_ROWS.labels("inserted").inc(len(df))
+
+        # Spilled rows are replayed while new rows are few
+        while replay and self._buffered_rows < self.flush_rows:
+            if not await self._replay():
+                return
+
+    async def _replay(self) -> bool:
+        """
+        Inserts the oldest spilled file, returns whether one was inserted. A
+        file is first renamed for this process, so workers sharing the spill
+        directory never replay the same file.
+        """
+        spill_file_paths = sorted(
+            glob.glob(os.path.join(self.spill_directory, f"*{SPILL_FILE_SUFFIX}"))
+        )
+        if not spill_file_paths:
+            return False
+        spill_file_path = spill_file_paths[0]
+        claimed_file_path = f"{spill_file_path}.replaying-{os.getpid()}"
+        try:
+            os.rename(spill_file_path, claimed_file_path)
+        except FileNotFoundError:
+            return True
+        inserted = False
+        try:
+            df = await asyncio.to_thread(
+                pd.read_csv, claimed_file_path, parse_dates=[SCORED_AT_FIELD]
+            )
+            inserted = await self._insert(df)
+        finally:
+            if inserted:
+                os.remove(claimed_file_path)
+                PREDICTION_LOG_ROWS.labels("replayed").inc(len(df))
+            else:
+                os.rename(claimed_file_path, spill_file_path)
+        return inserted
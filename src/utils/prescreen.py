@@ -0,0 +1,227 @@
+import os
+import json
+import math
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.url_features import url_hosts
+from src.constants.training_pipeline import (
+    PRESCREEN_DIRECTORY,
+    PRESCREEN_MANIFEST_FILE_NAME,
+    PRESCREEN_FALSE_POSITIVE_RATE,
+    PRESCREEN_URL_FIELD,
+    PRESCREEN_LABEL_FIELD,
+)
+
+# Verdicts in the encoding of the predicted column: 0 phishing, 1 legitimate
+KNOWN_BAD: float = 0.0
+KNOWN_GOOD: float = 1.0
+PHISHING_LABEL: int = -1
+SETS: dict = {"bad": KNOWN_BAD, "good": KNOWN_GOOD}
+
+
+def host_hashes(hosts) -> np.array:
+    """
+    Stable 64 bit hashes of hosts (pandas' keyed siphash, the same in every
+    process), computed for the whole batch at once
+    """
+    return pd.util.hash_array(np.asarray(hosts, dtype=object))
+
+
+def _bloom_positions(hashes: np.array, n_bits: int, n_hashes: int) -> np.array:
+    """
+    Bit positions of each hash, by double hashing of its two 32 bit halves
+    """
+    low = hashes & np.uint64(0xFFFFFFFF)
+    high = (hashes >> np.uint64(32)) | np.uint64(1)
+    steps = np.arange(n_hashes, dtype=np.uint64)
+    return (low[:, None] + steps * high[:, None]) % np.uint64(n_bits)
+
+
+def _bloom_sizes(n_items: int, false_positive_rate: float) -> tuple:
+    n_bits = -max(n_items, 1) * math.log(false_positive_rate) / math.log(2) ** 2
+    n_bits = 8 * math.ceil(n_bits / 8)
+    n_hashes = max(1, round(n_bits / max(n_items, 1) * math.log(2)))
+    return n_bits, n_hashes
+
+
+def build_prescreen(
+    hosts,
+    labels,
+    directory: str = PRESCREEN_DIRECTORY,
+    false_positive_rate: float = PRESCREEN_FALSE_POSITIVE_RATE,
+) -> dict:
+    """
+    Writes the Bloom filters and sorted hashes of the known bad (label -1)
+    and known good hosts. A host with both verdicts is only known bad. Files
+    of a build are named after it and the manifest is replaced last, so
+    serving workers never see a partial build; files of the previous build
+    are removed (workers still mapping them keep them until they reload).
+    """
+    try:
+        hashes = host_hashes(hosts)
+        is_bad = np.asarray(labels) == PHISHING_LABEL
+        bad_hashes = np.unique(hashes[is_bad])
+        good_hashes = np.setdiff1d(hashes[~is_bad], bad_hashes)
+
+        os.makedirs(directory, exist_ok=True)
+        manifest_file_path = os.path.join(directory, PRESCREEN_MANIFEST_FILE_NAME)
+        build_id = uuid.uuid4().hex[:12]
+        manifest = {"build_id": build_id, "built_at": time.time(), "sets": {}}
+        for name, set_hashes in (("bad", bad_hashes), ("good", good_hashes)):
+            n_bits, n_hashes = _bloom_sizes(len(set_hashes), false_positive_rate)
+            positions = _bloom_positions(set_hashes, n_bits, n_hashes).ravel()
+            bits = np.zeros(n_bits // 8, dtype=np.uint8)
+            np.bitwise_or.at(
+                bits,
+                (positions >> np.uint64(3)).astype(np.int64),
+                np.left_shift(1, positions & np.uint64(7)).astype(np.uint8),
+            )
+            bloom_file_name = f"{name}_bloom_{build_id}.npy"
+            hashes_file_name = f"{name}_hashes_{build_id}.npy"
+            np.save(os.path.join(directory, bloom_file_name), bits)
+            np.save(os.path.join(directory, hashes_file_name), set_hashes)
+            manifest["sets"][name] = {
+                "hosts": len(set_hashes),
+                "n_bits": n_bits,
+                "n_hashes": n_hashes,
+                "bloom_file_name": bloom_file_name,
+                "hashes_file_name": hashes_file_name,
+            }
+
+        temporary_file_path = f"{manifest_file_path}.tmp"
+        with open(temporary_file_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temporary_file_path, manifest_file_path)
+        for file_name in os.listdir(directory):
+            if file_name.endswith(".npy") and build_id not in file_name:
+                os.remove(os.path.join(directory, file_name))
+        logging.info(
+            f"Built pre-screen {build_id}: {len(bad_hashes)} bad, "
+            f"{len(good_hashes)} good hosts"
+        )
+        return manifest
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def build_prescreen_from_collection(
+    collection,
+    directory: str = PRESCREEN_DIRECTORY,
+    url_field: str = PRESCREEN_URL_FIELD,
+    label_field: str = PRESCREEN_LABEL_FIELD,
+    false_positive_rate: float = PRESCREEN_FALSE_POSITIVE_RATE,
+) -> dict:
+    """
+    Builds the pre-screen from a Mongo collection of labeled URLs
+    """
+    try:
+        documents = pd.DataFrame(
+            list(
+                collection.find(
+                    {url_field: {"$exists": True}, label_field: {"$exists": True}},
+                    {url_field: 1, label_field: 1, "_id": 0},
+                )
+            ),
+            columns=[url_field, label_field],
+        )
+        hosts = url_hosts(documents[url_field])
+        known = hosts.fillna("").str.len().to_numpy() > 0
+        return build_prescreen(
+            hosts=hosts[known].to_numpy(dtype=object),
+            labels=documents[label_field].to_numpy()[known],
+            directory=directory,
+            false_positive_rate=false_positive_rate,
+        )
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+class PreScreen:
+    """
+    Known bad and known good host sets of a pre-screen build, memory-mapped.
+    A host is looked up in the Bloom filters first; the few that pass are
+    confirmed by a binary search of the sorted hashes, so a verdict is never
+    a Bloom false positive.
+    """
+
+    def __init__(self, directory: str = PRESCREEN_DIRECTORY):
+        try:
+            with open(os.path.join(directory, PRESCREEN_MANIFEST_FILE_NAME)) as file:
+                self.manifest = json.load(file)
+            self.sets = {}
+            for name, entry in self.manifest["sets"].items():
+                self.sets[name] = (
+                    np.load(os.path.join(directory, entry["bloom_file_name"]), mmap_mode="r"),
+                    np.load(os.path.join(directory, entry["hashes_file_name"]), mmap_mode="r"),
+                    entry["n_bits"],
+                    entry["n_hashes"],
+                )
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    @staticmethod
+    def _contains(hashes: np.array, bits, sorted_hashes, n_bits: int, n_hashes: int):
+        positions = _bloom_positions(hashes, n_bits, n_hashes)
+        set_bits = (
+            np.asarray(bits[(positions >> np.uint64(3)).astype(np.int64)])
+            >> (positions & np.uint64(7)).astype(np.uint8)
+        ) & 1
+        candidates = np.flatnonzero(set_bits.all(axis=1))
+        found = np.zeros(len(hashes), dtype=bool)
+        if len(candidates) and len(sorted_hashes):
+            index = np.searchsorted(sorted_hashes, hashes[candidates])
+            index = np.minimum(index, len(sorted_hashes) - 1)
+            found[candidates] = np.asarray(sorted_hashes[index]) == hashes[candidates]
+        return found
+
+    def lookup(self, hosts) -> np.array:
+        """
+        Verdict per host in the encoding of the predicted column, NaN when
+        the host is unknown (or missing)
+        """
+        try:
+            hosts = pd.Series(hosts, dtype=object)
+            present = hosts.notna().to_numpy()
+            verdicts = np.full(len(hosts), np.nan)
+            hashes = host_hashes(hosts[present].to_numpy())
+            for name, verdict in SETS.items():
+                found = self._contains(hashes, *self.sets[name])
+                known = np.flatnonzero(present)[found]
+                verdicts[known] = np.where(np.isnan(verdicts[known]), verdict, verdicts[known])
+            return verdicts
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+
+_prescreen_cache = {}
+
+
+def get_prescreen(directory: str = PRESCREEN_DIRECTORY):
+    """
+    The pre-screen of the latest build, reloaded when a build replaces the
+    manifest, or None when none was built
+    """
+    try:
+        manifest_file_path = os.path.join(directory, PRESCREEN_MANIFEST_FILE_NAME)
+        mtime = (
+            os.stat(manifest_file_path).st_mtime_ns
+            if os.path.exists(manifest_file_path)
+            else None
+        )
+        version = (directory, mtime)
+        if _prescreen_cache.get("version") != version:
+            _prescreen_cache["prescreen"] = (
+                PreScreen(directory=directory) if mtime is not None else None
+            )
+            _prescreen_cache["version"] = version
+            if mtime is not None:
+                logging.info(
+                    f"Loaded pre-screen {_prescreen_cache['prescreen'].manifest['build_id']}"
+                )
+        return _prescreen_cache["prescreen"]
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,203 @@
+import io
+import os
+import csv
+import yaml
+import numpy as np
+import pandas as pd
+from src.exception.exception import NetworkSecurityException
+from src.constants.training_pipeline import (
+    CSV_FEATURE_DTYPE,
+    CSV_NA_VALUES,
+    CSV_TARGET_DTYPE,
+    SAMPLE_WEIGHT_COLUMN,
+    SCHEMA_FILE_PATH,
+    TARGET_COLUMN,
+)
+
+_schema_dtypes = {}
+
+
+def schema_dtypes(schema_file_path: str = SCHEMA_FILE_PATH) -> dict:
+    """
+    Compact dtype of every column of the schema, in schema order: the target
+    is int8 unless it has missing values, then float32 like the features.
+    Deduplicated files also have a float64 sample weight column.
+    """
+    try:
+        if schema_file_path not in _schema_dtypes:
+            with open(schema_file_path) as file:
+                schema = yaml.safe_load(file)
+            _schema_dtypes[schema_file_path] = {
+                name: CSV_TARGET_DTYPE if name == TARGET_COLUMN else CSV_FEATURE_DTYPE
+                for column in schema["columns"]
+                for name in column
+            }
+            _schema_dtypes[schema_file_path][SAMPLE_WEIGHT_COLUMN] = "float64"
+        return _schema_dtypes[schema_file_path]
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def _parse_dtypes(dtypes: dict) -> dict:
+    return {
+        name: dtype if np.dtype(dtype).kind == "f" else CSV_FEATURE_DTYPE
+        for name, dtype in dtypes.items()
+    }
+
+
+def _cast(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Columns are parsed as floats, which also accept "1.0" and missing values,
+    and integer columns without missing values are cast down afterwards
+    """
+    for name, dtype in dtypes.items():
+        if np.dtype(dtype).kind != "f" and name in df and not df[name].hasnans:
+            df[name] = df[name].astype(dtype)
+    return df
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.csv  # noqa: F401
+
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def _header(source) -> list:
+    """
+    Column names of a CSV file, read without moving a file object
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8-sig", newline="") as file:
+            line = file.readline()
+    else:
+        position = source.tell()
+        line = source.readline()
+        source.seek(position)
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig")
+    return next(csv.reader([line]), [])
+
+
+def _arrow_options(pyarrow, dtypes: dict, use_threads: bool, source, usecols: bool):
+    """
+    With usecols, only the schema columns of the file are converted, the
+    others are skipped by the parser
+    """
+    default_convert_options = pyarrow.csv.ConvertOptions()
+    include_columns = (
+        [name for name in _header(source) if name in dtypes] if usecols else []
+    )
+    return {
+        "read_options": pyarrow.csv.ReadOptions(use_threads=use_threads),
+        "convert_options": pyarrow.csv.ConvertOptions(
+            column_types={
+                name: pyarrow.from_numpy_dtype(np.dtype(dtype))
+                for name, dtype in _parse_dtypes(dtypes).items()
+            },
+            null_values=list(default_convert_options.null_values) + CSV_NA_VALUES,
+            include_columns=include_columns,
+            include_missing_columns=False,
+        ),
+    }
+
+
+def _to_pandas(table, dtypes: dict) -> pd.DataFrame:
+    # Every column becomes its own block, without a copy to consolidate them
+    return _cast(table.to_pandas(split_blocks=True, self_destruct=True), dtypes)
+
+
+def _source(source):
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def read_schema_csv(
+    source, usecols: bool = True, schema_file_path: str = SCHEMA_FILE_PATH
+) -> pd.DataFrame:
+    """
+    Reads a CSV file (a path, a file object or bytes) with the dtypes of the
+    schema and "na" as a missing value, on the multithreaded pyarrow engine
+    when pyarrow is installed. With usecols, columns outside the schema are
+    dropped; without it they are kept with inferred dtypes.
+    """
+    try:
+        dtypes = schema_dtypes(schema_file_path)
+        pyarrow = _pyarrow()
+        if pyarrow is None:
+            df = pd.read_csv(
+                _source(source),
+                dtype=_parse_dtypes(dtypes),
+                usecols=(lambda name: name in dtypes) if usecols else None,
+                na_values=CSV_NA_VALUES,
+            )
+            return _cast(df, dtypes)
+        source = _source(source)
+        table = pyarrow.csv.read_csv(
+            source,
+            **_arrow_options(
+                pyarrow, dtypes, use_threads=True, source=source, usecols=usecols
+            ),
+        )
+        return _to_pandas(table, dtypes)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def iter_schema_csv(
+    source,
+    chunk_size: int,
+    usecols: bool = True,
+    schema_file_path: str = SCHEMA_FILE_PATH,
+):
+    """
+    Lazily reads a CSV file like read_schema_csv, in DataFrame chunks of
+    chunk_size rows (the last one shorter) indexed as in the whole file.
+    Blocks of the pyarrow streaming reader are cut to the chunk size, so
+    chunks are the same on every pass.
+    """
+    try:
+        dtypes = schema_dtypes(schema_file_path)
+        pyarrow = _pyarrow()
+        if pyarrow is None:
+            with pd.read_csv(
+                _source(source),
+                dtype=_parse_dtypes(dtypes),
+                usecols=(lambda name: name in dtypes) if usecols else None,
+                na_values=CSV_NA_VALUES,
+                chunksize=chunk_size,
+            ) as reader:
+                for chunk in reader:
+                    yield _cast(chunk, dtypes)
+            return
+
+        source = _source(source)
+        reader = pyarrow.csv.open_csv(
+            source,
+            **_arrow_options(
+                pyarrow, dtypes, use_threads=True, source=source, usecols=usecols
+            ),
+        )
+        batches, rows, start = [], 0, 0
+        for batch in reader:
+            batches.append(batch)
+            rows += batch.num_rows
+            while rows >= chunk_size:
+                table = pyarrow.Table.from_batches(batches, schema=reader.schema)
+                chunk = _to_pandas(table.slice(0, chunk_size), dtypes)
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                rest = table.slice(chunk_size)
+                batches, rows = rest.to_batches(), rest.num_rows
+                yield chunk
+        if rows:
+            table = pyarrow.Table.from_batches(batches, schema=reader.schema)
+            chunk = _to_pandas(table, dtypes)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            yield chunk
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,273 @@
+import traceback
+from collections import deque
+from itertools import count
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, wait
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.model_selection import ParameterGrid, check_cv
+from threadpoolctl import threadpool_limits
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.parallelism import set_model_jobs
+from src.constants.training_pipeline import (
+    SEARCH_BACKEND_LOCAL,
+    SEARCH_BACKEND_SOCKET,
+)
+
+
+def fit_and_score(dataset: dict, estimator, fold: int) -> float:
+    """
+    Fits an unfitted estimator on the training rows of one fold of a dataset
+    and returns its accuracy on the rows left out, weighted when the dataset
+    has sample weights, as the scoring of evaluate_model
+    """
+    train, test = dataset["folds"][fold]
+    X, y, sample_weight = dataset["X"], dataset["y"], dataset["sample_weight"]
+    if sample_weight is None:
+        estimator.fit(X[train], y[train])
+        return float(estimator.score(X[test], y[test]))
+    estimator.fit(X[train], y[train], sample_weight=sample_weight[train])
+    return float(
+        estimator.score(X[test], y[test], sample_weight=sample_weight[test])
+    )
+
+
+class SocketSearchBackend:
+    """
+    Runs search tasks on remote search workers (search_worker.py), one task
+    at a time per worker. Datasets are shipped once to every worker, tasks
+    only carry an unfitted estimator and a fold number. Workers that drop
+    their connection are left out and their task goes to another worker.
+    """
+
+    def __init__(self, addresses: list, authkey: bytes):
+        try:
+            self.connections = [
+                Client(address, authkey=authkey) for address in addresses
+            ]
+            self._keys = count()
+            self._request_ids = count()
+            self._datasets = {}
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def __repr__(self) -> str:
+        return f"SocketSearchBackend({len(self.connections)} workers)"
+
+    def _drop(self, connection, error: Exception):
+        logging.warning(f"Search worker dropped, left out of the search: {error}")
+        self.connections.remove(connection)
+        connection.close()
+        if not self.connections:
+            raise Exception("No search worker left") from error
+
+    def put(self, X: np.array, y: np.array, sample_weight: np.array, cv: int):
+        """
+        Ships a dataset and its cross validation folds to every worker and
+        returns its key and number of folds. The same arrays are shipped once.
+        """
+        try:
+            identity = (id(X), id(y), id(sample_weight), cv)
+            if identity not in self._datasets:
+                folds = list(check_cv(cv, y, classifier=True).split(X, y))
+                key = next(self._keys)
+                dataset = {
+                    "X": X,
+                    "y": y,
+                    "sample_weight": sample_weight,
+                    "folds": folds,
+                }
+                for connection in list(self.connections):
+                    try:
+                        connection.send(("put", key, dataset))
+                    except OSError as error:
+                        self._drop(connection, error)
+                # The arrays are kept so their ids are not reused
+                self._datasets[identity] = (key, len(folds), (X, y, sample_weight))
+            key, n_folds, _ = self._datasets[identity]
+            return key, n_folds
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def run(self, key: int, tasks: dict):
+        """
+        Runs tasks ({task key: (estimator, fold)}) on the dataset of a key and
+        yields (task key, score) as the scores arrive. Every reply carries the
+        id of its request. When a task fails, or the caller stops early, the
+        replies still in flight are drained first, so the workers can be
+        used again.
+        """
+        try:
+            pending = deque(tasks.items())
+            running = {}
+
+            def submit(connection):
+                while pending:
+                    task_key, (estimator, fold) = pending.popleft()
+                    request_id = next(self._request_ids)
+                    try:
+                        connection.send(("task", request_id, key, estimator, fold))
+                    except OSError as error:
+                        pending.appendleft((task_key, (estimator, fold)))
+                        self._drop(connection, error)
+                        return
+                    running[connection] = (request_id, task_key, estimator, fold)
+                    return
+
+            try:
+                for connection in list(self.connections):
+                    submit(connection)
+                while running:
+                    for connection in wait(list(running)):
+                        request_id, task_key, estimator, fold = running[connection]
+                        try:
+                            reply_id, status, value = connection.recv()
+                        except (EOFError, OSError) as error:
+                            del running[connection]
+                            pending.appendleft((task_key, (estimator, fold)))
+                            self._drop(connection, error)
+                            for idle in self.connections:
+                                if idle not in running:
+                                    submit(idle)
+                            continue
+                        if reply_id != request_id:
+                            logging.warning(f"Stale search reply {reply_id} dropped")
+                            continue
+                        del running[connection]
+                        if status == "error":
+                            raise Exception(f"Search task {task_key} failed: {value}")
+                        submit(connection)
+                        yield task_key, value
+            finally:
+                self._drain(running)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def _drain(self, running: dict):
+        """
+        Waits for the replies of the requests still in flight and drops them
+        """
+        while running:
+            for connection in wait(list(running)):
+                request_id = running[connection][0]
+                try:
+                    reply_id = connection.recv()[0]
+                except (EOFError, OSError) as error:
+                    del running[connection]
+                    self._drop(connection, error)
+                    continue
+                if reply_id == request_id:
+                    del running[connection]
+
+    def close(self):
+        try:
+            for connection in self.connections:
+                try:
+                    connection.send(("close",))
+                except OSError:
+                    pass
+                connection.close()
+            self._datasets.clear()
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_search_backend(name: str, addresses: list = None, authkey: bytes = None):
+    """
+    Search backend of a name: None for local, where evaluate_model runs
+    GridSearchCV on the processes of this machine
+    """
+    try:
+        if name == SEARCH_BACKEND_LOCAL:
+            return None
+        if name == SEARCH_BACKEND_SOCKET:
+            if not addresses or not authkey:
+                raise Exception(
+                    "The socket search backend needs worker addresses and an authkey"
+                )
+            return SocketSearchBackend(addresses=addresses, authkey=authkey)
+        raise Exception(f"Unknown search backend: {name}")
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def grid_search(
+    backend,
+    estimator,
+    param_grid: dict,
+    X: np.array,
+    y: np.array,
+    sample_weight: np.array = None,
+    cv: int = 3,
+) -> dict:
+    """
+    Grid search run as one task per candidate and fold on a backend. Picks
+    the parameters of GridSearchCV: stratified folds, best mean fold score,
+    first candidate on ties.
+    """
+    try:
+        if not is_classifier(estimator):
+            raise Exception(f"{type(estimator).__name__} is not a classifier")
+        key, n_folds = backend.put(X, y, sample_weight, cv)
+        candidates = list(ParameterGrid(param_grid))
+        tasks = {
+            (candidate, fold): (clone(estimator).set_params(**params), fold)
+            for candidate, params in enumerate(candidates)
+            for fold in range(n_folds)
+        }
+        scores = np.zeros((len(candidates), n_folds))
+        for done, ((candidate, fold), score) in enumerate(
+            backend.run(key, tasks), start=1
+        ):
+            scores[candidate, fold] = score
+            logging.debug(f"Search task {done}/{len(tasks)} done on {backend}")
+        return candidates[int(np.argmax(scores.mean(axis=1)))]
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def serve_search_worker(address: tuple, authkey: bytes, threads: int = None):
+    """
+    Serves one coordinator at a time: keeps the datasets it puts and answers
+    every task with (request id, "ok", score) or (request id, "error",
+    traceback). The n_jobs of the estimators and the BLAS and OpenMP pools
+    are limited to threads (all the CPUs when None).
+    """
+    with Listener(address, authkey=authkey) as listener:
+        logging.info(f"Search worker listening on {listener.address}")
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, AuthenticationError) as error:
+                # A probe or a client with another authkey, not a coordinator
+                logging.warning(f"Search worker refused a connection: {error}")
+                continue
+            with connection, threadpool_limits(limits=threads):
+                datasets = {}
+                while True:
+                    try:
+                        message = connection.recv()
+                    except EOFError:
+                        break
+                    if message[0] == "close":
+                        break
+                    if message[0] == "put":
+                        _, key, dataset = message
+                        datasets[key] = dataset
+                        continue
+                    _, request_id, key, estimator, fold = message
+                    try:
+                        if threads is not None:
+                            set_model_jobs(estimator, threads)
+                        score = fit_and_score(datasets[key], estimator, fold)
+                        reply = (request_id, "ok", score)
+                    except Exception:
+                        reply = (request_id, "error", traceback.format_exc())
+                    connection.send(reply)
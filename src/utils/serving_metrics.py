@@ -0,0 +1,252 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS: tuple = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+BATCH_SIZE_BUCKETS: tuple = (1, 2, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+_registry = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _ThreadShards:
+    """
+    One list of values per thread. Each thread only writes its own list, so
+    updates need no lock; the lists are summed when the metrics are scraped.
+    The lock is only taken the first time a thread updates the metric.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def local(self) -> list:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self.size
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self) -> list:
+        with self._lock:
+            shards = list(self._shards)
+        return [sum(column) for column in zip(*shards)] or [0] * self.size
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *labelvalues):
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, self._new_child())
+        return child
+
+    def _label_string(self, labelvalues: tuple, extra: dict = None) -> str:
+        pairs = list(zip(self.labelnames, labelvalues)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        labels = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + labels + "}"
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for labelvalues, child in sorted(self._children.items()):
+            lines.extend(self._render_child(labelvalues, child))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _ThreadShards(size=1)
+
+    def inc(self, amount: float = 1):
+        self._shards.local()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.totals()[0]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def _render_child(self, labelvalues: tuple, child: _CounterChild) -> list:
+        return [f"{self.name}{self._label_string(labelvalues)} {child.value()}"]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0
+
+    def set(self, value: float):
+        # A single assignment, atomic under the GIL
+        self._value = value
+
+    def value(self) -> float:
+        return self._value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def clear(self):
+        with self._lock:
+            self._children = {}
+
+    def _render_child(self, labelvalues: tuple, child: _GaugeChild) -> list:
+        return [f"{self.name}{self._label_string(labelvalues)} {child.value()}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        # Bucket counts, then the +Inf bucket, then the sum of observations
+        self._shards = _ThreadShards(size=len(buckets) + 2)
+
+    def observe(self, value: float):
+        values = self._shards.local()
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def totals(self) -> list:
+        return self._shards.totals()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _render_child(self, labelvalues: tuple, child: _HistogramChild) -> list:
+        totals = child.totals()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), totals[:-1]):
+            cumulative += count
+            labels = self._label_string(labelvalues, {"le": bound})
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._label_string(labelvalues)
+        lines.append(f"{self.name}_sum{labels} {totals[-1]}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    """
+    All metrics of this worker process in the Prometheus text format
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+PREDICT_REQUESTS = Counter(
+    "network_security_predict_requests_total",
+    "Prediction requests by latency tier and status.",
+    labelnames=("latency_tier", "status"),
+)
+PREDICT_STAGE_SECONDS = Histogram(
+    "network_security_predict_stage_seconds",
+    "Time per stage of a prediction request: parse, prescreen, featurize, preprocess, inference, render.",
+    labelnames=("stage",),
+)
+PREDICT_BATCH_ROWS = Histogram(
+    "network_security_predict_batch_rows",
+    "Rows per prediction request.",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+PREDICT_ROWS = Counter(
+    "network_security_predict_rows_total",
+    "Rows scored; rate() of this counter gives the rows scored per second.",
+    labelnames=("latency_tier",),
+)
+PRESCREEN_ROWS = Counter(
+    "network_security_prescreen_rows_total",
+    "URLs answered by the pre-screen (known_bad, known_good) or sent to the model (unknown).",
+    labelnames=("verdict",),
+)
+SHADOW_BATCHES = Counter(
+    "network_security_shadow_batches_total",
+    "Sampled batches scored by the shadow candidate (scored), dropped with a full queue (dropped) or failed (error).",
+    labelnames=("result",),
+)
+SHADOW_ROWS = Counter(
+    "network_security_shadow_rows_total",
+    "Rows of shadow batches where the candidate agrees or disagrees with the primary.",
+    labelnames=("result",),
+)
+SHADOW_PREDICT_SECONDS = Histogram(
+    "network_security_shadow_predict_seconds",
+    "Prediction time of the primary and the candidate on the shadow batches.",
+    labelnames=("model",),
+)
+PREDICTION_LOG_ROWS = Counter(
+    "network_security_prediction_log_rows_total",
+    "Logged prediction rows inserted in Mongo, spilled to disk or replayed from disk.",
+    labelnames=("result",),
+)
+PREDICTION_LOG_BUFFERED_ROWS = Gauge(
+    "network_security_prediction_log_buffered_rows",
+    "Prediction rows waiting in memory for the next flush.",
+)
+SERVING_MODEL_CACHE = Counter(
+    "network_security_serving_model_cache_total",
+    "Serving model lookups answered from the worker cache (hit) or by loading (miss).",
+    labelnames=("result",),
+)
+SERVING_MODEL_INFO = Gauge(
+    "network_security_serving_model_info",
+    "Serving model loaded by this worker, versioned by the training time of its files.",
+    labelnames=("model_type", "version"),
+)
@@ -0,0 +1,178 @@
+import os
+import hashlib
+from datetime import datetime
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.model_estimator import ModelEstimator
+from src.utils.numpy_predictor import NumpyPredictor, BUNDLE_MANIFEST_FILE_NAME
+from src.utils.model_registry import read_registry
+from src.utils.serving_metrics import SERVING_MODEL_CACHE, SERVING_MODEL_INFO
+from src.constants.training_pipeline import (
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH,
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_MMAP_FILE_PATH,
+    MODEL_TRAINER_WARM_START_MODEL_FILE_PATH,
+    MODEL_TRAINER_SERVING_MODEL_MMAP_FILE_PATH,
+    MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY,
+    MODEL_TRAINER_STUDENT_FILE_PATH,
+    MODEL_REGISTRY_FILE_PATH,
+    MODEL_REGISTRY_SERVING_FILES,
+)
+
+SERVING_MODEL_FILE_PATHS: list = [
+    os.path.join(MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY, BUNDLE_MANIFEST_FILE_NAME),
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_MMAP_FILE_PATH,
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH,
+    MODEL_TRAINER_SERVING_MODEL_MMAP_FILE_PATH,
+    MODEL_TRAINER_WARM_START_MODEL_FILE_PATH,
+    MODEL_TRAINER_STUDENT_FILE_PATH,
+]
+
+_serving_model_cache = {}
+_candidate_model_cache = {}
+_registry_cache = {}
+
+
+def _load_serving_object(mmap_file_path: str, pickle_file_path: str) -> object:
+    # Imported here so serving from the numpy bundle never loads scikit-learn
+    from src.utils.utils import load_object_mmap, load_preprocessor
+
+    if os.path.exists(mmap_file_path):
+        return load_object_mmap(mmap_file_path)
+    return load_preprocessor(pickle_file_path)
+
+
+def _load_serving_files():
+    """
+    The numpy inference bundle is preferred, then the memory-mappable files,
+    then the pickles; all of them have the predict contract of ModelEstimator
+    """
+    if os.path.exists(SERVING_MODEL_FILE_PATHS[0]):
+        return NumpyPredictor(bundle_directory=MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY)
+    preprocessor = _load_serving_object(
+        mmap_file_path=DATA_TRANSFORMATION_SERVING_PREPROCESSOR_MMAP_FILE_PATH,
+        pickle_file_path=DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH,
+    )
+    model = _load_serving_object(
+        mmap_file_path=MODEL_TRAINER_SERVING_MODEL_MMAP_FILE_PATH,
+        pickle_file_path=MODEL_TRAINER_WARM_START_MODEL_FILE_PATH,
+    )
+    student = None
+    if os.path.exists(MODEL_TRAINER_STUDENT_FILE_PATH):
+        from src.utils.utils import load_preprocessor
+
+        student = load_preprocessor(MODEL_TRAINER_STUDENT_FILE_PATH)
+    return ModelEstimator(preprocessor=preprocessor, model=model, student=student)
+
+
+def get_registry() -> dict:
+    """
+    The model registry, read again only when it changes
+    """
+    registry_mtime = (
+        os.stat(MODEL_REGISTRY_FILE_PATH).st_mtime_ns
+        if os.path.exists(MODEL_REGISTRY_FILE_PATH)
+        else None
+    )
+    if _registry_cache.get("mtime", ()) != registry_mtime:
+        _registry_cache["registry"] = read_registry()
+        _registry_cache["mtime"] = registry_mtime
+    return _registry_cache["registry"]
+
+
+def _registered_model(role: str, cache: dict):
+    """
+    Model of a registry role, loaded again when the registry or the files of
+    the model change. Returns the model, or None when the role is empty, and
+    whether it was loaded by this call.
+    """
+    entry = get_registry()[role]
+    if entry is None:
+        cache.clear()
+        return None, False
+
+    file_paths = (
+        SERVING_MODEL_FILE_PATHS if entry == MODEL_REGISTRY_SERVING_FILES else [entry]
+    )
+    version = (entry,) + tuple(
+        os.stat(file_path).st_mtime_ns if os.path.exists(file_path) else None
+        for file_path in file_paths
+    )
+    if cache.get("version") == version:
+        return cache["model"], False
+    if entry == MODEL_REGISTRY_SERVING_FILES:
+        model = _load_serving_files()
+    else:
+        from src.utils.utils import load_preprocessor
+
+        model = load_preprocessor(entry)
+    logging.info(f"Loaded {role} model {entry}: {type(model).__name__}")
+    cache["version"] = version
+    cache["model"] = model
+    return model, True
+
+
+def get_serving_model():
+    """
+    Loads the primary model of the registry once per worker and reloads it
+    when a training replaces its files or a promotion replaces it
+    """
+    try:
+        serving_model, loaded = _registered_model("primary", _serving_model_cache)
+        if loaded:
+            SERVING_MODEL_CACHE.labels("miss").inc()
+            SERVING_MODEL_INFO.clear()
+            SERVING_MODEL_INFO.labels(
+                type(serving_model).__name__,
+                datetime.fromtimestamp(
+                    max(
+                        mtime
+                        for mtime in _serving_model_cache["version"][1:]
+                        if mtime is not None
+                    )
+                    / 1e9
+                ).isoformat(timespec="seconds"),
+            ).set(1)
+        else:
+            SERVING_MODEL_CACHE.labels("hit").inc()
+        return serving_model
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def get_candidate_model():
+    """
+    The shadow candidate of the registry, None when there is none
+    """
+    try:
+        return _registered_model("candidate", _candidate_model_cache)[0]
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def serving_model_fingerprint() -> str:
+    """
+    sha256 of the files of the primary model of the registry, which changes
+    with any training or promotion; tells whether results were scored by the
+    model serving now
+    """
+    try:
+        entry = get_registry()["primary"]
+        if entry == MODEL_REGISTRY_SERVING_FILES:
+            file_paths = sorted(
+                os.path.join(directory, file_name)
+                for directory, _, file_names in os.walk(
+                    MODEL_TRAINER_INFERENCE_BUNDLE_DIRECTORY
+                )
+                for file_name in file_names
+            ) + SERVING_MODEL_FILE_PATHS[1:]
+        else:
+            file_paths = [entry]
+        fingerprint = hashlib.sha256(entry.encode())
+        for file_path in file_paths:
+            if os.path.exists(file_path):
+                with open(file_path, "rb") as file:
+                    fingerprint.update(file_path.encode())
+                    fingerprint.update(hashlib.file_digest(file, "sha256").digest())
+        return fingerprint.hexdigest()
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,125 @@
+import os
+import time
+import queue
+import random
+import threading
+import numpy as np
+from src.exception.exception import NetworkSecurityException
+from src.logging.logger import logging
+from src.utils.serving_model import get_candidate_model, get_registry
+from src.utils.serving_metrics import (
+    SHADOW_BATCHES,
+    SHADOW_PREDICT_SECONDS,
+    SHADOW_ROWS,
+)
+from src.constants.training_pipeline import SHADOW_QUEUE_SIZE
+
+# Scheduling niceness of the shadow thread, so it yields the CPU to requests
+SHADOW_THREAD_NICENESS: int = 10
+
+
+class ShadowEvaluator:
+    """
+    Scores a sample of the live batches with the candidate model of the
+    registry on a background thread, and records its agreement with the
+    primary predictions and the latency of both. Requests only pay for
+    queueing a batch after their response is sent; batches are dropped
+    rather than queued without bound when the candidate falls behind.
+    """
+
+    def __init__(self, queue_size: int = SHADOW_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.totals = {
+            "batches": 0,
+            "rows": 0,
+            "agreeing_rows": 0,
+            "primary_seconds": 0.0,
+            "candidate_seconds": 0.0,
+            "dropped_batches": 0,
+            "failed_batches": 0,
+        }
+
+    def should_sample(self) -> bool:
+        registry = get_registry()
+        return (
+            registry["candidate"] is not None
+            and random.random() < registry["shadow_sample_rate"]
+        )
+
+    def submit(self, X, primary_predictions: np.array, primary_seconds: float):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="shadow-evaluator", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((X, primary_predictions, primary_seconds))
+        except queue.Full:
+            self.totals["dropped_batches"] += 1
+            SHADOW_BATCHES.labels("dropped").inc()
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), SHADOW_THREAD_NICENESS)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            X, primary_predictions, primary_seconds = self._queue.get()
+            try:
+                self._evaluate(X, primary_predictions, primary_seconds)
+            except Exception as e:
+                self.totals["failed_batches"] += 1
+                SHADOW_BATCHES.labels("error").inc()
+                logging.error(f"Shadow evaluation failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, X, primary_predictions: np.array, primary_seconds: float):
+        candidate = get_candidate_model()
+        if candidate is None:
+            return
+        start = time.perf_counter()
+        candidate_predictions = candidate.predict(X)
+        candidate_seconds = time.perf_counter() - start
+
+        agreeing_rows = int(
+            np.sum(np.asarray(candidate_predictions) == np.asarray(primary_predictions))
+        )
+        SHADOW_BATCHES.labels("scored").inc()
+        SHADOW_ROWS.labels("agree").inc(agreeing_rows)
+        SHADOW_ROWS.labels("disagree").inc(len(X) - agreeing_rows)
+        SHADOW_PREDICT_SECONDS.labels("primary").observe(primary_seconds)
+        SHADOW_PREDICT_SECONDS.labels("candidate").observe(candidate_seconds)
+        self.totals["batches"] += 1
+        self.totals["rows"] += len(X)
+        self.totals["agreeing_rows"] += agreeing_rows
+        self.totals["primary_seconds"] += primary_seconds
+        self.totals["candidate_seconds"] += candidate_seconds
+
+    def wait(self, timeout: float = 10.0):
+        """
+        Waits for the queued batches to be scored
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stats(self) -> dict:
+        try:
+            totals = dict(self.totals)
+            batches = max(totals["batches"], 1)
+            return {
+                **get_registry(),
+                **totals,
+                "agreement_rate": (
+                    totals["agreeing_rows"] / totals["rows"] if totals["rows"] else None
+                ),
+                "primary_mean_seconds": totals["primary_seconds"] / batches,
+                "candidate_mean_seconds": totals["candidate_seconds"] / batches,
+            }
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
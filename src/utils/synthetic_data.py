@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from src.constants.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from src.exception.exception import NetworkSecurityException
+from src.utils.utils import read_yaml_file
+
+SYNTHETIC_DATA_CHUNK_SIZE: int = 500_000
+# Labels of the phishing dataset: -1 phishing, 1 legitimate
+PHISHING_LABEL: int = -1
+LEGITIMATE_LABEL: int = 1
+
+
+def _feature_probabilities(
+    n_features: int, signal: float, random_generator: np.random.Generator
+) -> np.array:
+    """
+    Probabilities of -1, 0 and 1 for every feature and class,
+    (2 classes, n_features, 3 values). The legitimate class is the phishing
+    one moved towards 1 by a random amount up to signal.
+    """
+    phishing = random_generator.dirichlet([2.0, 1.0, 1.0], size=n_features)
+    legitimate = random_generator.dirichlet([1.0, 1.0, 2.0], size=n_features)
+    weights = signal * random_generator.random((n_features, 1))
+    legitimate = (1 - weights) * phishing + weights * legitimate
+    return np.stack([phishing, legitimate])
+
+
+def iter_synthetic_dataset(
+    n_rows: int,
+    phishing_ratio: float = 0.44,
+    missing_rate: float = 0.0,
+    drift: float = 0.0,
+    signal: float = 0.8,
+    random_state: int = 42,
+    schema_file_path: str = SCHEMA_FILE_PATH,
+    chunk_size: int = SYNTHETIC_DATA_CHUNK_SIZE,
+):
+    """
+    Yields a schema conformant phishing dataset in chunks of DataFrames, so
+    datasets of millions of rows can be written out with bounded memory.
+
+    - phishing_ratio: share of rows labelled as phishing
+    - missing_rate: share of feature values replaced by NaN
+    - drift: between 0 and 1, how far the feature distributions are moved
+      away from the ones generated with drift=0 and the same random_state
+    - signal: between 0 and 1, how much the classes differ, 0 is pure noise
+    """
+    try:
+        schema = read_yaml_file(schema_file_path)
+        columns = [list(column)[0] for column in schema["columns"]]
+        features = [column for column in columns if column != TARGET_COLUMN]
+
+        # Distributions depend on random_state only, drifted datasets are
+        # comparable with the base one
+        distribution_generator = np.random.default_rng(random_state)
+        probabilities = _feature_probabilities(
+            len(features), signal, distribution_generator
+        )
+        drifted = _feature_probabilities(len(features), signal, distribution_generator)
+        probabilities = (1 - drift) * probabilities + drift * drifted
+        cumulative = probabilities.cumsum(axis=2)
+
+        random_generator = np.random.default_rng([random_state, int(drift * 1e6)])
+        for start in range(0, n_rows, chunk_size):
+            size = min(chunk_size, n_rows - start)
+            legitimate = random_generator.random(size) >= phishing_ratio
+
+            # Inverse transform sampling of every value from its class distribution
+            uniform = random_generator.random((size, len(features), 1))
+            values = (uniform > cumulative[legitimate.astype(np.intp)]).sum(axis=2) - 1
+            chunk = pd.DataFrame(values.astype(np.int64), columns=features)
+            if missing_rate > 0:
+                chunk = chunk.mask(random_generator.random(chunk.shape) < missing_rate)
+            chunk[TARGET_COLUMN] = np.where(legitimate, LEGITIMATE_LABEL, PHISHING_LABEL)
+            yield chunk[columns]
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def generate_synthetic_dataset(n_rows: int, **kwargs) -> pd.DataFrame:
+    """
+    Whole synthetic dataset as one DataFrame, see iter_synthetic_dataset
+    """
+    try:
+        return pd.concat(
+            iter_synthetic_dataset(n_rows, **kwargs), ignore_index=True
+        )
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
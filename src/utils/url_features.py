@@ -0,0 +1,206 @@
+import time
+import yaml
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src.constants.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from src.exception.exception import NetworkSecurityException
+
+# Scheme, host and port of a URL; the scheme and "//" are optional
+URL_PATTERN: str = (
+    r"^(?:([a-zA-Z][a-zA-Z0-9+.\-]*):)?(?://)?(?:[^@/?#]*@)?"
+    r"(\[[^\]]*\]|[^:/?#]*)(?::(\d*))?"
+)
+IP_ADDRESS_PATTERN: str = (
+    r"(?:\d{1,3}(?:\.\d{1,3}){3}|0x[0-9a-f]+(?:\.0x[0-9a-f]+)*|\[[0-9a-f:.]+\])"
+)
+URL_SHORTENERS: tuple = (
+    "bit.ly", "goo.gl", "tinyurl.com", "ow.ly", "t.co", "is.gd", "buff.ly",
+    "adf.ly", "bitly.com", "cutt.ly", "rebrand.ly", "shorturl.at", "tiny.cc",
+    "lnkd.in", "db.tt", "qr.ae", "bit.do", "v.gd", "x.co", "tr.im", "cli.gs",
+    "u.to", "j.mp", "su.pr", "snipurl.com", "short.to", "budurl.com",
+    "ping.fm", "post.ly", "just.as", "bkite.com", "snipr.com", "fic.kr",
+    "loopt.us", "doiop.com", "twitthis.com", "yfrog.com", "migre.me", "ff.im",
+    "tiny.pl", "url4.eu", "tweez.me", "qr.net", "1url.com", "link.zip.net",
+)
+SHORTENER_PATTERN: str = (
+    r"(?:^|.*\.)(?:" + "|".join(host.replace(".", r"\.") for host in URL_SHORTENERS) + ")"
+)
+STANDARD_PORTS: tuple = ("80", "443")
+# Encoding of the dataset: 1 legitimate, 0 suspicious, -1 phishing
+LEGITIMATE, SUSPICIOUS, PHISHING = 1.0, 0.0, -1.0
+
+
+def _string_series(values) -> pd.Series:
+    """
+    Arrow backed strings when pyarrow is installed: string methods then run
+    in compiled code over the whole batch instead of once per URL in Python
+    """
+    try:
+        return pd.Series(values, dtype="string[pyarrow]")
+    except ImportError:
+        return pd.Series(values, dtype="string")
+
+
+def _flag(condition: pd.Series, value_if_true: float = PHISHING) -> np.array:
+    return np.where(condition.fillna(False).to_numpy(dtype=bool), value_if_true, LEGITIMATE)
+
+
+def url_hosts(urls) -> pd.Series:
+    """
+    Lowercase host of each URL, missing for a missing URL
+    """
+    try:
+        return _string_series(urls).str.extract(URL_PATTERN)[1].str.lower()
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def lexical_features(urls) -> pd.DataFrame:
+    """
+    Features of the dataset computed from the URL string alone, following the
+    definitions of the UCI phishing websites dataset. Subdomains are counted
+    on the host without "www." (country code second level domains are not
+    stripped).
+    """
+    try:
+        urls = _string_series(urls)
+        parts = urls.str.extract(URL_PATTERN)
+        host = parts[1].str.lower().fillna("")
+        port = parts[2]
+
+        is_ip_address = host.str.fullmatch(IP_ADDRESS_PATTERN)
+        length = urls.str.len().to_numpy(dtype=np.float64, na_value=np.nan)
+        # The dots of an IP address don't separate subdomains
+        dots = host.str.replace(r"^www\.", "", regex=True).str.count(r"\.")
+        dots = dots.mask(is_ip_address, 0).to_numpy(dtype=np.float64)
+
+        features = pd.DataFrame(
+            {
+                "having_IP_Address": _flag(is_ip_address),
+                "URL_Length": np.select(
+                    [length < 54, length <= 75], [LEGITIMATE, SUSPICIOUS], PHISHING
+                ),
+                "Shortining_Service": _flag(host.str.fullmatch(SHORTENER_PATTERN)),
+                "having_At_Symbol": _flag(urls.str.contains("@", regex=False)),
+                # "//" after the scheme, i.e. starting past the seventh character
+                "double_slash_redirecting": _flag(urls.str.contains(r"^.{7}.*//")),
+                "Prefix_Suffix": _flag(host.str.contains("-", regex=False)),
+                "having_Sub_Domain": np.select(
+                    [dots <= 1, dots == 2], [LEGITIMATE, SUSPICIOUS], PHISHING
+                ),
+                "port": _flag(port.notna() & ~port.isin(STANDARD_PORTS)),
+                "HTTPS_token": _flag(host.str.contains("https", regex=False)),
+            }
+        ).assign(_host=host.to_numpy(dtype=object), _scheme=parts[0].str.lower())
+        # Nothing is known of a missing URL
+        features.loc[urls.isna().to_numpy()] = np.nan
+        return features
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+class StaticResolver:
+    """
+    Resolver answering from a fixed table of hosts, the local stand-in for
+    DNS, WHOIS, ranking or page resolvers in tests and benchmarks. Unknown
+    hosts get the default values, missing (NaN) unless given.
+    """
+
+    def __init__(self, features: tuple, table: dict = None, default: dict = None):
+        self.features = tuple(features)
+        self.table = table or {}
+        self.default = {feature: np.nan for feature in self.features}
+        self.default.update(default or {})
+
+    def resolve(self, hosts: list) -> dict:
+        return {host: self.table.get(host, self.default) for host in hosts}
+
+
+class CachedResolver:
+    """
+    Caches the answers of a resolver per host, with a time to live and a
+    bounded size (least recently used hosts are evicted first)
+    """
+
+    def __init__(self, resolver, max_size: int = 100_000, ttl_seconds: float = 3600):
+        self.resolver = resolver
+        self.features = resolver.features
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._cache = OrderedDict()
+
+    def resolve(self, hosts: list) -> dict:
+        now = time.monotonic()
+        answers = {}
+        missing = []
+        for host in hosts:
+            cached = self._cache.get(host)
+            if cached is not None and cached[0] > now:
+                self._cache.move_to_end(host)
+                answers[host] = cached[1]
+            else:
+                missing.append(host)
+        if missing:
+            for host, answer in self.resolver.resolve(missing).items():
+                self._cache[host] = (now + self.ttl_seconds, answer)
+                self._cache.move_to_end(host)
+                answers[host] = answer
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return answers
+
+
+class URLFeatureExtractor:
+    """
+    Turns batches of raw URLs into the feature columns of schema.yaml, ready
+    for ModelEstimator. Lexical features are computed from the URL; network
+    and page features come from resolvers, queried once per distinct host of
+    a batch. Features no resolver provides are left missing, for the KNN
+    imputer of the preprocessor to fill.
+    """
+
+    def __init__(self, resolvers: list = None, schema_file_path: str = SCHEMA_FILE_PATH):
+        try:
+            # Read directly: src.utils.utils would load scikit-learn in the app
+            with open(schema_file_path) as file:
+                schema = yaml.safe_load(file)
+            self.feature_names = [
+                list(column)[0]
+                for column in schema["columns"]
+                if list(column)[0] != TARGET_COLUMN
+            ]
+            self.resolvers = resolvers or []
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
+
+    def transform(self, urls) -> pd.DataFrame:
+        try:
+            features = lexical_features(urls)
+            missing = features["_host"].isna().to_numpy()
+            hosts = features.pop("_host").fillna("")
+            scheme = features.pop("_scheme")
+
+            for resolver in self.resolvers:
+                unique_hosts, inverse = np.unique(hosts.to_numpy(), return_inverse=True)
+                answers = resolver.resolve(unique_hosts.tolist())
+                resolved = np.array(
+                    [
+                        [answers[host].get(feature, np.nan) for feature in resolver.features]
+                        for host in unique_hosts
+                    ],
+                    dtype=np.float64,
+                ).reshape(len(unique_hosts), len(resolver.features))
+                for index, feature in enumerate(resolver.features):
+                    features[feature] = resolved[inverse, index]
+
+            # Without an https scheme the certificate can't be trusted
+            if "SSLfinal_State" not in features:
+                features["SSLfinal_State"] = np.nan
+            features.loc[
+                (scheme != "https").fillna(True).to_numpy(dtype=bool), "SSLfinal_State"
+            ] = PHISHING
+            features.loc[missing] = np.nan
+            return features.reindex(columns=self.feature_names)
+        except Exception as e:
+            raise NetworkSecurityException(error_message=e)
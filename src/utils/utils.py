@@ -1,13 +1,31 @@
 import os
 import sys
+import mmap
+import struct
 import yaml
 import dill
 import pickle
+import tempfile
+from contextlib import nullcontext
 import numpy as np
+import pandas as pd
 from src.exception.exception import NetworkSecurityException
 from src.logging.logger import logging
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import f1_score
+from sklearn import config_context
+from sklearn.model_selection import GridSearchCV, ParameterGrid
+from sklearn.metrics import f1_score, get_scorer
+from sklearn.utils.validation import has_fit_parameter
+from threadpoolctl import threadpool_limits
+from src.utils.instrumentation import instrument
+from src.utils.schema_csv import iter_schema_csv
+from src.utils.deduplication import expand
+from src.utils.parallelism import (
+    plan_parallelism,
+    search_parallelism,
+    set_model_jobs,
+    shared_arrays,
+)
+from src.utils.search_backend import grid_search
 
 
 def read_yaml_file(file_path: str) -> dict:
@@ -76,6 +94,17 @@ def load_numpy_array_data(file_path: str) -> np.array:
         raise NetworkSecurityException(error_message=e)
 
 
+def read_csv_in_chunks(file_path: str, chunk_size: int):
+    """
+    Lazily read a csv file in DataFrame chunks of at most chunk_size rows
+    """
+    try:
+        yield from iter_schema_csv(file_path, chunk_size)
+    except Exception as e:
+        logging.error(f"Unable to read csv in chunks from path: {file_path}")
+        raise NetworkSecurityException(error_message=e)
+
+
 def save_preprocessor(file_path: str, preprocessor: object) -> None:
     """
     Save preprocessor in specific path
@@ -112,6 +141,106 @@ def load_preprocessor(file_path: str) -> object:
         raise NetworkSecurityException(error_message=e)
 
 
+MMAP_FILE_MAGIC: bytes = b"NSMMAP01"
+MMAP_MIN_BUFFER_SIZE: int = 64 * 1024
+
+
+def save_object_mmap(file_path: str, obj: object) -> None:
+    """
+    Save an object in a memory-mappable format: the object is pickled with
+    protocol 5 and every large numpy buffer is stored out of band, uncompressed
+    and page aligned, so it can be loaded in place with load_object_mmap.
+
+    Layout: magic | pickle size | buffer count | (offset, size) per buffer |
+    pickle | page aligned buffers
+
+    The file is replaced atomically: processes that mapped the previous one
+    keep reading it until they load again.
+
+    Args:
+        file_path (str): Location of file to save
+        obj (object): Object to save
+
+    Raises:
+        NetworkSecurityException: If object can't be saved
+    """
+    try:
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            # A false value stores the buffer out of band
+            if buffer.raw().nbytes < MMAP_MIN_BUFFER_SIZE:
+                return True
+            buffers.append(buffer)
+            return False
+
+        data = pickle.dumps(obj, protocol=5, buffer_callback=buffer_callback)
+
+        header_size = len(MMAP_FILE_MAGIC) + 16 + 16 * len(buffers)
+        offset = header_size + len(data)
+        buffer_table = []
+        for buffer in buffers:
+            offset += -offset % mmap.PAGESIZE
+            buffer_table.append((offset, buffer.raw().nbytes))
+            offset += buffer.raw().nbytes
+
+        directory_path = os.path.dirname(file_path)
+        os.makedirs(directory_path, exist_ok=True)
+        # Workers map the live file: truncating it would kill them with
+        # SIGBUS, so the new one is written aside and swapped in
+        file_descriptor, temp_file_path = tempfile.mkstemp(
+            dir=directory_path, prefix=f".{os.path.basename(file_path)}."
+        )
+        try:
+            with open(file_descriptor, mode="wb") as file:
+                file.write(MMAP_FILE_MAGIC)
+                file.write(struct.pack("<QQ", len(data), len(buffers)))
+                for buffer_offset, buffer_size in buffer_table:
+                    file.write(struct.pack("<QQ", buffer_offset, buffer_size))
+                file.write(data)
+                for buffer, (buffer_offset, _) in zip(buffers, buffer_table):
+                    file.write(b"\0" * (buffer_offset - file.tell()))
+                    file.write(buffer.raw())
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(temp_file_path, 0o644)
+            os.replace(temp_file_path, file_path)
+        except BaseException:
+            os.remove(temp_file_path)
+            raise
+    except Exception as e:
+        logging.error(f"Unable to save memory-mappable object in path: {file_path}")
+        raise NetworkSecurityException(error_message=e)
+
+
+def load_object_mmap(file_path: str) -> object:
+    """
+    Load an object saved with save_object_mmap. Large numpy arrays are read-only
+    views on a shared memory map of the file, so processes loading the same
+    file share one physical copy through the page cache.
+    """
+    try:
+        with open(file=file_path, mode="rb") as file:
+            memory_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(memory_map)
+
+        if view[: len(MMAP_FILE_MAGIC)] != MMAP_FILE_MAGIC:
+            raise Exception(f"The file: {file_path} is not a memory-mappable object")
+        position = len(MMAP_FILE_MAGIC)
+        data_size, buffer_count = struct.unpack_from("<QQ", view, position)
+        position += 16
+
+        buffers = []
+        for _ in range(buffer_count):
+            buffer_offset, buffer_size = struct.unpack_from("<QQ", view, position)
+            buffers.append(view[buffer_offset : buffer_offset + buffer_size])
+            position += 16
+
+        return pickle.loads(view[position : position + data_size], buffers=buffers)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
 def evaluate_model(
     X_train: np.array,
     y_train: np.array,
@@ -119,29 +248,180 @@ def evaluate_model(
     y_test: np.array,
     models: dict,
     param_grid: dict,
+    train_weights: np.array = None,
+    test_weights: np.array = None,
+    cpus: int = 0,
+    cv: int = 3,
+    backend=None,
 ):
+    """
+    Grid searches every model and scores it on the test set. With weights,
+    the counts of deduplicated rows, models are fit with them as sample
+    weights, or on the rows repeated when they take none (e.g. KNN). Cross
+    validation and test scores are weighted too; models without metadata
+    routing (e.g. AdaBoost) are searched on the repeated rows instead.
+
+    The CPUs (all available when 0) are split between search processes and
+    the threads of every fit, which share the training set memory mapped.
+    With a search backend, the fits of the search run on its workers
+    instead. The best parameters are refit here, on all the CPUs.
+    """
     report = {}
     try:
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            params = param_grid[list(models.keys())[i]]
+        train = (X_train, y_train, train_weights)
+        shared_train = shared_arrays(*train) if backend is None else nullcontext(train)
+        with shared_train as shared:
+            for i in range(len(list(models))):
+                model = list(models.values())[i]
+                params = param_grid[list(models.keys())[i]]
+                report[list(models.keys())[i]] = _search_and_score(
+                    model=model,
+                    model_name=list(models.keys())[i],
+                    params=params,
+                    train=train,
+                    shared_train=shared,
+                    X_test=X_test,
+                    y_test=y_test,
+                    test_weights=test_weights,
+                    cpus=cpus,
+                    cv=cv,
+                    backend=backend,
+                )
+        return report
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def _search_and_score(
+    model,
+    model_name: str,
+    params: dict,
+    train: tuple,
+    shared_train: list,
+    X_test: np.array,
+    y_test: np.array,
+    test_weights: np.array,
+    cpus: int,
+    cv: int,
+    backend=None,
+) -> float:
+    """
+    Grid searches one model, on the memory mapped training set or on the
+    workers of a search backend, refits it on the training set and returns
+    its test f1 score
+    """
+    try:
+        X_train, y_train, train_weights = train
+        X_search, y_search, search_weights = shared_train
+        fit_params, search_params = {}, {}
+        X_fit, y_fit = X_train, y_train
+        if train_weights is not None:
+            if has_fit_parameter(model, "sample_weight"):
+                fit_params = {"sample_weight": train_weights}
+            else:
+                X_fit, y_fit = expand(X_train, y_train, train_weights)
+            # Search workers weight folds themselves, GridSearchCV needs
+            # metadata routing, which some estimators (AdaBoost) lack
+            if fit_params and (backend is not None or _routes_metadata(model)):
+                search_params = {"sample_weight": search_weights}
+            else:
+                # Repeated rows are not shared: joblib memory maps them itself
+                if fit_params:
+                    X_search, y_search = expand(X_train, y_train, train_weights)
+                else:
+                    X_search, y_search = X_fit, y_fit
 
+        plan = plan_parallelism(n_tasks=len(ParameterGrid(params)) * cv, cpus=cpus)
+        if backend is not None:
+            logging.info(f"Grid search of {model_name} on {backend}")
+            with instrument(f"grid_search[{model_name}]", rows=len(X_train)):
+                best_params = grid_search(
+                    backend,
+                    estimator=model,
+                    param_grid=params,
+                    X=X_search,
+                    y=y_search,
+                    sample_weight=search_params.get("sample_weight"),
+                    cv=cv,
+                )
+        else:
+            logging.info(f"Grid search of {model_name}: {plan}")
+            best_params = _local_grid_search(
+                model=model,
+                model_name=model_name,
+                params=params,
+                X_search=X_search,
+                y_search=y_search,
+                search_params=search_params,
+                plan=plan,
+                cv=cv,
+            )
+
+        model.set_params(**best_params)
+        with threadpool_limits(limits=plan.cpus):
+            model.fit(X_fit, y_fit, **fit_params)
+
+        y_pred = model.predict(X_test)
+        return f1_score(y_true=y_test, y_pred=y_pred, sample_weight=test_weights)
+    except Exception as e:
+        raise NetworkSecurityException(error_message=e)
+
+
+def _routes_metadata(model) -> bool:
+    """
+    Whether GridSearchCV can route sample weights to the fits of a model
+    """
+    try:
+        with config_context(enable_metadata_routing=True):
+            model.get_metadata_routing()
+        return True
+    except NotImplementedError:
+        return False
+
+
+def _local_grid_search(
+    model,
+    model_name: str,
+    params: dict,
+    X_search: np.array,
+    y_search: np.array,
+    search_params: dict,
+    plan,
+    cv: int,
+) -> dict:
+    """
+    GridSearchCV on the processes and threads of the plan, returns the best
+    parameters. The model keeps the n_jobs it was declared with.
+    """
+    try:
+        model_jobs = set_model_jobs(model, plan.threads)
+
+        # Metadata routing hands the weights to the fit and the score of
+        # every fold; the default scoring of classifiers is accuracy
+        routing = (
+            config_context(enable_metadata_routing=True)
+            if search_params
+            else nullcontext()
+        )
+        with routing:
+            scoring = None
+            if search_params:
+                model.set_fit_request(sample_weight=True)
+                scoring = get_scorer("accuracy").set_score_request(sample_weight=True)
             gs = GridSearchCV(
                 estimator=model,
                 param_grid=params,
-                cv=3,
-                n_jobs=-1,
-                refit=True,
+                scoring=scoring,
+                cv=cv,
+                n_jobs=plan.search_jobs,
+                refit=False,
             )
-            gs.fit(X=X_train, y=y_train)
-
-            model.set_params(**gs.best_params_)
-            model.fit(X_train, y_train)
-
-            y_pred = model.predict(X_test)
-            test_score = f1_score(y_true=y_test, y_pred=y_pred)
+            with instrument(f"grid_search[{model_name}]", rows=len(X_search)):
+                with search_parallelism(plan):
+                    gs.fit(X=X_search, y=y_search, **search_params)
 
-            report[list(models.keys())[i]] = test_score
-            return report
+        if model_jobs is not None:
+            model.set_params(n_jobs=model_jobs)
+        return gs.best_params_
     except Exception as e:
         raise NetworkSecurityException(error_message=e)
@@ -0,0 +1,140 @@
+import os
+import hashlib
+from types import SimpleNamespace
+import pytest
+from src.constants.training_pipeline import ARTIFACT_STORE_MANIFEST_FILE_NAME
+from src.exception.exception import NetworkSecurityException
+from src.utils.artifact_store import ArtifactStore, archive_run
+
+
+def write_run(run_directory, files: dict):
+    for relative_path, content in files.items():
+        file_path = run_directory / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(content)
+
+
+def read_run(run_directory) -> dict:
+    return {
+        os.path.relpath(os.path.join(root, file_name), run_directory): open(
+            os.path.join(root, file_name), "rb"
+        ).read()
+        for root, _, file_names in os.walk(run_directory)
+        for file_name in file_names
+        if file_name != ARTIFACT_STORE_MANIFEST_FILE_NAME
+    }
+
+
+def blob_digests(store_directory) -> set:
+    return {
+        file_name.split(".")[0]
+        for _, _, file_names in os.walk(store_directory)
+        for file_name in file_names
+    }
+
+
+def digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+RUN_FILES: dict = {
+    "data_ingestion/feature_store/phisingData.csv": b"a,b\n1,-1\n" * 5000,
+    "data_ingestion/ingested/train.csv": b"a,b\n1,-1\n" * 4000,
+    "model_trainer/trained_model/model.pkl": os.urandom(100_000),
+}
+
+
+@pytest.fixture(params=["zstd", "gzip"])
+def artifact_store(request, tmp_path):
+    if request.param == "zstd":
+        pytest.importorskip("pyarrow")
+    return ArtifactStore(str(tmp_path / "artifacts" / ".store"), request.param)
+
+
+def test_pack_and_restore_round_trip(artifact_store, tmp_path):
+    run_directory = tmp_path / "artifacts" / "run"
+    write_run(run_directory, RUN_FILES)
+    # Hardlinked files are stored once and restored as files of their own
+    os.link(
+        run_directory / "data_ingestion/ingested/train.csv",
+        run_directory / "data_ingestion/ingested/train_link.csv",
+    )
+    files = read_run(run_directory)
+
+    report = artifact_store.commit_run(str(run_directory), store_files=False)
+    assert report["files"] == 4 and report["stored_bytes"] == 0
+    assert not blob_digests(artifact_store.store_directory)
+
+    assert artifact_store.pack_run(str(run_directory)) == 4
+    assert read_run(run_directory) == {}
+    assert blob_digests(artifact_store.store_directory) == {
+        digest(content) for content in RUN_FILES.values()
+    }
+
+    assert artifact_store.restore_run(str(run_directory)) == 4
+    assert read_run(run_directory) == files
+    assert artifact_store.restore_run(str(run_directory)) == 0
+
+
+def test_pack_refuses_a_file_changed_since_the_commit(artifact_store, tmp_path):
+    run_directory = tmp_path / "artifacts" / "run"
+    write_run(run_directory, RUN_FILES)
+    artifact_store.commit_run(str(run_directory), store_files=False)
+    model_file_path = run_directory / "model_trainer/trained_model/model.pkl"
+    model_file_path.write_bytes(b"retrained")
+
+    with pytest.raises(NetworkSecurityException, match="changed since"):
+        artifact_store.pack_run(str(run_directory))
+    assert model_file_path.read_bytes() == b"retrained"
+
+
+def test_pack_keeps_registered_files(artifact_store, tmp_path):
+    run_directory = tmp_path / "artifacts" / "run"
+    write_run(run_directory, RUN_FILES)
+    model_file_path = run_directory / "model_trainer/trained_model/model.pkl"
+    artifact_store.commit_run(str(run_directory))
+
+    artifact_store.pack_run(
+        str(run_directory), keep_file_paths={os.path.abspath(model_file_path)}
+    )
+
+    assert list(read_run(run_directory)) == ["model_trainer/trained_model/model.pkl"]
+
+
+def test_archived_runs_are_stored_once(tmp_path):
+    artifact_directory = tmp_path / "artifacts"
+    config = SimpleNamespace(
+        artifact_directory=str(artifact_directory),
+        store_directory=str(artifact_directory / ".store"),
+        compression="gzip",
+        model_registry_file_path=str(tmp_path / "registry.yaml"),
+        keep_runs=2,
+        keep_materialized_runs=1,
+    )
+    models = {}
+    for run in range(3):
+        run_directory = artifact_directory / f"2026_10_0{run + 1}_00_00_00"
+        models[run_directory] = os.urandom(100_000)
+        write_run(
+            run_directory,
+            {
+                **RUN_FILES,
+                "model_trainer/trained_model/model.pkl": models[run_directory],
+            },
+        )
+        report = archive_run(
+            SimpleNamespace(**vars(config), run_directory=str(run_directory))
+        )
+
+    newest, packed = sorted(models, reverse=True)[:2]
+    # The newest run only has its files, the packed one only its blobs
+    assert digest(models[newest]) not in blob_digests(config.store_directory)
+    assert digest(models[packed]) in blob_digests(config.store_directory)
+    assert len(read_run(newest)) == 3 and read_run(packed) == {}
+    assert (report["kept"], report["packed"], report["deleted"]) == (2, 1, 1)
+    # The unique content of the deleted run was collected
+    assert len(blob_digests(config.store_directory)) == 3
+
+    store = ArtifactStore(config.store_directory, "gzip")
+    assert store.restore_run(str(packed)) == 3
+    assert read_run(packed)["model_trainer/trained_model/model.pkl"] == models[packed]
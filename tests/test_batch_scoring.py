@@ -0,0 +1,117 @@
+import logging
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+from sklearn.tree import DecisionTreeClassifier
+from src.constants.training_pipeline import (
+    BATCH_SCORING_PREDICTION_FIELD,
+    BATCH_SCORING_SUCCESS_FILE_NAME,
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH,
+    LATENCY_TIER_FAST,
+    LATENCY_TIER_STANDARD,
+    MODEL_TRAINER_WARM_START_MODEL_FILE_PATH,
+    TARGET_COLUMN,
+)
+from src.exception.exception import NetworkSecurityException
+from src.pipelines.batch_scoring import BatchScoringPipeline
+from src.utils.synthetic_data import generate_synthetic_dataset
+from src.utils.utils import save_preprocessor
+
+
+def deploy_model(df: pd.DataFrame, max_depth: int):
+    """
+    Saves a preprocessor and a model as the serving files of the working
+    directory
+    """
+    X = df.drop(columns=[TARGET_COLUMN])
+    preprocessor = Pipeline(
+        [("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]
+    )
+    model = DecisionTreeClassifier(max_depth=max_depth, random_state=0)
+    model.fit(preprocessor.fit_transform(X), df[TARGET_COLUMN])
+    save_preprocessor(DATA_TRANSFORMATION_SERVING_PREPROCESSOR_FILE_PATH, preprocessor)
+    save_preprocessor(MODEL_TRAINER_WARM_START_MODEL_FILE_PATH, model)
+
+
+def read_scores(output_directory) -> pd.DataFrame:
+    return pd.concat(
+        pd.read_csv(part_file_path)
+        for part_file_path in sorted(output_directory.glob("part-*.csv"))
+    )
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """
+    Working directory with serving files and an input file; spawned scoring
+    workers start in it too
+    """
+    (tmp_path / "data_schema").symlink_to(Path(__file__).parents[1] / "data_schema")
+    monkeypatch.chdir(tmp_path)
+    df = generate_synthetic_dataset(1000, missing_rate=0.02, random_state=0)
+    deploy_model(df, max_depth=4)
+    df.to_csv(tmp_path / "backlog.csv", index=False)
+    return tmp_path, df
+
+
+def batch_scoring(latency_tier: str = LATENCY_TIER_STANDARD) -> BatchScoringPipeline:
+    return BatchScoringPipeline(
+        max_workers=2, shard_size=200, latency_tier=latency_tier
+    )
+
+
+def test_resume_scores_only_the_missing_partitions(workspace, caplog):
+    tmp_path, df = workspace
+    output_directory = tmp_path / "scores"
+    caplog.set_level(logging.INFO)
+
+    assert batch_scoring().score_file("backlog.csv", str(output_directory)) == 1000
+    scores = read_scores(output_directory)
+    # An interrupted run: two partitions were never written
+    for shard_number in (1, 3):
+        os.remove(output_directory / f"part-{shard_number:05d}.csv")
+    os.remove(output_directory / BATCH_SCORING_SUCCESS_FILE_NAME)
+
+    assert batch_scoring().score_file("backlog.csv", str(output_directory)) == 400
+    resumed_scores = read_scores(output_directory)
+
+    assert (output_directory / BATCH_SCORING_SUCCESS_FILE_NAME).exists()
+    assert len(resumed_scores) == len(df)
+    np.testing.assert_array_equal(
+        resumed_scores[BATCH_SCORING_PREDICTION_FIELD],
+        scores[BATCH_SCORING_PREDICTION_FIELD],
+    )
+    # Workers log through this process instead of opening log files of their own
+    assert any("Loaded primary model" in record.message for record in caplog.records)
+    assert not [
+        file_name
+        for _, _, file_names in os.walk(tmp_path / "logs")
+        for file_name in file_names
+    ]
+
+
+def test_resume_with_another_model_is_refused(workspace):
+    tmp_path, df = workspace
+    output_directory = str(tmp_path / "scores")
+    batch_scoring().score_file("backlog.csv", output_directory)
+
+    deploy_model(df, max_depth=8)
+
+    with pytest.raises(NetworkSecurityException, match="model_fingerprint"):
+        batch_scoring().score_file("backlog.csv", output_directory)
+
+
+def test_resume_with_another_latency_tier_is_refused(workspace):
+    tmp_path, _ = workspace
+    output_directory = str(tmp_path / "scores")
+    batch_scoring().score_file("backlog.csv", output_directory)
+
+    with pytest.raises(NetworkSecurityException, match="latency_tier"):
+        batch_scoring(latency_tier=LATENCY_TIER_FAST).score_file(
+            "backlog.csv", output_directory
+        )
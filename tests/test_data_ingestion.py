@@ -0,0 +1,138 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+from src.components.data_ingestion import DataIngestion
+from src.constants.training_pipeline import (
+    DATA_INGESTION_SPLIT_HASH_KEY,
+    SAMPLE_WEIGHT_COLUMN,
+    TARGET_COLUMN,
+)
+from src.utils.classification_metrics import classification_scores
+from src.utils.deduplication import deduplicate
+from src.utils.schema_csv import read_schema_csv
+from src.utils.synthetic_data import generate_synthetic_dataset
+
+TEST_RATIO: float = 0.2
+CHUNK_SIZE: int = 3000
+
+
+@pytest.fixture(scope="module")
+def records() -> pd.DataFrame:
+    """
+    Records with duplicates, some of them in different chunks
+    """
+    df = generate_synthetic_dataset(15_000, missing_rate=0.05, random_state=3)
+    duplicates = df.sample(5000, replace=True, random_state=0)
+    return pd.concat([df, duplicates]).sample(frac=1, random_state=1)
+
+
+def hash_split(records: pd.DataFrame, directory, deduplicate: bool) -> tuple:
+    data_ingestion = DataIngestion(
+        SimpleNamespace(
+            training_file_path=str(directory / "train.csv"),
+            testing_file_path=str(directory / "test.csv"),
+            train_test_split_ratio=TEST_RATIO,
+            split_hash_key=DATA_INGESTION_SPLIT_HASH_KEY,
+            deduplicate=deduplicate,
+            chunk_size=CHUNK_SIZE,
+        )
+    )
+    class_counts = data_ingestion.split_chunks_train_test(
+        records.iloc[start : start + CHUNK_SIZE]
+        for start in range(0, len(records), CHUNK_SIZE)
+    )
+    return (
+        class_counts,
+        read_schema_csv(str(directory / "train.csv"), usecols=False),
+        read_schema_csv(str(directory / "test.csv"), usecols=False),
+    )
+
+
+def test_hash_split_is_reproducible_and_stratified(records, tmp_path):
+    (tmp_path / "first").mkdir()
+    (tmp_path / "second").mkdir()
+
+    class_counts, df_train, df_test = hash_split(
+        records, tmp_path / "first", deduplicate=False
+    )
+    _, df_train_again, df_test_again = hash_split(
+        records, tmp_path / "second", deduplicate=False
+    )
+
+    pd.testing.assert_frame_equal(df_train, df_train_again)
+    pd.testing.assert_frame_equal(df_test, df_test_again)
+    assert len(df_train) + len(df_test) == len(records)
+    for label, rows in records[TARGET_COLUMN].value_counts().items():
+        assert class_counts["train"][label] + class_counts["test"][label] == rows
+        test_share = class_counts["test"][label] / rows
+        assert test_share == pytest.approx(TEST_RATIO, abs=0.002)
+        assert (df_test[TARGET_COLUMN] == label).sum() == class_counts["test"][label]
+    # Identical records are never on both sides
+    assert not set(map(tuple, df_train.fillna(9).to_numpy())) & set(
+        map(tuple, df_test.fillna(9).to_numpy())
+    )
+
+
+def test_streamed_deduplication_matches_deduplicating_each_side(records, tmp_path):
+    (tmp_path / "full").mkdir()
+    (tmp_path / "deduplicated").mkdir()
+    _, df_train, df_test = hash_split(records, tmp_path / "full", deduplicate=False)
+
+    class_counts, df_train_unique, df_test_unique = hash_split(
+        records, tmp_path / "deduplicated", deduplicate=True
+    )
+
+    assert len(df_train_unique) + len(df_test_unique) < len(records)
+    for df, df_unique in ((df_train, df_train_unique), (df_test, df_test_unique)):
+        expected = deduplicate(df)
+        np.testing.assert_array_equal(
+            df_unique.drop(columns=[SAMPLE_WEIGHT_COLUMN]).to_numpy(),
+            expected.drop(columns=[SAMPLE_WEIGHT_COLUMN]).to_numpy(),
+        )
+        np.testing.assert_array_equal(
+            df_unique[SAMPLE_WEIGHT_COLUMN], expected[SAMPLE_WEIGHT_COLUMN]
+        )
+    assert df_test_unique[SAMPLE_WEIGHT_COLUMN].sum() == sum(
+        class_counts["test"].values()
+    )
+
+
+def train_and_score(df_train: pd.DataFrame, df_test: pd.DataFrame) -> dict:
+    """
+    Test metrics of a tree fit on the train set, as the model trainer fits
+    and scores with the sample weights of deduplicated sets
+    """
+    weights = {
+        name: df.get(SAMPLE_WEIGHT_COLUMN)
+        for name, df in (("train", df_train), ("test", df_test))
+    }
+    X_train, X_test = (
+        df.drop(columns=[TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN], errors="ignore")
+        for df in (df_train, df_test)
+    )
+    model = DecisionTreeClassifier(max_depth=6, random_state=0)
+    model.fit(X_train, df_train[TARGET_COLUMN], sample_weight=weights["train"])
+    return vars(
+        classification_scores(
+            y_true=df_test[TARGET_COLUMN],
+            y_pred=model.predict(X_test),
+            sample_weight=weights["test"],
+        )
+    )
+
+
+def test_deduplicated_run_scores_as_the_full_rows(records, tmp_path):
+    (tmp_path / "full").mkdir()
+    (tmp_path / "deduplicated").mkdir()
+    _, df_train, df_test = hash_split(records, tmp_path / "full", deduplicate=False)
+    _, df_train_unique, df_test_unique = hash_split(
+        records, tmp_path / "deduplicated", deduplicate=True
+    )
+
+    full_metrics = train_and_score(df_train, df_test)
+    deduplicated_metrics = train_and_score(df_train_unique, df_test_unique)
+
+    assert 0.5 < full_metrics["f1_score"] < 1
+    assert deduplicated_metrics == pytest.approx(full_metrics, abs=1e-9)
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from src.components.model_trainer import ModelTrainer
+from src.utils.synthetic_data import generate_synthetic_dataset
+from src.utils.utils import load_preprocessor, read_csv_in_chunks
+
+
+def test_preprocessor_is_fit_on_a_bounded_sample_without_holdout(tmp_path):
+    feature_store_file_path = str(tmp_path / "phisingData.csv")
+    columns = generate_synthetic_dataset(10, random_state=0).columns
+    # Uniform ternary rows are unique, so a row tells where it was drawn from
+    values = np.random.default_rng(0).integers(-1, 2, (5000, len(columns)))
+    pd.DataFrame(values, columns=columns).to_csv(feature_store_file_path, index=False)
+    model_trainer = ModelTrainer(
+        model_trainer_config=SimpleNamespace(
+            feature_store_file_path=feature_store_file_path,
+            incremental_chunk_size=700,
+            incremental_holdout_ratio=0.2,
+            incremental_preprocessor_sample_size=1000,
+            incremental_preprocessor_file_path=str(tmp_path / "preprocessor.pkl"),
+        ),
+        data_transformation_artifact=None,
+    )
+
+    model_trainer.fit_incremental_preprocessor()
+
+    preprocessor = load_preprocessor(str(tmp_path / "preprocessor.pkl"))
+    sample = {tuple(row) for row in preprocessor.named_steps["imputer"]._fit_X}
+    stream = {}
+    for chunk_number, chunk in enumerate(
+        read_csv_in_chunks(feature_store_file_path, 700)
+    ):
+        X, _, holdout_mask = model_trainer._split_feature_store_chunk(
+            chunk=chunk, chunk_number=chunk_number
+        )
+        for row_number, (row, held_out) in enumerate(
+            zip(X.to_numpy(dtype=np.float64), holdout_mask)
+        ):
+            stream[tuple(row)] = (chunk_number * 700 + row_number, held_out)
+    assert len(stream) == 5000
+    assert len(sample) == 1000
+    assert not any(stream[row][1] for row in sample)
+    # Drawn from the whole stream, not its first chunks
+    assert max(stream[row][0] for row in sample) > 4000
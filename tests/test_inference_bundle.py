@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import (
+    AdaBoostClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+)
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from src.constants.training_pipeline import (
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    TARGET_COLUMN,
+)
+from src.utils.inference_bundle import export_inference_bundle
+from src.utils.model_estimator import ModelEstimator
+from src.utils.numpy_predictor import NumpyPredictor
+from src.utils.schema_csv import read_schema_csv
+from src.utils.synthetic_data import generate_synthetic_dataset
+
+MODELS: dict = {
+    "logistic_regression": LogisticRegression(max_iter=1000),
+    "random_forest": RandomForestClassifier(n_estimators=20, random_state=0),
+    "gradient_boosting": GradientBoostingClassifier(n_estimators=20, random_state=0),
+    "adaboost": AdaBoostClassifier(n_estimators=20, random_state=0),
+}
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    """
+    Rows as served, read with the schema dtypes (float32 features). Ternary
+    features with many missing values give many equidistant neighbors.
+    """
+    df = generate_synthetic_dataset(3000, missing_rate=0.15, random_state=5)
+    df = read_schema_csv(df.to_csv(index=False).encode())
+    X = df.drop(columns=[TARGET_COLUMN])
+    y = df[TARGET_COLUMN].replace(-1, 0).to_numpy()
+    return X.iloc[:2000], y[:2000], X.iloc[2000:]
+
+
+@pytest.mark.parametrize("name", list(MODELS))
+def test_bundle_serves_the_estimator(dataset, name, tmp_path):
+    X_train, y_train, X_test = dataset
+    preprocessor = Pipeline(
+        [("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))]
+    )
+    model = MODELS[name].fit(preprocessor.fit_transform(X_train), y_train)
+    assert export_inference_bundle(preprocessor, model, str(tmp_path / "bundle"))
+    estimator = ModelEstimator(preprocessor=preprocessor, model=model)
+    bundle = NumpyPredictor(str(tmp_path / "bundle"))
+
+    X_imputed = estimator.transform(X_test)
+
+    assert np.isnan(X_test.to_numpy()).sum() > 1000
+    np.testing.assert_array_equal(bundle.transform(X_test), X_imputed)
+    np.testing.assert_array_equal(bundle.predict(X_test), estimator.predict(X_test))
+
+
+@pytest.mark.parametrize("weights", ["uniform", "distance"])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64, np.int8])
+def test_bundle_imputes_as_knn_imputer(dtype, weights, tmp_path):
+    """
+    Any payload dtype, rows missing every feature (imputed with the column
+    means) and more missing values than donors for some receivers
+    """
+    random_generator = np.random.default_rng(0)
+    columns = [f"feature_{index}" for index in range(12)]
+    values = random_generator.integers(-1, 2, (900, len(columns))).astype(np.float32)
+    values[random_generator.random(values.shape) < 0.4] = np.nan
+    values[600:605] = np.nan
+    X_train = pd.DataFrame(values[:600], columns=columns)
+    X_test = pd.DataFrame(values[600:], columns=columns)
+    if dtype == np.int8:
+        X_test = X_test.fillna(0)
+    X_test = X_test.astype(dtype)
+    imputer = KNNImputer(n_neighbors=4, weights=weights).fit(X_train)
+    model = LogisticRegression().fit(imputer.transform(X_train), np.arange(600) % 2)
+    assert export_inference_bundle(imputer, model, str(tmp_path / "bundle"))
+
+    X_imputed = NumpyPredictor(str(tmp_path / "bundle")).transform(X_test)
+
+    expected = imputer.transform(X_test)
+    assert X_imputed.dtype == expected.dtype
+    np.testing.assert_array_equal(X_imputed, expected)
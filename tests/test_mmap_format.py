@@ -0,0 +1,64 @@
+import multiprocessing
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from src.utils.utils import load_object_mmap, save_object_mmap
+
+
+def read_while_saved(file_path: str, loaded, saved, expected_sum: float):
+    """
+    Maps a file and keeps reading its arrays until it has been saved over
+    """
+    obj = load_object_mmap(file_path)
+    loaded.set()
+    while not saved.is_set():
+        assert obj["values"].sum() == expected_sum
+    assert obj["values"].sum() == expected_sum
+
+
+def test_round_trip(tmp_path):
+    X = np.random.default_rng(0).integers(-1, 2, (500, 8))
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, X[:, 0])
+    obj = {"values": np.arange(100_000, dtype=np.float64), "model": model, "name": "x"}
+    file_path = str(tmp_path / "models" / "object.mmap")
+
+    save_object_mmap(file_path, obj)
+    loaded = load_object_mmap(file_path)
+
+    assert loaded["name"] == "x"
+    np.testing.assert_array_equal(loaded["values"], obj["values"])
+    # Large buffers are read-only views on the map, not copies
+    assert not loaded["values"].flags.writeable
+    np.testing.assert_array_equal(loaded["model"].predict(X), model.predict(X))
+
+
+def test_save_over_a_file_mapped_by_readers(tmp_path):
+    """
+    Readers mapping the file keep the previous version while it is saved
+    over with a smaller one, instead of dying with SIGBUS
+    """
+    file_path = str(tmp_path / "object.mmap")
+    values = np.ones(4_000_000)
+    save_object_mmap(file_path, {"values": values})
+
+    context = multiprocessing.get_context("fork")
+    readers = []
+    for _ in range(2):
+        loaded, saved = context.Event(), context.Event()
+        reader = context.Process(
+            target=read_while_saved,
+            args=(file_path, loaded, saved, float(values.sum())),
+        )
+        reader.start()
+        readers.append((reader, loaded, saved))
+    for _, loaded, _ in readers:
+        assert loaded.wait(timeout=30)
+
+    for size in (1_000_000, 100_000):
+        save_object_mmap(file_path, {"values": np.zeros(size)})
+    for reader, _, saved in readers:
+        saved.set()
+        reader.join(timeout=30)
+        assert reader.exitcode == 0
+
+    assert load_object_mmap(file_path)["values"].shape == (100_000,)
+    assert [path.name for path in tmp_path.iterdir()] == ["object.mmap"]
@@ -0,0 +1,118 @@
+import io
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from src.utils.payload_formats import (
+    ARROW_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    NPY_MEDIA_TYPE,
+    MalformedPayload,
+    decode_payload,
+)
+
+FEATURE_NAMES: list = ["having_IP_Address", "URL_Length", "Shortining_Service"]
+
+
+def npy_body(matrix: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, matrix, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def arrow_body(matrix: np.ndarray) -> bytes:
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+
+    table = pyarrow.table(dict(zip(FEATURE_NAMES, matrix.T)))
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def msgpack_body(matrix: np.ndarray) -> bytes:
+    msgpack = pytest.importorskip("msgpack")
+    return msgpack.packb(
+        {name: column.tobytes() for name, column in zip(FEATURE_NAMES, matrix.T)}
+    )
+
+
+MATRIX: np.ndarray = np.array([[1, -1, 0], [0, 1, -1]], dtype=np.int8)
+BODIES: dict = {
+    NPY_MEDIA_TYPE: npy_body,
+    ARROW_MEDIA_TYPE: arrow_body,
+    MSGPACK_MEDIA_TYPE: msgpack_body,
+}
+
+
+@pytest.mark.parametrize("content_type", list(BODIES))
+def test_round_trip(content_type):
+    body = BODIES[content_type](MATRIX.copy())
+
+    df = decode_payload(body, content_type, FEATURE_NAMES)
+
+    np.testing.assert_array_equal(df[FEATURE_NAMES].to_numpy(), MATRIX)
+
+
+@pytest.mark.parametrize("content_type", list(BODIES))
+def test_truncated_body_is_malformed(content_type):
+    body = BODIES[content_type](MATRIX.copy())
+
+    with pytest.raises(MalformedPayload, match=content_type):
+        decode_payload(body[: len(body) // 2], content_type, FEATURE_NAMES)
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        (NPY_MEDIA_TYPE, b"\x93NUMPY\x01\x00garbage"),
+        (NPY_MEDIA_TYPE, npy_body(np.zeros((2, 5)))),
+        (NPY_MEDIA_TYPE, npy_body(np.zeros(3))),
+        (ARROW_MEDIA_TYPE, b"not an arrow stream"),
+        (MSGPACK_MEDIA_TYPE, b"\xc1"),
+        (CSV_MEDIA_TYPE, b"having_IP_Address,URL_Length\n1,-1\n"),
+    ],
+)
+def test_corrupt_body_is_malformed(content_type, body):
+    with pytest.raises(MalformedPayload):
+        decode_payload(body, content_type, FEATURE_NAMES)
+
+
+def test_columns_of_unequal_length_are_malformed():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.packb(
+        {name: [1, 0, -1][: i + 1] for i, name in enumerate(FEATURE_NAMES)}
+    )
+
+    with pytest.raises(MalformedPayload):
+        decode_payload(body, MSGPACK_MEDIA_TYPE, FEATURE_NAMES)
+
+
+@pytest.fixture(scope="module")
+def client():
+    from app import app
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("content_type", list(BODIES))
+def test_predict_answers_malformed_bodies_with_400(client, content_type):
+    body = BODIES[content_type](MATRIX.copy())
+
+    response = client.post(
+        "/predict",
+        content=body[: len(body) // 2],
+        headers={"content-type": content_type},
+    )
+
+    assert response.status_code == 400
+    assert "Malformed" in response.text
+
+
+def test_predict_answers_unknown_media_types_with_415(client):
+    response = client.post(
+        "/predict", content=b"{}", headers={"content-type": "application/json"}
+    )
+
+    assert response.status_code == 415
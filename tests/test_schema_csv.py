@@ -0,0 +1,38 @@
+import io
+import numpy as np
+import pytest
+from src.constants.training_pipeline import SAMPLE_WEIGHT_COLUMN, TARGET_COLUMN
+from src.utils.schema_csv import iter_schema_csv, read_schema_csv
+
+CSV: bytes = (
+    "﻿extra,having_IP_Address,Result,sample_weight\n"
+    "a,1,-1,2\n"
+    "b,na,1,1\n"
+    "c,-1,1,3\n"
+).encode()
+
+
+@pytest.mark.parametrize("source", [CSV, "file", "path"])
+def test_columns_outside_the_schema_are_skipped(source, tmp_path):
+    if source == "file":
+        source = io.BytesIO(CSV)
+    elif source == "path":
+        (tmp_path / "data.csv").write_bytes(CSV)
+        source = str(tmp_path / "data.csv")
+
+    df = read_schema_csv(source)
+
+    columns = ["having_IP_Address", TARGET_COLUMN, SAMPLE_WEIGHT_COLUMN]
+    assert list(df.columns) == columns
+    assert df["having_IP_Address"].dtype == np.float32
+    assert df[TARGET_COLUMN].dtype == np.int8
+    np.testing.assert_array_equal(df["having_IP_Address"], [1, np.nan, -1])
+
+
+def test_chunks_keep_every_column_without_usecols():
+    chunks = list(iter_schema_csv(CSV, chunk_size=2, usecols=False))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[0].columns)[0] == "extra"
+    assert list(chunks[1]["extra"]) == ["c"]
+    assert list(chunks[1].index) == [2]
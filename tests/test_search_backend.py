@@ -0,0 +1,139 @@
+import socket
+import time
+import multiprocessing
+import numpy as np
+import pytest
+from sklearn import config_context
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import GridSearchCV
+from sklearn.tree import DecisionTreeClassifier
+from src.exception.exception import NetworkSecurityException
+from src.utils.search_backend import (
+    SocketSearchBackend,
+    grid_search,
+    serve_search_worker,
+)
+
+AUTHKEY: bytes = b"test"
+PARAM_GRIDS: dict = {
+    "decision_tree": (
+        DecisionTreeClassifier(random_state=0),
+        {"max_depth": [2, 4, None], "min_samples_split": [2, 16]},
+    ),
+    "logistic_regression": (
+        LogisticRegression(max_iter=1000),
+        {"C": [0.001, 0.1, 10.0]},
+    ),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        return free_socket.getsockname()[1]
+
+
+def start_workers(n_workers: int) -> tuple:
+    context = multiprocessing.get_context("spawn")
+    addresses = [("127.0.0.1", free_port()) for _ in range(n_workers)]
+    workers = [
+        context.Process(
+            target=serve_search_worker, args=(address, AUTHKEY, 1), daemon=True
+        )
+        for address in addresses
+    ]
+    for worker in workers:
+        worker.start()
+    for address in addresses:
+        for _ in range(600):
+            try:
+                socket.create_connection(address).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+    return workers, addresses
+
+
+@pytest.fixture(scope="module")
+def workers():
+    workers, addresses = start_workers(3)
+    yield addresses
+    for worker in workers:
+        worker.terminate()
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    X, y = make_classification(n_samples=600, n_features=8, random_state=0)
+    sample_weight = np.random.default_rng(0).integers(1, 5, len(y)).astype(float)
+    return X, y, sample_weight
+
+
+def grid_search_cv(estimator, param_grid, X, y, sample_weight=None) -> dict:
+    if sample_weight is None:
+        return GridSearchCV(estimator, param_grid, cv=3).fit(X, y).best_params_
+    with config_context(enable_metadata_routing=True):
+        gs = GridSearchCV(
+            estimator.set_fit_request(sample_weight=True),
+            param_grid,
+            scoring=get_scorer("accuracy").set_score_request(sample_weight=True),
+            cv=3,
+        )
+        return gs.fit(X, y, sample_weight=sample_weight).best_params_
+
+
+@pytest.mark.parametrize("name", list(PARAM_GRIDS))
+@pytest.mark.parametrize("weighted", [False, True])
+def test_picks_the_parameters_of_grid_search_cv(workers, dataset, name, weighted):
+    X, y, sample_weight = dataset
+    sample_weight = sample_weight if weighted else None
+    estimator, param_grid = PARAM_GRIDS[name]
+
+    with SocketSearchBackend(addresses=workers, authkey=AUTHKEY) as backend:
+        best_params = grid_search(
+            backend, estimator, param_grid, X, y, sample_weight=sample_weight, cv=3
+        )
+
+    assert best_params == grid_search_cv(
+        estimator, param_grid, X, y, sample_weight=sample_weight
+    )
+
+
+def test_backend_is_usable_after_a_failed_task(workers, dataset):
+    X, y, _ = dataset
+    estimator, param_grid = PARAM_GRIDS["decision_tree"]
+
+    with SocketSearchBackend(addresses=workers, authkey=AUTHKEY) as backend:
+        with pytest.raises(NetworkSecurityException, match="failed"):
+            grid_search(
+                backend,
+                estimator,
+                {"max_depth": [None, 8, -1, 4]},
+                X,
+                y,
+                cv=3,
+            )
+        # Replies of the tasks in flight were drained, not read as these
+        best_params = grid_search(backend, estimator, param_grid, X, y, cv=3)
+
+    assert best_params == grid_search_cv(estimator, param_grid, X, y)
+
+
+def test_tasks_of_a_dropped_worker_are_requeued(dataset):
+    X, y, _ = dataset
+    estimator, param_grid = PARAM_GRIDS["decision_tree"]
+    workers, addresses = start_workers(3)
+    try:
+        with SocketSearchBackend(addresses=addresses, authkey=AUTHKEY) as backend:
+            backend.put(X, y, None, 3)
+            workers[0].terminate()
+            workers[0].join()
+            best_params = grid_search(backend, estimator, param_grid, X, y, cv=3)
+            assert len(backend.connections) == 2
+    finally:
+        for worker in workers:
+            worker.terminate()
+
+    assert best_params == grid_search_cv(estimator, param_grid, X, y)
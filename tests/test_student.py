@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.pipeline import Pipeline
+from src.components.model_trainer import ModelTrainer
+from src.constants.training_pipeline import (
+    DATA_TRANSFORMATION_IMPUTER_PARAMS,
+    LATENCY_TIER_FAST,
+    TARGET_COLUMN,
+)
+from src.utils.inference_bundle import export_inference_bundle
+from src.utils.model_estimator import ModelEstimator
+from src.utils.numpy_predictor import NumpyPredictor
+from src.utils.synthetic_data import generate_synthetic_dataset
+from src.utils.utils import read_yaml_file
+
+
+@pytest.fixture(scope="module")
+def distilled(tmp_path_factory):
+    """
+    A teacher trained on imputed rows with missing values, and its student
+    """
+    df = generate_synthetic_dataset(3000, missing_rate=0.05, random_state=3)
+    X_raw = df.drop(columns=[TARGET_COLUMN])
+    y = df[TARGET_COLUMN].replace(-1, 0).to_numpy(dtype=np.float64)
+    X_train_raw, X_test_raw = X_raw.iloc[:2000], X_raw.iloc[2000:]
+    y_train, y_test = y[:2000], y[2000:]
+
+    preprocessor = Pipeline([("imputer", KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS))])
+    X_train = preprocessor.fit_transform(X_train_raw)
+    teacher = RandomForestClassifier(n_estimators=30, max_depth=8, random_state=0)
+    teacher.fit(X_train, y_train)
+
+    report_file_path = str(tmp_path_factory.mktemp("models") / "student_report.yaml")
+    model_trainer = ModelTrainer(
+        model_trainer_config=SimpleNamespace(
+            student_n_features=6,
+            student_max_depth=8,
+            student_report_file_path=report_file_path,
+        ),
+        data_transformation_artifact=None,
+    )
+    student = model_trainer.distill_model(
+        best_model=teacher,
+        preprocessor=preprocessor,
+        X_train=X_train,
+        X_train_raw=X_train_raw,
+        X_test_raw=X_test_raw,
+        y_test=y_test,
+    )
+    return {
+        "preprocessor": preprocessor,
+        "teacher": teacher,
+        "student": student,
+        "X_test_raw": X_test_raw,
+        "report": read_yaml_file(report_file_path),
+    }
+
+
+def test_fidelity_report_describes_the_served_fast_tier(distilled):
+    preprocessor, teacher, X_test_raw = (
+        distilled[key] for key in ("preprocessor", "teacher", "X_test_raw")
+    )
+    served = ModelEstimator(preprocessor, teacher, student=distilled["student"])
+
+    y_standard = served.predict(X_test_raw)
+    y_fast = served.predict(X_test_raw, latency_tier=LATENCY_TIER_FAST)
+
+    report = distilled["report"]
+    assert report["agreement"] == pytest.approx(np.mean(y_standard == y_fast))
+    student_rows = distilled["student"].available(X_test_raw)
+    assert report["student_coverage"] == pytest.approx(student_rows.mean())
+    assert 0 < report["student_coverage"] < 1
+    assert report["student_agreement"] > 0.8
+
+
+def test_fast_tier_leaves_rows_missing_student_features_to_the_model(distilled):
+    preprocessor, teacher, student, X_test_raw = (
+        distilled[key] for key in ("preprocessor", "teacher", "student", "X_test_raw")
+    )
+    served = ModelEstimator(preprocessor, teacher, student=student)
+    # As URL rows, where the page and network features are never filled
+    X = X_test_raw.copy()
+    X.loc[X.index[::2], student.features[0]] = np.nan
+
+    y_standard = served.predict(X)
+    y_fast = served.predict(X, latency_tier=LATENCY_TIER_FAST)
+
+    model_rows = ~student.available(X)
+    assert model_rows[::2].all()
+    np.testing.assert_array_equal(y_fast[model_rows], y_standard[model_rows])
+    np.testing.assert_array_equal(
+        y_fast[~model_rows], student.predict(X[~model_rows])
+    )
+
+
+def test_numpy_bundle_serves_the_same_fast_tier(distilled, tmp_path):
+    preprocessor, teacher, student, X_test_raw = (
+        distilled[key] for key in ("preprocessor", "teacher", "student", "X_test_raw")
+    )
+    bundle_directory = str(tmp_path / "bundle")
+    assert export_inference_bundle(preprocessor, teacher, bundle_directory, student)
+
+    y_bundle = NumpyPredictor(bundle_directory).predict(
+        X_test_raw, latency_tier=LATENCY_TIER_FAST
+    )
+    y_fast = ModelEstimator(preprocessor, teacher, student=student).predict(
+        X_test_raw, latency_tier=LATENCY_TIER_FAST
+    )
+    np.testing.assert_array_equal(y_bundle, y_fast)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from src.components.model_trainer import ModelTrainer
+from src.constants.training_pipeline import SAMPLE_WEIGHT_COLUMN, TARGET_COLUMN
+from src.utils.deduplication import deduplicate
+from src.utils.synthetic_data import generate_synthetic_dataset
+from src.utils.utils import evaluate_model
+
+
+def draw_rows(pool, n_rows: int, random_state: int):
+    """
+    Rows drawn with replacement from a pool of unique rows, as features and
+    0/1 labels
+    """
+    random = np.random.default_rng(random_state)
+    df = pool.iloc[random.zipf(1.5, n_rows) % len(pool)].reset_index(drop=True)
+    df[TARGET_COLUMN] = df[TARGET_COLUMN].replace(-1, 0)
+    return df
+
+
+def split(df):
+    weights = df.pop(SAMPLE_WEIGHT_COLUMN).to_numpy(dtype=np.float64)
+    X = df.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=np.float64)
+    return X, df[TARGET_COLUMN].to_numpy(dtype=np.float64), weights
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    pool = generate_synthetic_dataset(400, random_state=7)
+    df_train, df_test = draw_rows(pool, 3000, 1), draw_rows(pool, 1000, 2)
+    full = {
+        "X_train": df_train.drop(columns=[TARGET_COLUMN]).to_numpy(np.float64),
+        "y_train": df_train[TARGET_COLUMN].to_numpy(np.float64),
+        "X_test": df_test.drop(columns=[TARGET_COLUMN]).to_numpy(np.float64),
+        "y_test": df_test[TARGET_COLUMN].to_numpy(np.float64),
+    }
+    X_train, y_train, train_weights = split(deduplicate(df_train))
+    X_test, y_test, test_weights = split(deduplicate(df_test))
+    deduplicated = {
+        "X_train": X_train,
+        "y_train": y_train,
+        "X_test": X_test,
+        "y_test": y_test,
+        "train_weights": train_weights,
+        "test_weights": test_weights,
+    }
+    assert len(X_train) < len(full["X_train"])
+    return full, deduplicated
+
+
+def first_candidates(params: dict) -> dict:
+    return {
+        name: {key: values[:1] for key, values in grid.items()}
+        for name, grid in params.items()
+    }
+
+
+def test_weighted_grid_search_over_the_model_zoo(datasets):
+    _, deduplicated = datasets
+    models, params = ModelTrainer.model_zoo(n_features=deduplicated["X_train"].shape[1])
+
+    report = evaluate_model(models=models, param_grid=params, cpus=1, **deduplicated)
+
+    assert list(report) == list(models)
+    assert all(0.5 < score <= 1 for score in report.values())
+
+
+def test_weighted_metrics_match_the_full_rows(datasets):
+    """
+    With one candidate per model the search can't pick differently: a model
+    fit on the unique rows weighted by their counts scores as on every row.
+    Random forests (bootstrap) and gradient boosting with early stopping
+    (validation split) draw other rows, so they only come close.
+    """
+    full, deduplicated = datasets
+    n_features = full["X_train"].shape[1]
+
+    models, params = ModelTrainer.model_zoo(n_features=n_features)
+    full_report = evaluate_model(
+        models=models, param_grid=first_candidates(params), cpus=1, **full
+    )
+    models, params = ModelTrainer.model_zoo(n_features=n_features)
+    weighted_report = evaluate_model(
+        models=models, param_grid=first_candidates(params), cpus=1, **deduplicated
+    )
+
+    for name, score in full_report.items():
+        tolerance = (
+            0.02 if name in ("Random Forest", "Hist Gradient Boosting") else 1e-6
+        )
+        assert weighted_report[name] == pytest.approx(score, abs=tolerance), name